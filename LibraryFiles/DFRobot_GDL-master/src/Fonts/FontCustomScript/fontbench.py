@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Measure the stages of setup.py on fixed inputs, so a change to the generator can
+be compared with the one before.
+
+  python fontbench.py                              ascii and latin1, size 24
+  python fontbench.py --charset cjk3500 --ttf ttf/SIMKAI.TTF --size 12 24 --repeat 5
+  python fontbench.py --ttf ttf/SIMKAI.TTF         another truetype file
+  python fontbench.py --profile bench.prof         cProfile of the whole run as well
+
+Stages (the same functions setup.py runs):
+  readText   collect the characters of a utf-8 text.txt (setup.readText)
+  parseFont  open the face, render and measure the glyphs (setup.loadGlyphs)
+  getBitmap  rle4 encode the rendered glyphs, the part of parseFont spent in setup.getBitmap
+  write      write the .h file (and the .bin file with --output both)
+
+Charsets:
+  ascii      0x20~0x7e, 95 characters
+  latin1     ascii and 0xa0~0xff, 191 characters
+  cjk3500    the first 3500 characters of GB2312 level 1 (the most used hanzi)
+
+The default font is bench/SourceCodePro-Regular.ttf (SIL Open Font License, see
+bench/OFL.txt). It has no hanzi, so cjk3500 is not run by default: ask for it
+with --charset and pass a CJK truetype file with --ttf.
+
+Time is the best of --repeat runs. Peak memory comes from one more run under
+tracemalloc and only counts Python allocations, not the FreeType ones.
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+import cProfile
+import pstats
+import setup
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench')
+BENCH_TTF = os.path.join(BENCH_PATH, 'SourceCodePro-Regular.ttf')
+STAGES = ['readText', 'parseFont', 'getBitmap', 'write']
+
+def asciiChars():
+  return ''.join(chr(c) for c in range(0x20, 0x7f))
+
+def latin1Chars():
+  return asciiChars() + ''.join(chr(c) for c in range(0xa0, 0x100))
+
+def cjkChars(count = 3500):#GB2312 level 1 is ordered by pinyin, every character in it is common
+  chars = []
+  for hi in range(0xb0, 0xd8):
+    for lo in range(0xa1, 0xff):
+      try:
+        chars.append(bytes([hi, lo]).decode('gb2312'))
+      except UnicodeDecodeError:#0xd7fa~0xd7fe are not used
+        pass
+  return ''.join(chars[:count])
+
+CHARSETS = {'ascii': asciiChars, 'latin1': latin1Chars, 'cjk3500': cjkChars}
+
+
+class StageTimer(object):
+  '''
+  Wraps setup.getBitmap while a run lasts, to split its time out of parseFont.
+  '''
+  def __init__(self):
+    self.seconds = 0.0
+    self._getBitmap = None
+
+  def __enter__(self):
+    self._getBitmap = setup.getBitmap
+    def getBitmap(bitmap):
+      t = time.perf_counter()
+      data = self._getBitmap(bitmap)
+      self.seconds += time.perf_counter() - t
+      return data
+    setup.getBitmap = getBitmap
+    return self
+
+  def __exit__(self, *args):
+    setup.getBitmap = self._getBitmap
+
+
+def runOnce(ttf, textFile, size, outPath, mode = 'header', memory = False):
+  '''
+  Run the stages once, return ({stage: seconds}, {stage: peak bytes}, {output: bytes})
+  '''
+  fontDict = {'FontFileNamePre': '', 'FontOutputMode': mode, 'FontGlyphIndex': False, 'FontCodec': 'rle4'}
+  seconds = {}
+  peak = {}
+  def stage(name, func):
+    if memory:
+      tracemalloc.start()
+    t = time.perf_counter()
+    result = func()
+    seconds[name] = time.perf_counter() - t
+    if memory:
+      peak[name] = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+    return result
+  def readText():#setup.readText reads text.txt of the current folder
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(textFile))
+    try:
+      return setup.readText()
+    finally:
+      os.chdir(cwd)
+  fontDict['charList'] = stage('readText', readText)
+  with StageTimer() as timer:
+    TotalList, glyphDitct = stage('parseFont', lambda: setup.loadGlyphs(ttf, fontDict['charList'], size))
+  seconds['getBitmap'] = timer.seconds
+  seconds['parseFont'] -= timer.seconds
+  if memory:
+    peak['getBitmap'] = None#Inside parseFont, not measured on its own
+  path = os.path.join(outPath, 'benchFont' + str(size) + 'pt')
+  stage('write', lambda: setup.writeFontFiles(fontDict, path, TotalList, glyphDitct))
+  sizes = {'glyphs': len(TotalList), 'bitmap': sum(g['length'] for g in TotalList)}
+  for suffix in ['.h', '.bin']:
+    if os.path.exists(path + suffix):
+      sizes[suffix] = os.path.getsize(path + suffix)
+  return seconds, peak, sizes
+
+def bench(ttf, charset, size, repeat = 3, mode = 'header'):
+  '''
+  Return {'seconds': {stage: best}, 'peak': {stage: bytes}, 'sizes': {output: bytes, 'missing': characters not in the font}}
+  '''
+  outPath = tempfile.mkdtemp(prefix = 'fontbench')
+  try:
+    textFile = os.path.join(outPath, 'text.txt')
+    fp = open(textFile, 'w', encoding = 'utf-8')
+    fp.write(CHARSETS[charset]())
+    fp.close()
+    face = setup.openFace(ttf, size)
+    missing = sum(1 for c in CHARSETS[charset]() if face.get_char_index(ord(c)) == 0)
+    best = None
+    for i in range(repeat):
+      seconds, peak, sizes = runOnce(ttf, textFile, size, outPath, mode)
+      if best is None:
+        best = seconds
+      else:
+        best = dict((k, min(best[k], seconds[k])) for k in best)
+    seconds, peak, sizes = runOnce(ttf, textFile, size, outPath, mode, memory = True)
+    sizes['missing'] = missing
+    return {'seconds': best, 'peak': peak, 'sizes': sizes}
+  finally:
+    shutil.rmtree(outPath)
+
+def printResult(name, result):
+  sizes = result['sizes']
+  print("%s: %d glyphs, bitmap %d bytes, %s" %(name, sizes['glyphs'], sizes['bitmap'],
+        ', '.join("%s %d bytes" %(k, sizes[k]) for k in ['.h', '.bin'] if k in sizes)))
+  if sizes['missing']:
+    print("  %d characters are not in the font, they are drawn as .notdef" %sizes['missing'])
+  print("  %-10s %10s %12s" %('stage', 'ms', 'peak KiB'))
+  for s in STAGES:
+    peak = result['peak'].get(s)
+    print("  %-10s %10.1f %12s" %(s, result['seconds'][s] * 1000, '-' if peak is None else '%.0f' %(peak / 1024.0)))
+  print("  %-10s %10.1f" %('total', sum(result['seconds'].values()) * 1000))
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Time the stages of setup.py')
+  parser.add_argument('--ttf', default = BENCH_TTF, help = 'truetype file, default bench/SourceCodePro-Regular.ttf')
+  parser.add_argument('--charset', nargs = '+', choices = sorted(CHARSETS), default = ['ascii', 'latin1'],
+                      help = 'character sets, cjk3500 needs a CJK --ttf')
+  parser.add_argument('--size', nargs = '+', type = int, default = [24], help = 'font sizes')
+  parser.add_argument('--repeat', type = int, default = 3, help = 'runs per measurement, the best is kept')
+  parser.add_argument('--output', choices = ['header', 'both'], default = 'header', help = 'files written by the write stage')
+  parser.add_argument('--profile', help = 'save the cProfile statistics of the whole run to this file')
+  args = parser.parse_args()
+
+  if not os.path.exists(args.ttf):
+    print("Failed! %s not found." %args.ttf)
+    sys.exit(1)
+  profiler = cProfile.Profile() if args.profile else None
+  if profiler:
+    profiler.enable()
+  for charset in args.charset:
+    for size in args.size:
+      if charset == 'cjk3500' and args.ttf == BENCH_TTF:
+        print("Note: %s has no hanzi, cjk3500 only measures .notdef glyphs, pass a CJK font with --ttf" %os.path.basename(args.ttf))
+      result = bench(args.ttf, charset, size, max(args.repeat, 1), args.output)
+      printResult("%s %dpt" %(charset, size), result)
+  if profiler:
+    profiler.disable()
+    profiler.dump_stats(args.profile)
+    print("cProfile statistics saved to %s, the slowest functions:" %args.profile)
+    pstats.Stats(args.profile).sort_stats('cumulative').print_stats(15)
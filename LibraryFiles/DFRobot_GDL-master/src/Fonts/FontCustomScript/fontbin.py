@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Binary font file (.bin) written by setup.py when FontOutputMode is binary or both.
+
+All values are little-endian, every section starts on a 4-byte boundary so the
+file can be memory-mapped or read from an SD card in fixed-size pieces.
+
+  header  (40 bytes)
+    0  char[4]  magic 'GDLF'
+    4  uint8_t  version
+    5  uint8_t  type        gdl_Font_t.type
+    6  uint8_t  last        gdl_Font_t.last
+    7  uint8_t  yAdvance    gdl_Font_t.yAdvance
+    8  uint32_t glyph count
+   12  uint32_t glyph table offset (from the start of the file)
+   16  uint32_t bitmap offset (from the start of the file)
+   20  uint32_t bitmap size
+   24  uint8_t  max width
+   25  uint8_t  max rows
+   26  int8_t   min xOffset
+   27  int8_t   min yOffset
+   28  uint8_t  max xAdvance
+   29  uint8_t  codec (fontcodec.py), 0xff if each glyph has its own
+   30  uint8_t  reserved[2]
+   32  uint32_t block index offset (from the start of the file), 0 if there is none
+   36  uint16_t first block (unicode >> 8 of the smallest glyph)
+   38  uint16_t block count
+  glyph table (16 bytes per glyph, sorted by unicode)
+    0  uint32_t unicode
+    4  uint32_t offset of the glyph data in the bitmap
+    8  uint16_t length, gdl_Glyph_t.length
+   10  uint8_t  width
+   11  uint8_t  height
+   12  int8_t   xOffset
+   13  int8_t   yOffset
+   14  uint8_t  xAdvance
+   15  uint8_t  flags, the codec of the glyph when the font codec is 0xff
+  block index (optional, block count + 1 entries)
+    uint32_t index of the first glyph of each 256-codepoint block, the glyphs
+             of block b are [index[b - first block], index[b - first block + 1])
+  bitmap
+    the glyph data, concatenated in the order of the glyph table
+
+Run "python fontbin.py font/xxx.bin" to check a generated file.
+'''
+import os
+import sys
+import mmap
+import struct
+import fontcodec
+
+FONT_BIN_MAGIC = b'GDLF'
+FONT_BIN_VERSION = 1
+FONT_TYPE_CUSTOM = 1
+BLOCK_SHIFT = 8
+
+HEADER_FORMAT = '<4sBBBBIIIIBBBBBB2xIHH'
+GLYPH_FORMAT = '<IIHBBBBBB'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+GLYPH_SIZE = struct.calcsize(GLYPH_FORMAT)
+
+def align(n, a = 4):#Round n up to a multiple of a
+  return (n + a - 1) & ~(a - 1)
+
+def buildBlockIndex(codes):#codes sorted ascending, return (first block, glyph index of each block start + the end)
+  if not codes:
+    return 0, [0]
+  first = codes[0] >> BLOCK_SHIFT
+  count = (codes[-1] >> BLOCK_SHIFT) - first + 1
+  starts = [0] * (count + 1)
+  for c in codes:
+    starts[(c >> BLOCK_SHIFT) - first + 1] += 1
+  for i in range(count):
+    starts[i + 1] += starts[i]
+  return first, starts
+
+def packFont(TotalList, glyphDitct, blockIndex = False, codec = 'rle4'):#Pack the output of loadGlyphs into the binary font file, return bytes
+  glyphTable = bytearray()
+  bitmap = bytearray()
+  fontCodec, encoded = fontcodec.encodeFont([([int(i, 16) for i in d['bitmap']], d['width'], d['rows']) for d in TotalList], codec)
+  for d, (glyphCodec, data) in zip(TotalList, encoded):
+    if len(data) > 0xFFFF:
+      raise ValueError("glyph %s is too large: %d bytes" %(d['unicode'], len(data)))
+    glyphTable += struct.pack(GLYPH_FORMAT, int(d['unicode'], 16), len(bitmap), len(data),
+                              d['width'], d['rows'], d['xoffset'] & 0xFF, d['yoffset'] & 0xFF,
+                              d['xadvance'] & 0xFF, glyphCodec if fontCodec == fontcodec.CODEC_MIXED else 0)
+    bitmap += bytes(data)
+  glyphOffset = HEADER_SIZE
+  indexOffset = 0
+  firstBlock, starts = 0, []
+  if blockIndex:
+    indexOffset = align(glyphOffset + len(glyphTable))
+    firstBlock, starts = buildBlockIndex([int(d['unicode'], 16) for d in TotalList])
+    bitmapOffset = align(indexOffset + 4 * len(starts))
+  else:
+    bitmapOffset = align(glyphOffset + len(glyphTable))
+  header = struct.pack(HEADER_FORMAT, FONT_BIN_MAGIC, FONT_BIN_VERSION, FONT_TYPE_CUSTOM, 0,
+                       glyphDitct['height'] & 0xFF, len(TotalList), glyphOffset, bitmapOffset, len(bitmap),
+                       glyphDitct['maxwidth'] & 0xFF, glyphDitct['maxrows'] & 0xFF,
+                       glyphDitct['minXoffset'] & 0xFF, glyphDitct['minYoffset'] & 0xFF,
+                       glyphDitct['maxAadvancex'] & 0xFF, fontCodec,
+                       indexOffset, firstBlock, max(len(starts) - 1, 0))
+  buf = bytearray(header)
+  buf += glyphTable
+  if blockIndex:
+    buf += bytes(indexOffset - len(buf))
+    buf += struct.pack('<%dI' %len(starts), *starts)
+  buf += bytes(bitmapOffset - len(buf))
+  buf += bitmap
+  buf += bytes(align(len(buf)) - len(buf))
+  return bytes(buf)
+
+def writeFontBin(filename, TotalList, glyphDitct, blockIndex = False, codec = 'rle4'):
+  fp = open(filename, 'wb')
+  fp.write(packFont(TotalList, glyphDitct, blockIndex, codec))
+  fp.close()
+
+
+class FontBin(object):
+  '''
+  Read-only view of a binary font file through mmap, nothing is copied until
+  a glyph is asked for.
+  '''
+  def __init__(self, filename):
+    self._fp = open(filename, 'rb')
+    self._map = mmap.mmap(self._fp.fileno(), 0, access = mmap.ACCESS_READ)
+    if len(self._map) < HEADER_SIZE:
+      self.close()
+      raise ValueError("%s: file too short" %filename)
+    (self.magic, self.version, self.type, self.last, self.yAdvance, self.count,
+     self.glyphOffset, self.bitmapOffset, self.bitmapSize, self.maxWidth, self.maxRows,
+     minX, minY, self.maxXAdvance, self.codec, self.indexOffset, self.firstBlock,
+     self.blockCount) = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+    self.minXOffset = minX - 256 if minX > 127 else minX
+    self.minYOffset = minY - 256 if minY > 127 else minY
+    if self.magic != FONT_BIN_MAGIC:
+      self.close()
+      raise ValueError("%s: not a GDL font file" %filename)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def __len__(self):
+    return self.count
+
+  def close(self):
+    if self._map is not None:
+      self._map.close()
+      self._map = None
+    self._fp.close()
+
+  def glyph(self, index):#Return (unicode, offset, length, width, height, xOffset, yOffset, xAdvance, flags)
+    g = list(struct.unpack_from(GLYPH_FORMAT, self._map, self.glyphOffset + index * GLYPH_SIZE))
+    for i in (5, 6):
+      if g[i] > 127:
+        g[i] -= 256
+    return tuple(g)
+
+  def glyphs(self):
+    for i in range(self.count):
+      yield self.glyph(i)
+
+  def unicode(self, index):
+    return struct.unpack_from('<I', self._map, self.glyphOffset + index * GLYPH_SIZE)[0]
+
+  def find(self, unicode):#Return the index of the glyph of unicode, -1 if the font does not have it
+    lo, hi = 0, self.count
+    if self.indexOffset:
+      block = (unicode >> BLOCK_SHIFT) - self.firstBlock
+      if block < 0 or block >= self.blockCount:
+        return -1
+      lo, hi = struct.unpack_from('<II', self._map, self.indexOffset + 4 * block)
+    while lo < hi:
+      mid = (lo + hi) // 2
+      if self.unicode(mid) < unicode:
+        lo = mid + 1
+      else:
+        hi = mid
+    if lo < self.count and self.unicode(lo) == unicode:
+      return lo
+    return -1
+
+  def bitmap(self, index):#Return the glyph data of one glyph as a memoryview into the file
+    g = self.glyph(index)
+    start = self.bitmapOffset + g[1]
+    return memoryview(self._map)[start:start + g[2]]
+
+  def glyphCodec(self, index):
+    if self.codec == fontcodec.CODEC_MIXED:
+      return self.glyph(index)[8]
+    return self.codec
+
+  def pixels(self, index):#Return the decoded pixels (0/1, width * height) of one glyph
+    g = self.glyph(index)
+    return fontcodec.decodeGlyph(self.glyphCodec(index), self.bitmap(index), g[3], g[4])
+
+  def verify(self):#Return a list of problems found in the file, empty if it is fine
+    errors = []
+    if self.version != FONT_BIN_VERSION:
+      errors.append("unknown version %d" %self.version)
+    if self.glyphOffset % 4 or self.bitmapOffset % 4:
+      errors.append("section not aligned")
+    if self.glyphOffset + self.count * GLYPH_SIZE > self.bitmapOffset:
+      errors.append("glyph table overlaps the bitmap")
+    if self.bitmapOffset + self.bitmapSize > len(self._map):
+      errors.append("bitmap runs past the end of the file")
+      return errors
+    offset = 0
+    previous = -1
+    for i in range(self.count):
+      g = self.glyph(i)
+      if g[0] <= previous:
+        errors.append("glyph %#x: glyph table not sorted" %g[0])
+      previous = g[0]
+      if self.indexOffset and self.find(g[0]) != i:
+        errors.append("glyph %#x: not found through the block index" %g[0])
+      if g[1] != offset:
+        errors.append("glyph %#x: offset %d, expected %d" %(g[0], g[1], offset))
+      offset = g[1] + g[2]
+      if offset > self.bitmapSize:
+        errors.append("glyph %#x: data past the end of the bitmap" %g[0])
+        break
+      try:
+        self.pixels(i)
+      except ValueError as e:
+        errors.append("glyph %#x: %s" %(g[0], e))
+    if offset != self.bitmapSize:
+      errors.append("bitmap size %d, glyphs use %d" %(self.bitmapSize, offset))
+    return errors
+
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2:
+    print("Usage: python fontbin.py font/xxx.bin ...")
+    sys.exit(1)
+  failed = 0
+  for filename in sys.argv[1:]:
+    with FontBin(filename) as font:
+      errors = font.verify()
+      print("%s: %d glyphs, yAdvance %d, bitmap %d bytes, file %d bytes" %(
+            os.path.basename(filename), font.count, font.yAdvance, font.bitmapSize, os.path.getsize(filename)))
+      for e in errors:
+        print("  " + e)
+      if errors:
+        failed += 1
+  sys.exit(1 if failed else 0)
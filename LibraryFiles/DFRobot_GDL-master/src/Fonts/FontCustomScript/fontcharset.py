@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Collect the set of characters a font has to contain.
+
+Text files are read in chunks, so the whole file never has to be in memory. The
+encoding comes from the BOM, or from a sample at the start of the file (utf-8 is
+tried first, chardet is only asked when the sample is not utf-8). When the rest
+of the file turns out not to be in that encoding, chardet is asked again with the
+whole file. Sketches (.ino,
+.c, .cpp, .h) only contribute the characters of their string literals.
+
+  python fontcharset.py text.txt ../../../../../examples/Concentration_detection/Concentration_detection.ino
+'''
+import re
+import sys
+import codecs
+
+SAMPLE_SIZE = 64 * 1024
+CHUNK_SIZE = 256 * 1024
+SKETCH_SUFFIX = ('.ino', '.c', '.cpp', '.h')
+SKIP_CHARS = set(chr(c) for c in range(0x20)) | set(u'\ufeff')#Control characters (\r, \n, an escaped \0) have no glyph
+
+BOM_LIST = [(codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+            (codecs.BOM_UTF8, 'utf-8-sig'),
+            (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')]
+
+#String literal, char literal, comment or #include line, only the first group is kept
+SKETCH_TOKEN = re.compile(r'"((?:[^"\\\n]|\\.)*)"|\'(?:[^\'\\\n]|\\.)*\'|//[^\n]*|/\*.*?\*/|^[ \t]*#[ \t]*include[^\n]*',
+                          re.S | re.M)
+SKETCH_ESCAPE = re.compile(r'\\(x[0-9a-fA-F]+|[0-7]{1,3}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)', re.S)
+
+def detectEncoding(sample, whole = False):#Return the encoding of a file from its first bytes, or from all of them
+  for bom, encoding in BOM_LIST:
+    if sample.startswith(bom):
+      return encoding
+  try:
+    codecs.getincrementaldecoder('utf-8')().decode(sample, whole)#A character cut at the end of the sample is not an error
+    return 'utf-8'
+  except UnicodeDecodeError:
+    pass
+  import chardet
+  encoding = chardet.detect(sample)['encoding']
+  if encoding is None:
+    raise ValueError("unable to detect the encoding")
+  return encoding
+
+def unescape(m):
+  s = m.group(1)
+  if s[0] in 'xuU':
+    if len(s) == 1:
+      return s#No hex digits, keep the letter
+    try:
+      return chr(int(s[1:], 16))
+    except (ValueError, OverflowError):#Beyond U+10FFFF
+      return s
+  if s[0] in '01234567':
+    return chr(int(s, 8))
+  if s in '"\'\\?':
+    return s
+  return ''#\n, \t and the like
+
+
+class CharSet(object):
+  '''
+  The unique characters seen so far. Adding text costs one set operation per
+  chunk, the order of the characters is not kept (the glyphs are sorted anyway).
+  '''
+  def __init__(self):
+    self._chars = set()
+
+  def __len__(self):
+    return len(self._chars)
+
+  def __contains__(self, c):
+    return c in self._chars
+
+  def add(self, text):
+    self._chars.update(text)
+    self._chars.difference_update(SKIP_CHARS)
+
+  def addFile(self, filename, encoding = None):
+    if encoding is not None:
+      self.add(self._readChars(filename, encoding))
+      return
+    fp = open(filename, 'rb')
+    encoding = detectEncoding(fp.read(SAMPLE_SIZE))
+    fp.close()
+    try:
+      self.add(self._readChars(filename, encoding))
+    except UnicodeDecodeError:#Only the sample was in that encoding, look at the whole file
+      fp = open(filename, 'rb')
+      data = fp.read()
+      fp.close()
+      ascii = len(data) - len(data.lstrip(bytes(bytearray(range(0x80)))))
+      encoding = detectEncoding(data[ascii:], True)#The ascii start reads the same in any encoding, it would only mislead chardet
+      try:
+        self.add(data.decode(encoding))
+      except UnicodeDecodeError:
+        print("Warning: %s is not all %s, the characters that are not were left out" %(filename, encoding))
+        self.add(data.decode(encoding, 'replace').replace(u'\ufffd', u''))
+
+  def _readChars(self, filename, encoding):#The characters of a file, chunk by chunk
+    chars = set()
+    fp = open(filename, 'rb')
+    try:
+      decoder = codecs.getincrementaldecoder(encoding)()
+      data = fp.read(SAMPLE_SIZE)
+      while data:
+        chars.update(decoder.decode(data, False))
+        data = fp.read(CHUNK_SIZE)
+      chars.update(decoder.decode(b'', True))
+    finally:
+      fp.close()
+    return chars
+
+  def addSketch(self, filename, encoding = 'utf-8'):
+    fp = open(filename, 'r', encoding = encoding)
+    text = fp.read()
+    fp.close()
+    for m in SKETCH_TOKEN.finditer(text):
+      if m.group(1):
+        self.add(SKETCH_ESCAPE.sub(unescape, m.group(1)))
+
+  def addSource(self, filename):#Sketches by their suffix, everything else as text
+    if filename.lower().endswith(SKETCH_SUFFIX):
+      self.addSketch(filename)
+    else:
+      self.addFile(filename)
+
+  def chars(self):
+    return sorted(self._chars)
+
+  def text(self):
+    return ''.join(self.chars())
+
+
+if __name__ == '__main__':
+  charSet = CharSet()
+  for filename in sys.argv[1:]:
+    charSet.addSource(filename)
+  print("%d characters" %len(charSet))
+  print(charSet.text())
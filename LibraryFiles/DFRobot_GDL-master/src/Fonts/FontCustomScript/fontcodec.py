@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Glyph bitmap codecs of the binary font file.
+
+  rle4  id 0  two runs per byte, bit 3 of each nibble is the colour, bits 0~2 the
+              length (1~7), ends with 0x00. The format of the .h files, drawn by
+              DFRobot_GDL::drawCharBitmaps
+  rle8  id 1  one run per byte, bit 7 is the colour, bits 0~6 the length (1~127)
+  raw1  id 2  1 bit per pixel, MSB first, rows are not padded
+
+FontCodec in config.txt selects the codec of the .bin file:
+  rle4/rle8/raw1  every glyph with that codec
+  font            the codec with the best score over the whole font
+  glyph           the best codec of each glyph, kept in the flags of the glyph
+The score is size + COST_WEIGHT * estimated decode steps, so a codec that is a
+little smaller but much slower to draw is not taken. The .h file is always rle4.
+
+  python fontcodec.py font/xxx.bin ...    flash bytes of every codec and selection
+'''
+import sys
+import itertools
+
+CODEC_RLE4 = 0
+CODEC_RLE8 = 1
+CODEC_RAW1 = 2
+CODEC_MIXED = 0xFF
+COST_WEIGHT = 0.125
+
+def getRuns(pixels, maxRun):#Return [(colour, length)], no run longer than maxRun
+  runs = []
+  for colour, group in itertools.groupby(bool(p) for p in pixels):
+    n = sum(1 for i in group)
+    while n > maxRun:
+      runs.append((colour, maxRun))
+      n -= maxRun
+    runs.append((colour, n))
+  return runs
+
+def encodeRle4(pixels):
+  if len(pixels) == 0:
+    return []
+  nibbles = [(8 if colour else 0) | n for colour, n in getRuns(pixels, 7)]
+  if len(nibbles) % 2:
+    nibbles.append(0)
+  data = [(nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2)]
+  data.append(0)
+  return data
+
+def decodeRle4(data, count):
+  pixels = []
+  for b in data:
+    for nibble in (b >> 4, b & 0x0F):
+      pixels += [nibble >> 3] * (nibble & 0x07)
+  return pixels
+
+def encodeRle8(pixels):
+  return [(0x80 if colour else 0) | n for colour, n in getRuns(pixels, 127)]
+
+def decodeRle8(data, count):
+  pixels = []
+  for b in data:
+    pixels += [b >> 7] * (b & 0x7F)
+  return pixels
+
+def encodeRaw1(pixels):
+  data = [0] * ((len(pixels) + 7) // 8)
+  for i, p in enumerate(pixels):
+    if p:
+      data[i >> 3] |= 0x80 >> (i & 7)
+  return data
+
+def decodeRaw1(data, count):
+  return [(data[i >> 3] >> (7 - (i & 7))) & 1 for i in range(min(count, len(data) * 8))]
+
+
+class Codec(object):
+  def __init__(self, id, name, encode, decode, cost):
+    self.id = id
+    self.name = name
+    self.encode = encode#encode(pixels) -> [byte]
+    self.decode = decode#decode(data, pixel count) -> [0/1]
+    self.cost = cost#cost(data, width, rows) -> estimated decode steps
+
+CODECS = [
+  Codec(CODEC_RLE4, 'rle4', encodeRle4, decodeRle4, lambda data, w, h: 2 * len(data) + h),
+  Codec(CODEC_RLE8, 'rle8', encodeRle8, decodeRle8, lambda data, w, h: len(data) + h),
+  Codec(CODEC_RAW1, 'raw1', encodeRaw1, decodeRaw1, lambda data, w, h: w * h),
+]
+CODEC_NAMES = dict((c.name, c) for c in CODECS)
+
+def getCodec(id):
+  for c in CODECS:
+    if c.id == id:
+      return c
+  raise ValueError("unknown codec %#x" %id)
+
+def score(data, cost, weight = COST_WEIGHT):
+  return len(data) + weight * cost
+
+def encodeAll(pixels, width, rows):#Return [(codec, data, cost)] of every codec
+  result = []
+  for c in CODECS:
+    data = c.encode(pixels)
+    result.append((c, data, c.cost(data, width, rows)))
+  return result
+
+def decodeGlyph(id, data, width, rows):#Return the pixels, raise ValueError if data does not hold width * rows pixels
+  pixels = getCodec(id).decode(data, width * rows)
+  if len(pixels) != width * rows:
+    raise ValueError("%d pixels, expected %dx%d" %(len(pixels), width, rows))
+  return pixels
+
+def encodeFont(glyphs, mode = 'rle4', weight = COST_WEIGHT):
+  '''
+  glyphs: [(rle4 data, width, rows)] as written in the .h file
+  mode: a codec name, 'font' or 'glyph'
+  return (header codec id, [(codec id, data)])
+  '''
+  if mode in CODEC_NAMES:
+    codec = CODEC_NAMES[mode]
+    result = []
+    for data, width, rows in glyphs:
+      if codec.id == CODEC_RLE4:
+        result.append((codec.id, list(data)))
+      else:
+        result.append((codec.id, codec.encode(decodeGlyph(CODEC_RLE4, data, width, rows))))
+    return codec.id, result
+  if mode not in ['font', 'glyph']:
+    raise ValueError("unknown codec %s" %mode)
+  candidates = [encodeAll(decodeGlyph(CODEC_RLE4, data, width, rows), width, rows) for data, width, rows in glyphs]
+  if mode == 'glyph':
+    result = []
+    for cl in candidates:
+      c, data, cost = min(cl, key = lambda x: score(x[1], x[2], weight))
+      result.append((c.id, data))
+    return CODEC_MIXED, result
+  total = [0.0] * len(CODECS)
+  for cl in candidates:
+    for i, (c, data, cost) in enumerate(cl):
+      total[i] += score(data, cost, weight)
+  index = total.index(min(total))
+  return CODECS[index].id, [(CODECS[index].id, cl[index][1]) for cl in candidates]
+
+def report(glyphs, weight = COST_WEIGHT):#Return [(name, bytes, decode steps)] of every codec and of the selections
+  rows = []
+  for mode in [c.name for c in CODECS] + ['font', 'glyph']:
+    id, encoded = encodeFont(glyphs, mode, weight)
+    size = 0
+    cost = 0
+    for (gid, data), (rle, width, h) in zip(encoded, glyphs):
+      size += len(data)
+      cost += getCodec(gid).cost(data, width, h)
+    if mode == 'font':
+      mode = 'font (%s)' %getCodec(id).name
+    rows.append((mode, size, cost))
+  return rows
+
+
+if __name__ == '__main__':
+  import fontbin
+  if len(sys.argv) < 2:
+    print("Usage: python fontcodec.py font/xxx.bin ...")
+    sys.exit(1)
+  for filename in sys.argv[1:]:
+    with fontbin.FontBin(filename) as font:
+      glyphs = []
+      for i in range(font.count):
+        g = font.glyph(i)
+        codec = g[8] if font.codec == CODEC_MIXED else font.codec
+        pixels = decodeGlyph(codec, font.bitmap(i), g[3], g[4])
+        glyphs.append((encodeRle4(pixels), g[3], g[4]))
+    rows = report(glyphs)
+    print("%s: %d glyphs" %(filename, len(glyphs)))
+    print("  %-12s %10s %10s %12s" %('codec', 'bytes', 'saved', 'decode steps'))
+    for name, size, cost in rows:
+      print("  %-12s %10d %10d %12d" %(name, size, rows[0][1] - size, cost))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Decode the fonts made by setup.py on the PC, the same way DFRobot_GDL draws them.
+
+  python fontdecode.py font/xxx.h --text "CO2 ppm" --ppm out.ppm
+      draw text into a 172x320 RGB565 frame buffer (ST7789 of the keychain)
+  python fontdecode.py font/xxx.h --ttf ttf/xxx.ttf --size 24
+      compare every glyph with the bitmap FreeType renders
+  python fontdecode.py font/xxx.bin --bench 3
+      glyphs decoded per second
+
+Both the .h and the .bin files can be read.
+'''
+import re
+import sys
+import time
+import argparse
+import numpy as np
+import fontbin
+import fontcodec
+
+SCREEN_WIDTH = 172
+SCREEN_HEIGHT = 320
+COLOR_RGB565_BLACK = 0x0000
+COLOR_RGB565_WHITE = 0xFFFF
+
+def rgb565(r, g, b):
+  return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+def decodeRle4(data, width, rows):
+  data = np.frombuffer(bytes(data), dtype = np.uint8)
+  nibbles = np.empty(len(data) * 2, dtype = np.uint8)
+  nibbles[0::2] = data >> 4
+  nibbles[1::2] = data & 0x0F
+  return np.repeat(nibbles >> 3, nibbles & 0x07)
+
+def decodeRle8(data, width, rows):
+  data = np.frombuffer(bytes(data), dtype = np.uint8)
+  return np.repeat(data >> 7, data & 0x7F)
+
+def decodeRaw1(data, width, rows):
+  return np.unpackbits(np.frombuffer(bytes(data), dtype = np.uint8))[:width * rows]
+
+DECODERS = {fontcodec.CODEC_RLE4: decodeRle4, fontcodec.CODEC_RLE8: decodeRle8, fontcodec.CODEC_RAW1: decodeRaw1}
+
+def decodeGlyph(codec, data, width, rows):#Return the glyph as a (rows, width) array of 0/1
+  pixels = DECODERS[codec](data, width, rows)
+  if len(pixels) != width * rows:
+    raise ValueError("%d pixels, expected %dx%d" %(len(pixels), width, rows))
+  return pixels.reshape(rows, width)
+
+def getNumbers(text):
+  return [int(n, 16) if 'x' in n else int(n) for n in re.findall(r'-?0x[0-9a-fA-F]+|-?\d+', text)]
+
+
+class HostFont(object):
+  '''
+  A font in memory: glyphs[unicode] = (offset, length, width, height, xOffset, yOffset, xAdvance, codec)
+  '''
+  def __init__(self, bitmap, glyphs, yAdvance, name = ''):
+    self.bitmap = bytes(bitmap)
+    self.glyphs = glyphs
+    self.yAdvance = yAdvance
+    self.name = name
+
+  @classmethod
+  def fromHeader(cls, filename):#Parse the xxxBitmaps[], xxxGlyphs[] and xxx arrays of a .h file
+    fp = open(filename, 'r')
+    text = fp.read()
+    fp.close()
+    m = re.search(r'const uint8_t ([^\s\[]+)Bitmaps\[\] PROGMEM = \{(.*?)\};', text, re.S)
+    if m is None:
+      raise ValueError("%s: no Bitmaps array, not a generated font header" %filename)
+    bitmap = getNumbers(m.group(2))
+    name = m.group(1)
+    m = re.search(r'const gdl_Glyph_t [^\s\[]+Glyphs\[\] PROGMEM = \{(.*?)\n\};', text, re.S)
+    if m is None:
+      raise ValueError("%s: no Glyphs array, not a generated font header" %filename)
+    rows = re.findall(r'\{([^{}]*)\}', m.group(1))
+    glyphs = {}
+    offset = 0
+    for row in rows[1:]:#The first row is the summary of the font
+      v = getNumbers(row)
+      if len(v) < 7:#{0} ends the table
+        break
+      glyphs[v[0]] = (offset, v[1], v[2], v[3], v[4], v[5], v[6], fontcodec.CODEC_RLE4)
+      offset += v[1]
+    m = re.search(r'const gdl_Font_t [^\s\[]+ PROGMEM = \{(.*?)\};', text, re.S)
+    if m is None:
+      raise ValueError("%s: no gdl_Font_t, not a generated font header" %filename)
+    yAdvance = getNumbers(m.group(1).split(',', 2)[2])[-1]
+    return cls(bitmap, glyphs, yAdvance, name)
+
+  @classmethod
+  def fromBin(cls, filename):
+    with fontbin.FontBin(filename) as font:
+      glyphs = {}
+      for i in range(font.count):
+        g = font.glyph(i)
+        glyphs[g[0]] = g[1:8] + (font.glyphCodec(i),)
+      bitmap = b''.join(bytes(font.bitmap(i)) for i in range(font.count))
+      return cls(bitmap, glyphs, font.yAdvance, filename)
+
+  @classmethod
+  def load(cls, filename):
+    if filename.lower().endswith('.bin'):
+      return cls.fromBin(filename)
+    return cls.fromHeader(filename)
+
+  def decode(self, unicode):#Return the glyph of unicode as a (rows, width) array
+    g = self.glyphs[unicode]
+    return decodeGlyph(g[7], self.bitmap[g[0]:g[0] + g[1]], g[2], g[3])
+
+
+class FrameBuffer(object):
+  '''
+  RGB565 frame buffer, draws text like DFRobot_GDL::write with a gdl_Font_t font.
+  '''
+  def __init__(self, width = SCREEN_WIDTH, height = SCREEN_HEIGHT, color = COLOR_RGB565_BLACK):
+    self.width = width
+    self.height = height
+    self.pixels = np.full((height, width), color, dtype = np.uint16)
+    self.cursorX = 0
+    self.cursorY = 0
+    self.wrap = True
+
+  def fill(self, color):
+    self.pixels[:, :] = color
+
+  def fillRect(self, x, y, w, h, color):
+    self.pixels[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)] = color
+
+  def drawChar(self, font, unicode, x, y, fg, bg):
+    g = font.glyphs[unicode]
+    if x >= self.width or y + font.yAdvance >= self.height:
+      return
+    if fg != bg:
+      self.fillRect(x, y, g[6], font.yAdvance, bg)
+    mask = font.decode(unicode).astype(bool)
+    x += g[4]
+    y += g[5]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + g[2], self.width), min(y + g[3], self.height)
+    if x0 < x1 and y0 < y1:
+      area = self.pixels[y0:y1, x0:x1]
+      area[mask[y0 - y:y1 - y, x0 - x:x1 - x]] = fg
+
+  def drawText(self, font, text, fg = COLOR_RGB565_WHITE, bg = COLOR_RGB565_BLACK):#Draw at the cursor, return the characters drawn
+    n = 0
+    for c in text:
+      if c == '\n':
+        self.cursorX = 0
+        self.cursorY += font.yAdvance
+        continue
+      if c == '\r' or ord(c) not in font.glyphs:
+        continue
+      g = font.glyphs[ord(c)]
+      if self.wrap and self.cursorX + g[6] > self.width:
+        self.cursorX = 0
+        self.cursorY += font.yAdvance
+      self.drawChar(font, ord(c), self.cursorX, self.cursorY, fg, bg)
+      self.cursorX += g[6]
+      n += 1
+    return n
+
+  def toBytes(self):#Pixels as sent over SPI, big-endian RGB565
+    return self.pixels.astype('>u2').tobytes()
+
+  def savePPM(self, filename):
+    p = self.pixels.astype(np.uint32)
+    rgb = np.empty((self.height, self.width, 3), dtype = np.uint8)
+    rgb[:, :, 0] = ((p >> 11) & 0x1F) * 255 // 31
+    rgb[:, :, 1] = ((p >> 5) & 0x3F) * 255 // 63
+    rgb[:, :, 2] = (p & 0x1F) * 255 // 31
+    fp = open(filename, 'wb')
+    fp.write(b'P6\n%d %d\n255\n' %(self.width, self.height))
+    fp.write(rgb.tobytes())
+    fp.close()
+
+
+def compareFreeType(font, ttf, size):#Return a list of glyphs that differ from what FreeType renders
+  import freetype
+  face = freetype.Face(ttf)
+  face.set_char_size(size * 64)
+  errors = []
+  for unicode in sorted(font.glyphs):
+    g = font.glyphs[unicode]
+    face.load_char(chr(unicode), freetype.FT_LOAD_RENDER)
+    bitmap = face.glyph.bitmap
+    if (bitmap.width, bitmap.rows, face.glyph.bitmap_left) != (g[2], g[3], g[4]):
+      errors.append("%#x: size %dx%d%+d, FreeType %dx%d%+d" %(unicode, g[2], g[3], g[4],
+                    bitmap.width, bitmap.rows, face.glyph.bitmap_left))
+      continue
+    expected = np.array(bitmap.buffer, dtype = np.uint8).reshape(bitmap.rows, bitmap.pitch)[:, :bitmap.width] > 0
+    try:
+      decoded = font.decode(unicode).astype(bool)
+    except ValueError as e:
+      errors.append("%#x: %s" %(unicode, e))
+      continue
+    if not np.array_equal(decoded, expected):
+      errors.append("%#x: %d pixels differ" %(unicode, np.count_nonzero(decoded != expected)))
+  return errors
+
+def bench(font, seconds = 1.0):#Return glyphs decoded per second
+  codes = list(font.glyphs)
+  if not codes:
+    return 0.0
+  n = 0
+  start = time.perf_counter()
+  while time.perf_counter() - start < seconds:
+    for unicode in codes:
+      font.decode(unicode)
+    n += len(codes)
+  return n / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Decode and draw a font made by setup.py')
+  parser.add_argument('font', help = 'font/xxx.h or font/xxx.bin')
+  parser.add_argument('--text', help = 'text to draw into the frame buffer')
+  parser.add_argument('--ppm', help = 'save the frame buffer as a PPM picture')
+  parser.add_argument('--raw', help = 'save the frame buffer as RGB565 bytes')
+  parser.add_argument('--ttf', help = 'compare the glyphs with this TrueType file')
+  parser.add_argument('--size', type = int, default = 24, help = 'font size of --ttf')
+  parser.add_argument('--bench', type = float, default = 0, help = 'seconds to measure the decode speed')
+  args = parser.parse_args()
+
+  font = HostFont.load(args.font)
+  print("%s: %d glyphs, yAdvance %d, bitmap %d bytes" %(font.name, len(font.glyphs), font.yAdvance, len(font.bitmap)))
+  failed = False
+  if args.ttf:
+    errors = compareFreeType(font, args.ttf, args.size)
+    for e in errors:
+      print("  " + e)
+    print("FreeType compare: %d of %d glyphs differ" %(len(errors), len(font.glyphs)))
+    failed = len(errors) > 0
+  if args.text is not None:
+    fb = FrameBuffer()
+    n = fb.drawText(font, args.text.replace('\\n', '\n'))
+    print("%d characters drawn" %n)
+    if args.ppm:
+      fb.savePPM(args.ppm)
+    if args.raw:
+      fp = open(args.raw, 'wb')
+      fp.write(fb.toBytes())
+      fp.close()
+  if args.bench > 0:
+    print("%.0f glyphs decoded per second" %bench(font, args.bench))
+  sys.exit(1 if failed else 0)
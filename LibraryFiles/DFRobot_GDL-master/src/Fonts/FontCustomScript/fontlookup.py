@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compare the cost of finding a glyph in the old layout (glyphs in text.txt order,
+scanned one by one while the bitmap offset is summed up, as DFRobot_GDL::write does)
+with the sorted glyph table (binary search) and the block index.
+
+  python fontlookup.py                  3500 random CJK glyphs
+  python fontlookup.py font/xxx.bin     the glyphs of a binary font file
+
+The glyph entries read per lookup is what matters on the board, the host time
+is printed as well.
+'''
+import sys
+import time
+import random
+import fontbin
+
+def linearLookup(glyphs, unicode):#glyphs: [(unicode, length)] in text order, return (offset, entries read)
+  offset = 0
+  n = 0
+  for g in glyphs:
+    n += 1
+    if g[0] == unicode:
+      return offset, n
+    offset += g[1]
+  return -1, n
+
+def sortedLookup(codes, offsets, unicode, lo = 0, hi = None):#codes sorted ascending, return (offset, entries read)
+  if hi is None:
+    hi = len(codes)
+  n = 0
+  while lo < hi:
+    mid = (lo + hi) // 2
+    n += 1
+    if codes[mid] < unicode:
+      lo = mid + 1
+    else:
+      hi = mid
+  n += 1
+  if lo < len(codes) and codes[lo] == unicode:
+    return offsets[lo], n
+  return -1, n
+
+def blockLookup(codes, offsets, firstBlock, starts, unicode):#return (offset, entries read)
+  block = (unicode >> fontbin.BLOCK_SHIFT) - firstBlock
+  if block < 0 or block >= len(starts) - 1:
+    return -1, 0
+  offset, n = sortedLookup(codes, offsets, unicode, starts[block], starts[block + 1])
+  return offset, n + 2
+
+def readGlyphs(filename = None, count = 3500):#Return [(unicode, length)] in sorted order
+  if filename:
+    with fontbin.FontBin(filename) as font:
+      return [(g[0], g[2]) for g in font.glyphs()]
+  rnd = random.Random(0)
+  codes = sorted(rnd.sample(range(0x4e00, 0x9fa6), count))
+  return [(c, rnd.randint(40, 160)) for c in codes]
+
+def bench(glyphs, lookups = 20000):
+  codes = [g[0] for g in glyphs]
+  offsets = []
+  length = 0
+  for g in glyphs:
+    offsets.append(length)
+    length += g[1]
+  firstBlock, starts = fontbin.buildBlockIndex(codes)
+  rnd = random.Random(1)
+  textOrder = list(glyphs)
+  rnd.shuffle(textOrder)
+  queries = [rnd.choice(codes) for i in range(lookups)]
+  layouts = [
+    ('text order, linear', lambda u: linearLookup(textOrder, u)),
+    ('sorted, binary search', lambda u: sortedLookup(codes, offsets, u)),
+    ('sorted, block index', lambda u: blockLookup(codes, offsets, firstBlock, starts, u)),
+  ]
+  result = []
+  for name, lookup in layouts:
+    n = 0
+    t = time.perf_counter()
+    for u in queries:
+      n += lookup(u)[1]
+    t = time.perf_counter() - t
+    result.append((name, float(n) / lookups, t * 1e6 / lookups))
+  return result
+
+
+if __name__ == '__main__':
+  glyphs = readGlyphs(sys.argv[1] if len(sys.argv) > 1 else None)
+  print("%d glyphs" %len(glyphs))
+  print("%-24s %16s %12s" %('layout', 'entries/lookup', 'us/lookup'))
+  for name, n, us in bench(glyphs):
+    print("%-24s %16.1f %12.2f" %(name, n, us))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Keep the font files up to date while text.txt, config.txt, the FontSourceList
+files and the ttf folder are edited.
+
+  python fontwatch.py              watch until Ctrl+C
+  python fontwatch.py --once       build what is out of date and exit
+
+Each output (font/<prefix><name>Font<size>pt.h/.bin) depends on its truetype
+file, its size, the characters, the prefix and the FontOutputMode,
+FontGlyphIndex and FontCodec settings. Only the outputs whose inputs changed
+are written again, also after a restart: the inputs of each output are kept
+in font/.fontwatch.json. The FreeType faces and the glyphs already rendered stay in
+memory between builds, so adding a few characters to text.txt only renders
+those characters.
+'''
+import os
+import sys
+import time
+import json
+import hashlib
+import argparse
+import setup
+
+TTF_PATH = 'ttf'
+FONT_PATH = 'font'
+STAMP_FILE = '.fontwatch.json'#In the font folder, the inputs each output was built from
+
+def fileStat(filename):
+  try:
+    st = os.stat(filename)
+    return (st.st_mtime_ns, st.st_size)
+  except OSError:
+    return None
+
+
+class FontWatcher(object):
+  def __init__(self, ttfPath = TTF_PATH, fontPath = FONT_PATH):
+    self.ttfPath = ttfPath
+    self.fontPath = fontPath
+    self._faces = {}#(ttf, size) -> (ttf stat, face, {character: glyph dict})
+    self._built = self.loadStamp()#output path -> inputs it was built from
+    self._sourceList = []
+    self._fontText = None
+
+  def loadStamp(self):
+    try:
+      with open(os.path.join(self.fontPath, STAMP_FILE)) as fp:
+        stamp = json.load(fp)
+    except (IOError, OSError, ValueError):#No stamp yet or a broken one, everything is built again
+      return {}
+    return dict((os.path.join(self.fontPath, name), inputs) for name, inputs in stamp.items())
+
+  def saveStamp(self):
+    stamp = dict((os.path.basename(path), inputs) for path, inputs in self._built.items())
+    filename = os.path.join(self.fontPath, STAMP_FILE)
+    with open(filename + '.tmp', 'w') as fp:
+      json.dump(stamp, fp, indent = 1, sort_keys = True)
+    os.replace(filename + '.tmp', filename)#Never a half-written stamp
+
+  def snapshot(self):#The state of every input file, a build is needed when it changes
+    files = ['config.txt', 'text.txt'] + list(self._sourceList)
+    state = [(f, fileStat(f)) for f in files]
+    if os.path.isdir(self.ttfPath):
+      for ttf in sorted(os.listdir(self.ttfPath)):
+        state.append((ttf, fileStat(os.path.join(self.ttfPath, ttf))))
+    return state
+
+  def getFace(self, src, size):
+    st = fileStat(src)
+    key = (src, size)
+    if key not in self._faces or self._faces[key][0] != st:
+      self._faces[key] = (st, setup.openFace(src, size), {})
+    return self._faces[key][1], self._faces[key][2]
+
+  def outputsExist(self, path, mode):
+    if mode != 'binary' and not os.path.exists(path + '.h'):
+      return False
+    if mode != 'header' and not os.path.exists(path + '.bin'):
+      return False
+    return True
+
+  def removeStale(self, path, mode):#Delete the output the mode no longer writes, it would look up to date
+    stale = {'header': ['.bin'], 'binary': ['.h']}.get(mode, [])
+    for suffix in stale:
+      if os.path.exists(path + suffix):
+        os.remove(path + suffix)
+
+  def build(self):#Write the outputs that are out of date, return [(output, seconds)]
+    fontDict = setup.getFontDict()
+    self._sourceList = fontDict['FontSourceList']
+    charHash = hashlib.sha1(''.join(fontDict['charList']).encode('utf-8')).hexdigest()
+    options = (fontDict['FontFileNamePre'], fontDict['FontOutputMode'], fontDict['FontGlyphIndex'], fontDict['FontCodec'])
+    built = []
+    lines = []
+    used = set()
+    if not os.path.isdir(self.fontPath):
+      os.makedirs(self.fontPath)
+    for ttf in sorted(os.listdir(self.ttfPath)):
+      (filename, suffix) = os.path.splitext(ttf)
+      if suffix.upper() != '.TTF':
+        continue
+      src = os.path.join(self.ttfPath, ttf)
+      for size in fontDict['FontSizeList']:
+        path = os.path.join(self.fontPath, fontDict['FontFileNamePre'] + filename + "Font" + str(size) + 'pt')
+        inputs = json.loads(json.dumps((fileStat(src), size, charHash, options)))#As read back from the stamp
+        used.add((src, size))
+        self.removeStale(path, fontDict['FontOutputMode'])
+        if self._built.get(path) == inputs and self.outputsExist(path, fontDict['FontOutputMode']):
+          if fontDict['FontOutputMode'] != 'binary':
+            lines.append("#include \"Fonts/" + os.path.basename(path) + '.h"\n')
+          continue
+        t = time.perf_counter()
+        face, cache = self.getFace(src, size)
+        lines.append(setup.writeFont(fontDict, src, path, size, face, cache))
+        self._built[path] = inputs
+        built.append((path, time.perf_counter() - t))
+    if built:
+      self.saveStamp()
+    for key in list(self._faces):
+      if key not in used:
+        del self._faces[key]
+    text = ''.join(lines)
+    if text != self._fontText:
+      fp = open('font.txt', 'w+')
+      fp.write(text)
+      fp.close()
+      self._fontText = text
+    return built
+
+  def run(self, interval = 0.5, once = False):
+    last = None
+    while True:
+      state = self.snapshot()
+      if state != last:
+        t = time.perf_counter()
+        try:
+          built = self.build()
+        except Exception as e:#A half-saved config.txt or text.txt, try again on the next change
+          print("Build failed: %s" %e)
+          built = []
+        for path, seconds in built:
+          print("  %s  %.2f s" %(path, seconds))
+        if built:
+          print("%d file(s) updated in %.2f s" %(len(built), time.perf_counter() - t))
+        last = state
+      if once:
+        return
+      time.sleep(interval)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Rebuild the fonts when their inputs change')
+  parser.add_argument('--interval', type = float, default = 0.5, help = 'seconds between checks')
+  parser.add_argument('--once', action = 'store_true', help = 'build once and exit')
+  args = parser.parse_args()
+  setup.setup()
+  if not [f for f in os.listdir(TTF_PATH) if f.upper().endswith('.TTF')]:
+    print("Failed! Please add truetype file with the extension .ttf in the ttf folder.")
+    sys.exit(1)
+  print("Watching config.txt, text.txt and the ttf folder, press Ctrl+C to stop")
+  try:
+    FontWatcher().run(args.interval, args.once)
+  except KeyboardInterrupt:
+    pass
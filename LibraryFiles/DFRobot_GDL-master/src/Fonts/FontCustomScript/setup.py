@@ -7,7 +7,9 @@ import math
 import os
 import codecs
 import copy
-import chardet
+import fontbin
+import fontcharset
+import fontcodec
 
 def setup():
   if not os.path.exists('ttf'):
@@ -18,6 +20,10 @@ def setup():
     fp = open('config.txt', 'w+')
     s = "FontFileNamePre = default\n"
     s += "FontSizeList = [12,18,24,36,48,72]\n"
+    s += "FontOutputMode = header\n"
+    s += "FontGlyphIndex = none\n"
+    s += "FontSourceList = []\n"
+    s += "FontCodec = rle4\n"
     fp.write(s)
     fp.close()
   if not os.path.exists('text.txt'):
@@ -31,22 +37,17 @@ def setup():
     fp.write(s)
     fp.close()
 
-def readText():
+def readText(sourceList = []):#Return the unique characters of text.txt and the source files as a list of one string
+  charSet = fontcharset.CharSet()
   if os.path.exists('text.txt'):
-    fp = open('text.txt', 'rb')
-    r = fp.read()
-    fp.close();
-    f_charInfo = chardet.detect(r)
-    fp = open('text.txt', 'r', encoding=f_charInfo['encoding'])
-    #print(f_charInfo)
-    charList = fp.readlines()
-    fp.close()
-    #charList = ["nihao"]
-    return charList
+    charSet.addFile('text.txt')
+  for filename in sourceList:
+    charSet.addSource(filename)
+  return [charSet.text()]
 
 def getFontDict():
   if os.path.exists('config.txt'):
-    fontDict ={'FontFileNamePre':'', 'FontSizeList':[], 'charList':[]}
+    fontDict ={'FontFileNamePre':'', 'FontSizeList':[], 'FontOutputMode':'', 'FontGlyphIndex':'', 'FontSourceList':'[]', 'FontCodec':'', 'charList':[]}
     fp = open('config.txt', 'r')
     configList = fp.readlines()
     fp.close()
@@ -70,63 +71,70 @@ def getFontDict():
       fontDict['FontFileNamePre'] = ""
     if len(fontDict['FontSizeList']) == 0:
       fontDict['FontSizeList'] = [12,18,24,36,48,72]
-    fontDict['charList'] = readText()
+    fontDict['FontOutputMode'] = fontDict['FontOutputMode'].lower()
+    if fontDict['FontOutputMode'] not in ['header', 'binary', 'both']:
+      fontDict['FontOutputMode'] = 'header'
+    fontDict['FontGlyphIndex'] = fontDict['FontGlyphIndex'].lower() == 'block'
+    fontDict['FontCodec'] = fontDict['FontCodec'].lower()
+    if fontDict['FontCodec'] not in list(fontcodec.CODEC_NAMES) + ['font', 'glyph']:
+      fontDict['FontCodec'] = 'rle4'
+    fontDict['FontSourceList'] = eval(fontDict['FontSourceList'])
+    fontDict['charList'] = readText(fontDict['FontSourceList'])
     return fontDict
 
-def parseFont(dstfilename, filename, lis, size = 12, angle = 0):
+def openFace(filename, size = 12, angle = 0):#Open the truetype file, set the size and the rotation
   face = freetype.Face(filename)
   face.set_char_size(size*64)
-  Font_height = face.size.height//72
-  Font_totallen = 0
-  
   angle = (angle/180.0)*math.pi
   matrix = FT_Matrix((int)( math.cos( angle ) * 0x10000),
                      (int)(-math.sin( angle ) * 0x10000),
                      (int)( math.sin( angle ) * 0x10000),
                      (int)( math.cos( angle ) * 0x10000))
-  flag = FT_LOAD_RENDER
   pen = FT_Vector(0,0)
   FT_Set_Transform( face._FT_Face, byref(matrix), byref(pen))
-  previous = 0
-  xmin, xmax = 0, 0
-  ymin, ymax = 0, 0
-  L = []
-  unicodeList = []
-  start = '{'
-  unicode = 0
-  length = 0
-  width = 0
-  rows = 0
-  xadvance = 0
-  xoffset = 0
-  yoffset = 0
-  end = '},\n'
-  maxAadvancex = 0
+  return face
+
+def renderGlyph(face, c):#Render one character, return its glyph dict, yoffset is filled in by loadGlyphs
+  dict1 = {"unicode":0, "length":0, "width":0, "rows":0, "xadvance":0, "yadvance":0, "xoffset":0, "yoffset":0, "top":0, "bitmap":[]}
+  dict1["unicode"] = getUnicode(c)[0]#hex will convert integer into string 
+  face.load_char(c, FT_LOAD_RENDER)
+  dict1["xadvance"] = face.glyph.metrics.horiAdvance//64
+  dict1["yadvance"] = face.glyph.metrics.vertAdvance//64
+  bitmap1 = face.glyph.bitmap
+  dict1["width"]  = bitmap1.width
+  dict1["rows"]   = bitmap1.rows
+  dict1["top"] = face.glyph.bitmap_top
+  dict1["xoffset"] = face.glyph.bitmap_left
+  dict1["bitmap"] = getBitmap(bitmap1.buffer)
+  dict1["length"] = len(dict1["bitmap"])#the number of the pixel data 
+  return dict1
+
+def loadGlyphs(filename, lis, size = 12, angle = 0, face = None, cache = None):#Render every character in lis, return the glyph list and the font information
+  #face: an opened face of filename to reuse, cache: {unicode: glyph dict} of glyphs already rendered with this face
+  if face is None:
+    face = openFace(filename, size, angle)
+  Font_height = face.size.height//72
+  Font_totallen = 0
+  unicodeList = set()
   TotalList = []
-  dict1 = {"unicode":0, "length":0, "width":0, "rows":0, "xadvance":0, "xoffset":0, "top":0}
   glyphDitct = {"lengthH":0, 'lengthL':0, 'maxwidth':0, 'maxrows':0,'minXoffset':255, "minYoffset":255,'maxAadvancex':0}
   baseline = 0
   for s in lis:
     s = s.replace('\n','')
     for c in s:
-      dict1["unicode"] = getUnicode(c)[0]#hex will convert integer into string 
-      if dict1["unicode"] in unicodeList:
+      if c in unicodeList:
         continue
-      unicodeList.append(dict1["unicode"])
-      face.load_char(c, flag)
-      kerning = face.get_kerning(previous, c)
-      previous = c
-      dict1["xadvance"] = face.glyph.metrics.horiAdvance//64
+      unicodeList.add(c)
+      if cache is not None and c in cache:
+        dict1 = copy.copy(cache[c])
+      else:
+        dict1 = renderGlyph(face, c)
+        if cache is not None:
+          cache[c] = copy.copy(dict1)
       if glyphDitct['maxAadvancex'] < dict1["xadvance"]:
           glyphDitct['maxAadvancex'] = dict1["xadvance"]
-      yadvance = face.glyph.metrics.vertAdvance//64
-      if yadvance > Font_height:
-          Font_height = yadvance
-      bitmap1 = face.glyph.bitmap
-      dict1["width"]  = face.glyph.bitmap.width
-      dict1["rows"]   = face.glyph.bitmap.rows
-      dict1["top"] = face.glyph.bitmap_top
-      dict1["xoffset"] = face.glyph.bitmap_left
+      if dict1["yadvance"] > Font_height:
+          Font_height = dict1["yadvance"]
       if glyphDitct['minXoffset'] > dict1["xoffset"]:
           glyphDitct['minXoffset'] = dict1["xoffset"]
       if glyphDitct['maxwidth'] < dict1["width"]:
@@ -135,26 +143,37 @@ def parseFont(dstfilename, filename, lis, size = 12, angle = 0):
           glyphDitct['maxrows'] = dict1["rows"]
       if dict1["top"] > baseline:
           baseline = dict1["top"]
-      
-      bitmap = getBitmap(bitmap1.buffer)
-      dict1["length"] = len(bitmap)#the number of the pixel data 
-      if dict1["length"]:
-          writeFileArray(dstfilename, bitmap)#Write in the pixel data
-      TotalList.append(copy.deepcopy(dict1))
+      TotalList.append(dict1)
       Font_totallen +=1
+  TotalList.sort(key = lambda d: int(d['unicode'], 16))#Sorted by unicode, so that a glyph can be found by binary search
   glyphDitct['lengthH'] = Font_totallen >> 0xFFFF
   glyphDitct['lengthL'] = Font_totallen & 0xFFFF
   for d in TotalList:
-      yoffset = baseline - d['top']
-      if glyphDitct['minYoffset'] > yoffset:
-          glyphDitct['minYoffset'] = yoffset
+      d['yoffset'] = baseline - d['top']
+      if glyphDitct['minYoffset'] > d['yoffset']:
+          glyphDitct['minYoffset'] = d['yoffset']
+  glyphDitct['height'] = Font_height
+  glyphDitct['total'] = Font_totallen
+  return TotalList, glyphDitct
+
+def parseFont(dstfilename, filename, lis, size = 12, angle = 0):
+  TotalList, glyphDitct = loadGlyphs(filename, lis, size, angle)
+  return formatGlyphs(dstfilename, TotalList, glyphDitct)
+
+def formatGlyphs(dstfilename, TotalList, glyphDitct):#Write in the pixel data, return the lines of the glyph array
+  L = []
+  start = '{'
+  end = '},\n'
+  for d in TotalList:
+      if d["length"]:
+          writeFileArray(dstfilename, d["bitmap"])#Write in the pixel data
       ll = []
       ll.append(d['unicode'])
       ll.append(hex(d['length']))
       ll.append(hex(d['width']))
       ll.append(hex(d['rows']))
       ll.append(hex(d['xoffset']))
-      ll.append(hex(yoffset))
+      ll.append(hex(d['yoffset']))
       ll.append(hex(d['xadvance']))
       ls = start + listToString(ll) + end
       L.append(ls)
@@ -170,10 +189,28 @@ def parseFont(dstfilename, filename, lis, size = 12, angle = 0):
   glyphLL.append(hex(glyphDitct['maxAadvancex']))
   ls = start + listToString(glyphLL) + end
   L.insert(0,ls)
-  L.append(Font_height)
-  L.append(Font_totallen)
+  L.append(glyphDitct['height'])
+  L.append(glyphDitct['total'])
   return L
 
+def formatIndex(dstfilename, fontname, TotalList):#Write in the bitmap offset of each glyph and the block index
+  offsets = []
+  length = 0
+  for d in TotalList:
+      offsets.append(hex(length))
+      length += d['length']
+  firstBlock, starts = fontbin.buildBlockIndex([int(d['unicode'], 16) for d in TotalList])
+  text = "//Offset of each glyph in " + fontname + "Bitmaps, the glyph of " + fontname + "Glyphs[i + 1] starts at " + fontname + "Offsets[i]\n"
+  text += "const uint32_t " + fontname + "Offsets[] PROGMEM = {\n"
+  writeFile(dstfilename, text)
+  writeFileArray(dstfilename, offsets)
+  text = "};\n\n//The glyphs of the unicode block b (unicode >> 8) are " + fontname + "Glyphs[" + fontname + "Blocks[b - " + hex(firstBlock) + "] + 1] to "
+  text += fontname + "Glyphs[" + fontname + "Blocks[b - " + hex(firstBlock) + " + 1]]\n"
+  text += "const uint16_t " + fontname + "Blocks[] PROGMEM = {\n"
+  writeFile(dstfilename, text)
+  writeFileArray(dstfilename, [hex(i) for i in starts])
+  writeFile(dstfilename, "};\n\n")
+
 def listToString(List,c = ''):#Convert list to string, c indicates whether there is a comma added
   s = str(List).replace('[',']').strip(']').replace("'",'') + c
   return s
@@ -186,47 +223,9 @@ def getUnicode(text):#return a List
       L.append(hex(i))
   return L
 
-def getBitmap(bitmap):
-  L = []
-  n = 0
-  highByte = 0
-  flag = True  #if flag = 0 indicate that highByte_start  flag = 1 indicate that highByte_end  
-  #flag = 2 indicate that lowByte_start  flag = 3 indicate that lowByte_end
-  lowByte  = 0
-  oneByte = 1
-  halfByte = 0
-  for i in range(len(bitmap)):
-      n = n + 1
-      if i + 1 == len(bitmap):# the last effective data 
-          if bool(bitmap[i]):
-              halfByte = 8
-          else:
-              halfByte = 0
-          if flag:
-              highByte = halfByte | n
-              lowByte = 0
-          else:
-              lowByte = halfByte | n
-          oneByte = (highByte << 4) | lowByte
-          L.append(hex(oneByte))
-          L.append(hex(0))
-          return L
-      if (bool(bitmap[i]) != bool(bitmap[i+1]) or n + 1 > 7):
-          if bool(bitmap[i]):
-              halfByte = 8
-          else:
-              halfByte = 0
-          if flag:
-              flag = False
-              highByte = halfByte | n
-              n = 0
-          else:
-              flag = True
-              lowByte = halfByte | n
-              oneByte = (highByte << 4) | lowByte
-              L.append(hex(oneByte))
-              n = 0
-  return L
+def getBitmap(bitmap):#Encode the pixels with the rle4 codec of the .h file, return a list of hex strings
+  return [hex(b) for b in fontcodec.encodeRle4(bitmap)]
+
 def loadList(List, num,remains, fix = 0):#Load data into list, and return the invalid length of the last byte of data in list 
   s = str(bin(num)).lstrip('0').strip('b')
   if fix != 0:
@@ -275,21 +274,53 @@ def writeFileArray(filename, List):#10 numbers in each row
   if m:
       writeFile(filename, listToString(List[(num*10):], ',\n'))
 
-if __name__ == '__main__':
+def writeFont(fontDict, src, filename_path, size, face = None, cache = None):#Write filename_path.h and/or filename_path.bin, return the line of font.txt
+  TotalList, glyphDitct = loadGlyphs(src, fontDict['charList'], size, 0, face, cache)
+  return writeFontFiles(fontDict, filename_path, TotalList, glyphDitct)
+
+def writeFontFiles(fontDict, filename_path, TotalList, glyphDitct):#Write the output of loadGlyphs, return the line of font.txt
+  newfilename = os.path.basename(filename_path)
+  lis_1 = ["const uint8_t ", "Bitmaps[] PROGMEM = {\n"]
+  lis_2 = ["const gdl_Glyph_t ","Glyphs[] PROGMEM = {\n"]
+  lis_3 = ["const gdl_Font_t "," PROGMEM = {\n"]
+  if fontDict['FontOutputMode'] != 'header':
+    fontbin.writeFontBin(filename_path + '.bin', TotalList, glyphDitct, fontDict['FontGlyphIndex'], fontDict['FontCodec'])
+  if fontDict['FontOutputMode'] == 'binary':
+    return ''
+  filename_h = filename_path +'.h'
+  if os.path.exists(filename_h):
+      os.remove(filename_h)
+  filename_txt = filename_path +'.txt'
+  fp = open(filename_txt, 'w+')
+  text = lis_1[0] + newfilename + lis_1[1]
+  fp.write(text)
+  fp.close()
+  Glyph_list = formatGlyphs(filename_txt, TotalList, glyphDitct)
+  text = '};\n\n' + lis_2[0] + newfilename + lis_2[1]
+  writeFile(filename_txt, text)
+  for i in Glyph_list[:len(Glyph_list) - 2]:
+      writeFile(filename_txt, i)
+  text = '};\n\n' + lis_3[0] + newfilename + lis_3[1]
+  text += "(uint8_t *)"+ newfilename +"Bitmaps,\n"
+  text += "(gdl_Glyph_t *)" + newfilename + "Glyphs,\n" + '1, 0, '+ hex(Glyph_list[len(Glyph_list)-2])+',\n};\n\n'
+  writeFile(filename_txt, text)
+  if fontDict['FontGlyphIndex']:
+    formatIndex(filename_txt, newfilename, TotalList)
+  ModifySuffixName(filename_txt, '.h')
+  return "#include \"Fonts/"+newfilename+'.h"\n'
+
+def main(openFontTxt = True):
   setup()
   pwdPath = os.getcwd()
-  ttfSourcePath = pwdPath + '\\ttf'
-  fontDestPath = pwdPath + '\\font'
+  ttfSourcePath = os.path.join(pwdPath, 'ttf')
+  fontDestPath = os.path.join(pwdPath, 'font')
   ttfFileList = os.listdir(ttfSourcePath)
   if len(ttfFileList) == 0:
     print("Failed! Please add truetype file with the extension .ttf in the ttf folder.")
     sys.exit()
-  fontDict ={'FontFileNamePre':'', 'FontSizeList':[], 'charList':[]}
+  fontDict ={'FontFileNamePre':'', 'FontSizeList':[], 'FontOutputMode':'', 'FontGlyphIndex':'', 'FontSourceList':[], 'FontCodec':'', 'charList':[]}
   fontDict = getFontDict()
   fontDict['ttfFileList'] = ttfFileList
-  lis_1 = ["const uint8_t ", "Bitmaps[] PROGMEM = {\n"]
-  lis_2 = ["const gdl_Glyph_t ","Glyphs[] PROGMEM = {\n"]
-  lis_3 = ["const gdl_Font_t "," PROGMEM = {\n"]
   fpd = open('font.txt', 'w+')
   for ttf in fontDict['ttfFileList']:
     (filename,suffix) = os.path.splitext(ttf)
@@ -297,27 +328,14 @@ if __name__ == '__main__':
       continue
     for size in fontDict['FontSizeList']:
       newfilename = fontDict['FontFileNamePre'] + filename + "Font"+ str(size) +'pt'
-      filename_path = fontDestPath + '\\' +newfilename
-      filename_h = filename_path +'.h'
-      if os.path.exists(filename_h):
-          os.remove(filename_h)
-      filename_txt = filename_path +'.txt'
-      fp = open(filename_txt, 'w+')
-      text = lis_1[0] + newfilename + lis_1[1]
-      fp.write(text)
-      fp.close()
-      src = ttfSourcePath + '\\' + ttf
-      Glyph_list = parseFont(filename_txt, src, fontDict['charList'], size, 0)
-      text = '};\n\n' + lis_2[0] + newfilename + lis_2[1]
-      writeFile(filename_txt, text)
-      for i in Glyph_list[:len(Glyph_list) - 2]:
-          writeFile(filename_txt, i)
-      text = '};\n\n' + lis_3[0] + newfilename + lis_3[1]
-      text += "(uint8_t *)"+ newfilename +"Bitmaps,\n"
-      text += "(gdl_Glyph_t *)" + newfilename + "Glyphs,\n" + '1, 0, '+ hex(Glyph_list[len(Glyph_list)-2])+',\n};\n\n'
-      writeFile(filename_txt, text)
-      ModifySuffixName(filename_txt, '.h')
-      text = "#include \"Fonts/"+newfilename+'.h"\n'
+      src = os.path.join(ttfSourcePath, ttf)
+      text = writeFont(fontDict, src, os.path.join(fontDestPath, newfilename), size)
       fpd.write(text)
   fpd.close()
-  os.system(pwdPath+'\\font.txt')
+  if openFontTxt and hasattr(os, 'startfile'):#Pop out font.txt on Windows
+    os.startfile(os.path.join(pwdPath, 'font.txt'))
+  else:
+    print("Done, copy the lines of " + os.path.join(pwdPath, 'font.txt') + " into DFRobot_Font.h")
+
+if __name__ == '__main__':
+  main()
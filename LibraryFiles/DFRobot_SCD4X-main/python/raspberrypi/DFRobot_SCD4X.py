@@ -13,7 +13,10 @@
 import sys
 import time
 
-import smbus
+try:
+  import smbus
+except ImportError:   # Not on a Raspberry Pi, only a bus object (e.g. scd4x_sim.SimulatedBus) can be used
+  smbus = None
 
 import logging
 from ctypes import *
@@ -97,6 +100,14 @@ SCD4X_POWER_DOWN                   = 0x36e0
 ## wake up the sensor from sleep mode into idle mode.
 SCD4X_WAKE_UP                      = 0x36f6
 
+''' SCD4X state found by probe_mode '''
+## no answer at the address
+SCD4X_MODE_ABSENT    = 0
+## idle, commands can be sent
+SCD4X_MODE_IDLE      = 1
+## periodic or low power periodic measurement running
+SCD4X_MODE_MEASURING = 2
+
 
 class DFRobot_SCD4X(object):
   '''!
@@ -110,10 +121,20 @@ class DFRobot_SCD4X(object):
     '''!
       @brief Module I2C communication init
       @param i2c_addr I2C communication address
-      @param bus I2C bus
+      @param bus I2C bus number, or an object with the write_i2c_block_data and read_i2c_block_data
+      @n         methods of smbus.SMBus (e.g. scd4x_sim.SimulatedBus)
     '''
     self._addr = i2c_addr
-    self._i2c = smbus.SMBus(bus)
+    ## number of I2C transfers that failed (the read ones return zeros)
+    self.io_errors = 0
+    ## number of words read whose CRC did not match
+    self.crc_errors = 0
+    if isinstance(bus, int):
+      if smbus is None:
+        raise ImportError("smbus is not installed, pass a bus object instead of the bus number")
+      self._i2c = smbus.SMBus(bus)
+    else:
+      self._i2c = bus
 
   @property
   def begin(self):
@@ -133,6 +154,28 @@ class DFRobot_SCD4X(object):
     #   ret = False
     return ret
 
+  @property
+  def probe_mode(self):
+    '''!
+      @brief Find out whether the sensor is measuring, without stopping it
+      @details get_data_ready_status is answered in every mode, get_serial_number only when idle,
+      @n  so the sensor is measuring when it answers the first and not the second.
+      @n  Failed transfers are not counted in io_errors.
+      @return (mode, serial number)
+      @n        SCD4X_MODE_ABSENT, None : no sensor answers
+      @n        SCD4X_MODE_MEASURING, None : the serial number can't be read during a measurement
+      @n        SCD4X_MODE_IDLE, [word0, word1, word2] : None when a word of the serial number has a wrong CRC
+    '''
+    if self._probe_read(SCD4X_GET_DATA_READY_STATUS, 3) is None:
+      return SCD4X_MODE_ABSENT, None
+    buf = self._probe_read(SCD4X_GET_SERIAL_NUMBER, 9)
+    if buf is None:
+      return SCD4X_MODE_MEASURING, None
+    for i in range(0, 9, 3):
+      if buf[i + 2] != self._calc_CRC((buf[i] << 8) | buf[i + 1]):
+        return SCD4X_MODE_IDLE, None
+    return SCD4X_MODE_IDLE, [(buf[0] << 8) | buf[1], (buf[3] << 8) | buf[4], (buf[6] << 8) | buf[7]]
+
   def set_sleep_mode(self, mode):
     '''!
       @brief Set the sensor as sleep or wake-up mode (SCD41 only)
@@ -437,6 +480,19 @@ class DFRobot_SCD4X(object):
 
   ''''''''''''''''''''''''''''''''''' Read/Write Command Function '''''''''''''''''''''''''''''''''''
 
+  def _probe_read(self, cmd, length):
+    '''!
+      @brief send a command and read its response, for probing
+      @param cmd command
+      @param length read data length
+      @return read data list, None when the sensor did not acknowledge
+    '''
+    try:
+      self._i2c.write_i2c_block_data(self._addr, (cmd >> 8) & 0xFF, [cmd & 0xFF])
+      return self._i2c.read_i2c_block_data(self._addr, 0x00, length)
+    except IOError:
+      return None
+
   def _write_data(self, cmd, data):
     '''!
       @brief writes data to a register
@@ -451,6 +507,7 @@ class DFRobot_SCD4X(object):
     try:
       self._i2c.write_i2c_block_data(self._addr, (cmd >> 8) & 0xFF, data)
     except IOError:
+      self.io_errors += 1
       print("[Errno 121] Remote I/O error")
 
   def _read_data(self, length):
@@ -462,7 +519,13 @@ class DFRobot_SCD4X(object):
     # self._write_data(cmd, [])
     # return self._i2c.read_i2c_block_data(self._addr, 0x00, length)
     try:
-      return self._i2c.read_i2c_block_data(self._addr, 0x00, length)
+      buf = self._i2c.read_i2c_block_data(self._addr, 0x00, length)
     except IOError:
+      self.io_errors += 1
       print("[Errno 121] Remote I/O error")
       return [0] * length
+    for i in range(0, length - 2, 3):
+      if buf[i + 2] != self._calc_CRC((buf[i] << 8) | buf[i + 1]):
+        self.crc_errors += 1
+        logger.info("The crc failed!")
+    return buf
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  calibrate_fleet.py
+  @brief  This sample finds the drifted sensors of 12 simulated rooms in 5 days of readings and calibrates them.
+  @details The rooms are aired down to outdoor air (400 ppm) every night. Some sensors read too high or too low
+  @n  and heat up more or less in their enclosure than their temperature offset allows for; a reference
+  @n  thermometer is logged with them. One sensor is not read for 3 days and is not trusted.
+  @n  The plan is applied to all the sensors in one go: 3 minutes of warm-up (skipped with the fake clock)
+  @n  and a few seconds of calibration.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+import math
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_history import *
+from scd4x_fleet import *
+from scd4x_calibration import *
+
+DAY = 24 * 3600
+DRIFT = [0, 45, -60, 120, 10, -35, 80, 0, 25, -90, 5, 150]             # ppm each sensor reads too high
+HEATING = [4.0, 5.2, 3.1, 4.1, 6.0, 4.0, 3.8, 2.5, 4.3, 4.0, 5.0, 4.0]  # C each sensor is above the room
+
+def room_temp(t):
+  return 21.0 + 1.5 * math.sin(2 * math.pi * t / DAY)
+
+def room_source(peak, heating, phase):
+  '''!
+    @brief A room used during the day and aired to outdoor air at night
+  '''
+  def source(t):
+    day = math.sin(2 * math.pi * (t / DAY + phase))
+    return 400 + peak * max(0.0, day) ** 2, room_temp(t) + heating, 45.0
+  return source
+
+clock = FakeClock(time.time())
+chips = {}
+sensors = {}
+executor = FleetExecutor(per_bus=16, sleep=clock.advance)
+for b in range(2):
+  bus_chips = {}
+  for i in range(6):
+    n = 6 * b + i
+    chip = SimulatedSCD4X(room_source(300 + 100 * i, HEATING[n], 0.1 * i))   # temperature offset 4 C
+    chip.settings['co2_offset'] = DRIFT[n]
+    bus_chips[0x10 + i] = chips['room%02d' %n] = chip   # simulated only, a real SCD4X is always at 0x62
+  bus = SimulatedBus(bus_chips, clock=clock)
+  for i in range(6):
+    name = 'room%02d' %(6 * b + i)
+    sensors[name] = DFRobot_SCD4X(i2c_addr = 0x10 + i, bus = bus)
+    executor.add(name, sensors[name], bus = 'bus%d' %b)
+poller = SensorPoller(sensors, clock=clock)
+history = History()
+poller.add_listener(history.add)
+
+
+def setup():
+  for sensor in sensors.values():
+    sensor.enable_period_measure(SCD4X_START_LOW_POWER_MEASURE)
+
+def loop(seconds):
+  end = clock() + seconds
+  while clock() < end:
+    clock.advance(LOW_POWER_INTERVAL)
+    poller.poll_once()
+    history.append('reference', clock(), 0, room_temp(clock()), 45.0)
+
+
+if __name__ == "__main__":
+  setup()
+  loop(DAY)
+  poller.remove('room05')
+  loop(3 * DAY)
+  poller.add('room05', sensors['room05'])
+  loop(DAY)
+
+  start = time.time()
+  data = from_history(history)
+  plan = analyze(data, references = 'reference')
+  print(plan.format())
+  print("%d sensors x %d minutes analyzed in %.2f s" %(len(data.sensors), len(data.time), time.time() - start))
+  print()
+
+  report = plan.apply(executor)
+  print(report.format())
+  print()
+  for name in sorted(chips):
+    s = chips[name].settings
+    print("%s: CO2 error %+4d ppm, temperature error %+.2f C" %(name, s['co2_offset'],
+          HEATING[int(name[4:])] - 175.0 * s['temp_offset'] / (1 << 16)))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  discover_sensors.py
+  @brief  This sample finds the SCD4X sensors on all the I2C buses and multiplexer channels and keeps them in an inventory file.
+  @details With SIMULATE = True there are 4 simulated buses, two with a TCA9548A at 0x70 and a sensor on some
+  @n  of its channels. The second discovery only probes the locations known from the first one.
+  @n  With SIMULATE = False every /dev/i2c-* bus is probed, set MUXES to the multiplexers of the gateway.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_warmstart import *
+from scd4x_discovery import *
+
+SIMULATE = True
+INVENTORY_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'inventory.json')
+MUXES = {}   # e.g. {1: [0x70]}
+
+if SIMULATE:
+  from scd4x_sim import *
+  MUXES = {2: [0x70], 3: [0x70]}
+  n = [0]
+  def chip():
+    n[0] += 1
+    return SimulatedSCD4X(wave_source(), serial=(0x5cd4, 0x0000, n[0]))
+  buses = {0: SimulatedBus({}), 1: SimulatedBus({SCD4X_I2C_ADDR: chip()})}
+  for bus in MUXES:
+    buses[bus] = SimulatedBus({}, muxes={0x70: SimulatedMux(dict((ch, {SCD4X_I2C_ADDR: chip()}) for ch in range(0, 8, bus - 1)))})
+  discovery_args = {'buses': sorted(buses), 'open_bus': buses.__getitem__}
+else:
+  discovery_args = {}
+
+
+def discover():
+  discovery = Discovery(SensorCache(INVENTORY_FILE), muxes=MUXES, **discovery_args)
+  found = discovery.discover()
+  for f in found:
+    print("  %-16s %s %s" %(f.location, f.serial or '(serial unknown)', 'measuring' if f.mode == SCD4X_MODE_MEASURING else 'idle'))
+  print("%d sensors, %d locations probed in %.3f s" %(len(found), discovery.probes, discovery.seconds))
+
+
+if __name__ == "__main__":
+  if SIMULATE and os.path.exists(INVENTORY_FILE):
+    os.remove(INVENTORY_FILE)
+  print("first run:")
+  discover()
+  print("second run:")
+  discover()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  display_simulated.py
+  @brief  This sample runs the keychain screen on the PC, with a simulated sensor, and prints the SPI bytes of each update.
+  @details The CO2 of the simulated room rises and falls over an hour, the clock is fake so an hour of
+  @n  readings (720 updates) takes a few seconds. Replace bus with 1 to read a real sensor on a Raspberry Pi.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_display import *
+
+clock = FakeClock()
+bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=1500, amplitude=1200))}, clock=clock)
+sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+display = KeychainDisplay()
+
+
+def setup():
+  while (not sensor.begin):
+    print ('Please check that the device is properly connected')
+    time.sleep(3)
+  print("sensor begin successfully!!!")
+  sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  print("%8s %6s %6s %10s %10s" %('reading', 'CO2', 'rects', 'SPI bytes', 'full'))
+
+def loop():
+  clock.advance(PERIODIC_INTERVAL)
+  update = display.poll(sensor)
+  if update is not None and display.updates % 60 == 1:
+    print("%8d %6d %6d %10d %10d" %(display.updates, display.reading[0], len(update.rects), update.dirty_bytes, update.full_bytes))
+
+
+if __name__ == "__main__":
+  setup()
+  while display.updates < 720:
+    loop()
+  print("%d updates, %d SPI bytes, %d with full redraws (%.1f %%)" %(display.updates, display.dirty_bytes,
+        display.full_bytes, 100.0 * display.dirty_bytes / display.full_bytes))
+  display.frame.save_ppm('keychain.ppm')
+  print("Last frame saved to keychain.ppm")
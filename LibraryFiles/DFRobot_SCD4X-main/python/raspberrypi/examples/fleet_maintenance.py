@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  fleet_maintenance.py
+  @brief  This sample runs the self test and a forced recalibration on 48 simulated sensors on 3 buses.
+  @details All 16 sensors of a bus run at the same time, so the self tests take about 10 s for the whole
+  @n  fleet instead of 8 minutes. One sensor reports a malfunction and one does not answer, both show up
+  @n  in the report. The 3 minute FRC warm-up is skipped with the fake clock.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_fleet import *
+
+clock = FakeClock(time.time())
+executor = FleetExecutor(per_bus=16, sleep=clock.advance)
+for b in range(3):
+  chips = {}
+  for i in range(16):
+    chips[0x10 + i] = SimulatedSCD4X(wave_source(co2=450 + 10 * i))   # simulated only, a real SCD4X is always at 0x62
+  bus = SimulatedBus(chips, clock=clock)
+  for addr in chips:
+    executor.add('bus%d-%#x' %(b, addr), DFRobot_SCD4X(i2c_addr = addr, bus = bus), bus = 'bus%d' %b)
+  if b == 1:
+    chips[0x13].self_test_result = 0x0203
+    del bus.sensors[0x17]
+
+
+if __name__ == "__main__":
+  report = executor.self_test()
+  print(report.format())
+  print()
+  report = executor.forced_recalibration(target = 420)
+  print(report.format())
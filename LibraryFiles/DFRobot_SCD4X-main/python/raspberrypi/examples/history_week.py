@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  history_week.py
+  @brief  This sample keeps a week of 5 s readings of 3 simulated sensors in a History and prints daily statistics.
+  @details The fake clock runs the week in seconds. The statistics come from the block summaries, the
+  @n  encoded history is compared with the memory the same samples take as tuples.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_history import *
+
+DAY = 24 * 3600
+
+clock = FakeClock(time.time())
+sensors = {}
+for i, room in enumerate(['office', 'meeting', 'kitchen']):
+  bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=700 + 300 * i, period=DAY / 3))}, clock=clock)
+  sensors[room] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+poller = SensorPoller(sensors, clock=clock)
+history = History()
+poller.add_listener(history.add)
+
+
+def setup():
+  for sensor in sensors.values():
+    sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+
+def loop(seconds):
+  end = clock() + seconds
+  while clock() < end:
+    clock.advance(PERIODIC_INTERVAL)
+    poller.poll_once()
+
+
+if __name__ == "__main__":
+  start = clock()
+  setup()
+  loop(7 * DAY)
+  for name in history.sensors():
+    print(name)
+    for day in range(7):
+      a = history.aggregate(name, start + day * DAY, start + (day + 1) * DAY)
+      print("  day %d: %6d samples  CO2 %5.0f .. %5.0f ppm, mean %6.1f  temp mean %5.2f C  humidity mean %5.2f %%RH" %(day + 1,
+            a.count, a.co2.min, a.co2.max, a.co2.mean, a.temp.mean, a.humidity.mean))
+  samples = sum(history.count(name) for name in history.sensors())
+  tuples = samples * (sys.getsizeof(Sample('', 0.0, 0, 0.0, 0.0)) + 3 * sys.getsizeof(0.0))
+  print("%d samples in %d bytes (%.1f per sample), about %d bytes as Sample tuples; %d blocks decoded for the statistics" %(
+        samples, history.nbytes(), float(history.nbytes()) / samples, tuples, history.decoded_blocks))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  metrics_exporter.py
+  @brief  This sample serves the latest readings over HTTP: Prometheus text on /metrics, JSON on /json.
+  @details Open http://<host>:9536/metrics in a browser or add the address to the scrape targets of Prometheus.
+  @n  With SIMULATE = True three simulated sensors are used, so the sample also runs on a PC.
+  @n  The health of each sensor (scd4x_health_state) is also exported, a failed sensor is polled less often.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_poller import *
+from scd4x_exporter import *
+from scd4x_health import *
+
+SIMULATE = True
+
+if SIMULATE:
+  from scd4x_sim import *
+  sensors = {}
+  for i, room in enumerate(['office', 'meeting', 'kitchen']):
+    bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=700 + 300 * i, period=600))})
+    sensors[room] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+else:
+  sensors = {'keychain': DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = 1)}
+
+poller = SensorPoller(sensors, interval = 1.0, health = HealthMonitor())
+exporter = MetricsExporter(poller, port = 9536)
+
+
+def setup():
+  for name, sensor in sensors.items():
+    while (not sensor.begin):
+      print ('Please check that the device %s is properly connected' %name)
+      time.sleep(3)
+    sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  print("%d sensor(s) started" %len(sensors))
+  exporter.start()
+  print("Serving http://localhost:%d/metrics and http://localhost:%d/json" %(exporter.port, exporter.port))
+
+def loop():
+  for sample in poller.poll_once():
+    print("%-10s %5u ppm %6.2f C %6.2f RH" %(sample.sensor, sample.co2, sample.temp, sample.humidity))
+  time.sleep(poller.interval)
+
+
+if __name__ == "__main__":
+  setup()
+  try:
+    while True:
+      loop()
+  except KeyboardInterrupt:
+    exporter.stop()
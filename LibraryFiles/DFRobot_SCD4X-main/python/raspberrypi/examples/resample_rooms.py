@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  resample_rooms.py
+  @brief  This sample aligns the readings of sensors in periodic (5 s) and low power (30 s) mode to one 1 minute grid.
+  @details Six simulated sensors run for 6 hours on the fake clock, half of them in low power mode, and one is
+  @n  not read for 20 minutes. Their samples are put on the grid with each method of scd4x_resample; the
+  @n  gap shows up as NaN where max_gap is exceeded.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_resample import *
+
+clock = FakeClock(time.time())
+sensors = {}
+for i in range(6):
+  bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=600 + 100 * i, period=7200))}, clock=clock)
+  sensors['room%d' %i] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+poller = SensorPoller(sensors, clock=clock)
+samples = []
+poller.add_listener(samples.extend)
+
+
+def setup():
+  for i, sensor in enumerate(sensors.values()):
+    sensor.enable_period_measure(SCD4X_START_LOW_POWER_MEASURE if i % 2 else SCD4X_START_PERIODIC_MEASURE)
+
+def loop(seconds):
+  end = clock() + seconds
+  while clock() < end:
+    clock.advance(1.0)
+    poller.poll_once()
+
+
+if __name__ == "__main__":
+  start = clock()
+  setup()
+  loop(3 * 3600)
+  poller.remove('room0')
+  loop(20 * 60)
+  poller.add('room0', sensors['room0'])
+  loop(3 * 3600 - 20 * 60)
+  streams = stream_arrays(samples)
+  print("%d samples: %s" %(len(samples), ', '.join('%s %d' %(name, len(t)) for name, (t, v) in streams.items())))
+  for method in METHODS:
+    t = time.time()
+    r = resample(streams, start, start + 6 * 3600, 60, method, max_gap=120)
+    elapsed = time.time() - t
+    print("%-11s %d x %d grid in %5.1f ms, room0 CO2 at 3:10 %7.1f, mean CO2 of all rooms over 6 h %6.1f" %(method,
+          r.co2.shape[0], r.co2.shape[1], elapsed * 1000, r.co2[0, 190], np.nanmean(r.co2)))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  trace_replay.py
+  @brief  This sample records a day of I2C traffic of 3 sensors to a trace file, then replays it as fast as possible.
+  @details The recording uses simulated sensors and a fake clock so it takes seconds; record real sensors the
+  @n  same way with clock = time.time. The replay feeds the recorded responses to new DFRobot_SCD4X objects,
+  @n  a SensorPoller on top of them gets the same samples with the recorded timestamps.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_trace import *
+
+ROOMS = ['office', 'meeting', 'kitchen']
+TRACE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'rooms.trace.gz')
+
+
+def record(seconds):
+  clock = FakeClock(time.time())
+  recorder = TraceRecorder(TRACE_FILE, clock = clock)
+  sensors = {}
+  for i, room in enumerate(ROOMS):
+    bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=700 + 300 * i, period=3600))}, clock=clock)
+    sensors[room] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+    recorder.record(sensors[room], room)
+    sensors[room].enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  poller = SensorPoller(sensors, clock = clock)
+  samples = []
+  end = clock() + seconds
+  while clock() < end:
+    clock.advance(1.0)
+    samples += poller.poll_once()
+  recorder.close()
+  return samples
+
+def replay(speed):
+  replay = Replay(TRACE_FILE, speed = speed)
+  sensors = {}
+  for room in ROOMS:
+    sensors[room] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = replay.bus(room))
+    sensors[room].enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  poller = SensorPoller(sensors, clock = replay.clock)
+  samples = []
+  while not all(s._i2c.done for s in sensors.values()):
+    samples += poller.poll_once()
+  return samples, replay.mismatches
+
+
+if __name__ == "__main__":
+  start = time.time()
+  recorded = record(24 * 3600)
+  print("recorded %d samples in %.1f s, %d bytes" %(len(recorded), time.time() - start, os.path.getsize(TRACE_FILE)))
+  start = time.time()
+  replayed, mismatches = replay(speed = None)
+  elapsed = time.time() - start
+  print("replayed %d samples in %.1f s (%.0f samples/s, %.0fx real time), %d mismatches, same samples: %s" %(len(replayed),
+        elapsed, len(replayed) / elapsed, 24 * 3600 / elapsed, mismatches, replayed == recorded))
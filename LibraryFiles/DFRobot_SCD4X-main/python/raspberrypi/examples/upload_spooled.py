@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  upload_spooled.py
+  @brief  This sample forwards the readings of 20 simulated sensors to a TCP sink in compressed batches and rides out an outage of the sink.
+  @details The sink (SinkServer, a stand-in for the central store) is stopped for a while: the batches go to the
+  @n  spool folder and are sent once it is back. The fake clock runs a day of readings in seconds.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_upload import *
+
+clock = FakeClock(time.time())
+sensors = {}
+for i in range(20):
+  bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(co2=600 + 40 * i))}, clock=clock)
+  sensors['room%02d' %i] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+poller = SensorPoller(sensors, clock=clock)
+
+received = []
+server = SinkServer(lambda data: received.extend(decode_batch(data)))
+spool_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'spool')
+upload = UploadQueue(SocketSink('127.0.0.1', server.port), spool_dir, batch_size=500, retry=0.5)
+poller.add_listener(upload.add)
+
+
+def setup():
+  for sensor in sensors.values():
+    sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  upload.start()
+
+def loop(seconds):
+  end = clock() + seconds
+  while clock() < end:
+    clock.advance(PERIODIC_INTERVAL)
+    poller.poll_once()
+
+def report(what):
+  batches, size = upload.spooled()
+  print("%-24s %7d samples read %7d received %4d batches (%d bytes) spooled" %(what, upload.stats['samples'],
+        len(received), batches, size))
+
+
+if __name__ == "__main__":
+  setup()
+  loop(8 * 3600)
+  time.sleep(0.5)
+  report("8 h, sink up")
+  server.close()
+  loop(8 * 3600)
+  time.sleep(0.5)
+  report("8 h more, sink down")
+  server = SinkServer(lambda data: received.extend(decode_batch(data)), port=server.port)
+  loop(8 * 3600)
+  upload.stop()
+  time.sleep(0.5)
+  report("8 h more, sink back")
+  s = upload.stats
+  print("%d batches, %d bytes of JSON compressed to %d (%.1f %%), %d send errors, %d batches dropped" %(s['batches'],
+        s['raw_bytes'], s['compressed_bytes'], 100.0 * s['compressed_bytes'] / s['raw_bytes'], s['send_errors'], s['dropped']))
+  server.close()
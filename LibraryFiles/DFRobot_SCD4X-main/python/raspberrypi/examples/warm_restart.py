@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  warm_restart.py
+  @brief  This sample starts 10 simulated sensors, then "restarts the collector" and attaches to them without stopping them.
+  @details The first start goes through warm_begin like every start: the sensors are idle, so each is configured,
+  @n  started and written to the cache file. The restart makes new DFRobot_SCD4X objects on the same buses;
+  @n  warm_begin finds them measuring as recorded and leaves them running, so the next reading is not lost.
+  @n  The same restart with begin() is timed for comparison. On a Raspberry Pi use bus = 1 and run the sample twice instead.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+from __future__ import print_function
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_warmstart import *
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'sensors.json')
+CONFIG = {'temp_offset': 4.0, 'altitude': 540, 'asc': True}
+
+clock = FakeClock(time.time())
+buses = {}
+for i in range(10):
+  serial = (0x1000 + i, 0x2000, 0x3000)
+  buses['%d:%#x' %(i, SCD4X_I2C_ADDR)] = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(), serial)}, clock=clock)
+
+
+def start_collector(cache):
+  start = time.time()
+  sensors = {}
+  warm = 0
+  for location, bus in buses.items():
+    sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+    serial, attached = warm_begin(sensor, cache, location, CONFIG, save = False)
+    if serial is None:
+      print("no sensor at %s" %location)
+      continue
+    sensors[serial] = sensor
+    warm += attached
+  cache.save()
+  print("%d sensors up in %.2f s, %d left measuring" %(len(sensors), time.time() - start, warm))
+  return sensors
+
+
+if __name__ == "__main__":
+  if os.path.exists(CACHE_FILE):
+    os.remove(CACHE_FILE)
+  start_collector(SensorCache(CACHE_FILE))
+  clock.advance(12)   # the collector runs, then is restarted
+  sensors = start_collector(SensorCache(CACHE_FILE))
+  ready = sum(1 for sensor in sensors.values() if sensor.get_data_ready_status)
+  print("%d of %d sensors have a reading ready right after the restart" %(ready, len(sensors)))
+  clock.advance(12)   # the same restart with begin()
+  start = time.time()
+  sensors = [DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus) for bus in buses.values()]
+  for sensor in sensors:
+    sensor.begin
+    apply_config(sensor, CONFIG)
+    sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  ready = sum(1 for sensor in sensors if sensor.get_data_ready_status)
+  print("with begin(): %d sensors up in %.2f s, %d with a reading ready" %(len(sensors), time.time() - start, ready))
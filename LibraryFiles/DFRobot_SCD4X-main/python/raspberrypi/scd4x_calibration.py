@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_calibration.py
+  @brief  Find from the logged readings which sensors need a calibration, and apply it to the fleet
+  @details analyze() works on the readings of all the sensors at once, as (sensors x grid) NumPy arrays
+  @n  (scd4x_resample, from_history for a History):
+  @n    CO2: the air of a ventilated room gets down to the outdoor level (OUTDOOR_CO2) on some days, like the
+  @n    automatic self calibration of the sensor assumes. The minimum of each day is taken for every
+  @n    sensor; the low quartile of these minima minus 400 ppm is the drift, the spread of the minima
+  @n    and the days without data lower the confidence. The slope of the minima is the drift per day.
+  @n    Temperature: the median difference to a reference channel, a thermometer logged into the same
+  @n    history or a sensor known to be right (see set_temp_comp).
+  @n  The result is a CalibrationPlan, sorted with the sensors needing it most first. plan.apply(executor)
+  @n  sends the corrections with scd4x_fleet.FleetExecutor.calibrate: one stop per sensor, many sensors at
+  @n  a time, and the 3 minute FRC warm-up once for all.
+  @n  Rooms that are never aired down to outdoor air read as drifted, leave them out or use a reference.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import math
+import warnings
+import collections
+
+import numpy as np
+
+from scd4x_resample import stream_arrays, resample
+from scd4x_fleet import FRC_WARMUP
+
+## CO2 concentration of outdoor air, ppm
+OUTDOOR_CO2 = 400
+DAY = 24 * 3600.0
+
+## one sensor of a CalibrationPlan
+## co2_drift: ppm the sensor reads too high (NaN: not enough days), co2_trend: change of the drift in ppm per day
+## temp_error: C the sensor reads above its reference (NaN: no reference), co2_confidence, temp_confidence: 0 to 1
+## score: error over tolerance times confidence, co2, temp: the corrections to apply (None: nothing to do)
+Calibration = collections.namedtuple('Calibration', ['sensor', 'co2_drift', 'co2_trend', 'temp_error', 'co2_confidence',
+                                                     'temp_confidence', 'score', 'co2', 'temp'])
+
+
+def _quiet(f, *args, **kwargs):
+  '''!
+    @brief Call a NumPy nan function, rows without any value give NaN without a warning
+  '''
+  with warnings.catch_warnings():
+    warnings.simplefilter('ignore', RuntimeWarning)
+    return f(*args, **kwargs)
+
+def window_minima(values, per_window, min_coverage=0.5):
+  '''!
+    @brief The minimum of each window of per_window grid points, for all the rows at once
+    @param values (sensors, n) array, NaN where there is no value
+    @param min_coverage windows with a smaller part of their points are NaN
+    @return (sensors, n // per_window), the oldest points that don't fill a window are left out
+  '''
+  rows, n = values.shape
+  windows = n // per_window
+  v = values[:, n - windows * per_window:].reshape(rows, windows, per_window)
+  valid = ~np.isnan(v)
+  minima = np.where(valid, v, np.inf).min(axis=2)
+  minima[valid.sum(axis=2) < min_coverage * per_window] = np.nan
+  return minima
+
+def baseline_drift(minima, outdoor=OUTDOOR_CO2):
+  '''!
+    @brief The CO2 drift of each sensor from its window minima
+    @return (drift, trend per window, spread, windows with data), (sensors,) arrays. drift is the low quartile
+    @n      of the minima minus outdoor, spread the range between the low and the high quartile
+  '''
+  valid = ~np.isnan(minima)
+  windows = valid.sum(axis=1)
+  if minima.shape[1] == 0:   # less than one window of data, nanpercentile would give one scalar
+    nan = np.full(minima.shape[0], np.nan)
+    return nan, nan.copy(), nan.copy(), windows
+  low, high = _quiet(np.nanpercentile, minima, [25, 75], axis=1)
+  # least squares slope of the minima over the window number
+  x = np.arange(minima.shape[1], dtype=np.float64)
+  y = np.where(valid, minima, 0.0)
+  sx = (valid * x).sum(axis=1)
+  sxx = (valid * x * x).sum(axis=1)
+  den = windows * sxx - sx * sx
+  trend = np.where(den > 0, (windows * (y * x).sum(axis=1) - sx * y.sum(axis=1)) / np.where(den > 0, den, 1), np.nan)
+  return low - outdoor, trend, high - low, windows
+
+def temp_errors(temp, rows, refs):
+  '''!
+    @brief The median difference of the temperature of rows to that of refs, at the grid times both have
+    @return (errors, points compared), (len(rows),) arrays
+  '''
+  diff = temp[rows] - temp[refs]
+  return _quiet(np.nanmedian, diff, axis=1), (~np.isnan(diff)).sum(axis=1)
+
+def from_history(history, start=None, end=None, step=60.0, names=None):
+  '''!
+    @brief The readings of a scd4x_history.History as the mean of each step seconds
+    @param start, end seconds, None for the first and the last reading
+    @param names the sensors and reference channels, default all
+    @return scd4x_resample.Resampled
+  '''
+  streams = collections.OrderedDict()
+  for name in history.sensors() if names is None else names:
+    streams.update(stream_arrays(history.samples(name, start, end)))
+  times = [t for t, v in streams.values() if len(t)]
+  if start is None:
+    start = min(t[0] for t in times) if times else 0.0
+  if end is None:
+    end = max(t[-1] for t in times) + step if times else start
+  return resample(streams, start, end, step, 'mean')
+
+def analyze(data, references=None, outdoor=OUTDOOR_CO2, window=DAY, co2_tolerance=30.0, temp_tolerance=0.5,
+            min_windows=3, min_confidence=0.5):
+  '''!
+    @brief Estimate the CO2 drift and the temperature error of every sensor
+    @param data scd4x_resample.Resampled, e.g. from_history(history)
+    @param references name of the reference temperature channel for all the sensors, or {sensor: channel}.
+    @n     The channels are left out of the plan
+    @param window seconds of each minimum, a day catches the night when the room is empty
+    @param co2_tolerance, temp_tolerance errors up to these are left alone, ppm and C
+    @param min_windows windows with data needed for a CO2 correction
+    @param min_confidence confidence needed for a correction
+    @return CalibrationPlan
+  '''
+  names = list(data.sensors)
+  n = len(data.time)
+  step = data.time[1] - data.time[0] if n > 1 else window
+  per_window = max(1, int(round(window / step)))
+  minima = window_minima(data.co2, per_window)
+  drift, trend, spread, windows = baseline_drift(minima, outdoor)
+  co2_confidence = windows / float(max(1, minima.shape[1])) / (1 + np.nan_to_num(spread) / co2_tolerance)
+  co2_confidence[windows < min_windows] = 0.0
+  drift[windows < min_windows] = np.nan
+
+  if isinstance(references, dict):
+    pairs = [(s, r) for s, r in references.items() if s in names and r in names]
+  elif references is not None and references in names:
+    pairs = [(s, references) for s in names if s != references]
+  else:
+    pairs = []
+  temp_error = np.full(len(names), np.nan)
+  temp_confidence = np.zeros(len(names))
+  if pairs:
+    rows = np.array([names.index(s) for s, r in pairs])
+    errors, points = temp_errors(data.temp, rows, np.array([names.index(r) for s, r in pairs]))
+    temp_error[rows] = errors
+    temp_confidence[rows] = points / float(max(1, n))
+  channels = set(references.values()) if isinstance(references, dict) else set([references])
+
+  score = np.fmax(np.nan_to_num(np.abs(drift)) / co2_tolerance * co2_confidence,
+                  np.nan_to_num(np.abs(temp_error)) / temp_tolerance * temp_confidence)
+  plan = []
+  for i in np.argsort(-score, kind='mergesort'):
+    if names[i] in channels:
+      continue
+    co2 = temp = None
+    if abs(drift[i]) > co2_tolerance and co2_confidence[i] >= min_confidence:
+      co2 = -int(round(drift[i]))
+    if abs(temp_error[i]) > temp_tolerance and temp_confidence[i] >= min_confidence:
+      temp = -round(float(temp_error[i]), 2)
+    plan.append(Calibration(names[i], float(drift[i]), float(trend[i]) * DAY / window, float(temp_error[i]),
+                            float(co2_confidence[i]), float(temp_confidence[i]), float(score[i]), co2, temp))
+  return CalibrationPlan(plan)
+
+
+class CalibrationPlan(object):
+  '''!
+    @brief The result of analyze, the sensors needing a calibration most first
+  '''
+
+  def __init__(self, sensors):
+    self.sensors = sensors   # [Calibration]
+
+  def corrections(self):
+    '''!
+      @return {name: (CO2 correction ppm, temperature correction C)} of the sensors with something to do,
+      @n      for FleetExecutor.calibrate
+    '''
+    return collections.OrderedDict((c.sensor, (c.co2, c.temp)) for c in self.sensors
+                                   if c.co2 is not None or c.temp is not None)
+
+  def apply(self, executor, warmup=FRC_WARMUP, persist=False):
+    '''!
+      @brief Send the corrections to the sensors, see FleetExecutor.calibrate
+      @param executor scd4x_fleet.FleetExecutor with the sensors added under the names of the plan
+      @return FleetReport
+    '''
+    return executor.calibrate(self.corrections(), warmup=warmup, persist=persist)
+
+  def format(self):
+    '''!
+      @return the plan as text, one line per sensor
+    '''
+    def number(v, fmt):
+      return '-' if v is None or (isinstance(v, float) and math.isnan(v)) else fmt %v
+    lines = ['%-16s %9s %9s %8s %6s %6s %6s  %s' %('sensor', 'drift', 'ppm/day', 'temp', 'conf', 'tconf', 'score', 'action')]
+    for c in self.sensors:
+      action = []
+      if c.co2 is not None:
+        action.append('FRC %+d ppm' %c.co2)
+      if c.temp is not None:
+        action.append('temperature %+.2f C' %c.temp)
+      lines.append('%-16s %9s %9s %8s %6.2f %6.2f %6.2f  %s' %(c.sensor, number(c.co2_drift, '%+.0f'),
+                   number(c.co2_trend, '%+.1f'), number(c.temp_error, '%+.2f'), c.co2_confidence, c.temp_confidence,
+                   c.score, ', '.join(action) or '-'))
+    lines.append('%d sensors, %d to calibrate' %(len(self.sensors), len(self.corrections())))
+    return '\n'.join(lines)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_discovery.py
+  @brief  Find the SCD4X sensors on all the I2C buses and multiplexer channels, and keep an inventory
+  @details Discovery probes SCD4X_I2C_ADDR on every /dev/i2c-* bus, and on each channel of the
+  @n  multiplexers (TCA9548A) given, one thread per bus. A sensor is identified by its 48 bit serial
+  @n  number, read with the CRC of each word checked (DFRobot_SCD4X.probe_mode), so nothing is stopped
+  @n  and nothing waits 500 ms like in begin(). A sensor that is measuring can't tell its serial number;
+  @n  the one of the inventory is used for its location. It can't tell its measurement mode either: with
+  @n  interrupt set to the start command the sensors are run with, it is stopped, read and started again
+  @n  in that mode; otherwise it is left alone with its serial number unknown.
+  @n  The inventory is a scd4x_warmstart.SensorCache file, the one warm_begin uses. On later runs only
+  @n  the known locations are probed again, whole buses only when they are new (or full=True).
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import re
+import glob
+import time
+import threading
+import collections
+
+from DFRobot_SCD4X import *
+from scd4x_warmstart import serial_key, SERIAL_RETRIES
+
+## a sensor found by Discovery, mux and channel are None when it is on the bus directly
+## mode: SCD4X_MODE_IDLE or SCD4X_MODE_MEASURING, serial: 12 hex digits, None when it could not be read
+Found = collections.namedtuple('Found', ['location', 'bus', 'mux', 'channel', 'addr', 'serial', 'mode'])
+
+
+def list_buses():
+  '''!
+    @return the numbers of the /dev/i2c-* buses
+  '''
+  numbers = []
+  for path in glob.glob('/dev/i2c-*'):
+    m = re.match(r'/dev/i2c-(\d+)$', path)
+    if m:
+      numbers.append(int(m.group(1)))
+  return sorted(numbers)
+
+def location_name(bus, addr, mux=None, channel=None):
+  '''!
+    @return '1:0x62', or '1:0x70.3:0x62' behind channel 3 of the multiplexer at 0x70
+  '''
+  if mux is None:
+    return '%d:%#x' %(bus, addr)
+  return '%d:%#x.%d:%#x' %(bus, mux, channel, addr)
+
+def parse_location(location):
+  '''!
+    @return (bus, addr, mux, channel) of a location_name
+  '''
+  m = re.match(r'(\d+):(0x[0-9a-f]+)(?:\.(\d+):(0x[0-9a-f]+))?$', location)
+  if m is None:
+    raise ValueError("bad location %r" %location)
+  if m.group(3) is None:
+    return int(m.group(1)), int(m.group(2), 16), None, None
+  return int(m.group(1)), int(m.group(4), 16), int(m.group(2), 16), int(m.group(3))
+
+def open_smbus(number):
+  if smbus is None:
+    raise ImportError("smbus is not installed")
+  return smbus.SMBus(number)
+
+
+class MuxChannel(object):
+  '''!
+    @brief A bus object for DFRobot_SCD4X that reaches the sensor through one channel of a multiplexer
+    @details The channel is selected before each transfer when another one is selected, the channels
+    @n  of one bus share the lock and the selection, so sensors behind the multiplexer can be used from threads.
+  '''
+  _state = {}   # id(bus) -> [lock, (mux, channel) selected]
+  _state_lock = threading.Lock()
+
+  def __init__(self, bus, mux, channel):
+    self.bus = bus
+    self.mux = mux
+    self.channel = channel
+    with MuxChannel._state_lock:
+      self._shared = MuxChannel._state.setdefault(id(bus), [threading.RLock(), None])
+
+  def select(self):
+    if self._shared[1] != (self.mux, self.channel):
+      self._shared[1] = None
+      self.bus.write_byte(self.mux, 1 << self.channel)
+      self._shared[1] = (self.mux, self.channel)
+
+  def deselect(self):
+    with self._shared[0]:
+      self._shared[1] = None
+      self.bus.write_byte(self.mux, 0)
+
+  def write_i2c_block_data(self, addr, cmd, data):
+    with self._shared[0]:
+      self.select()
+      self.bus.write_i2c_block_data(addr, cmd, data)
+
+  def read_i2c_block_data(self, addr, cmd, length):
+    with self._shared[0]:
+      self.select()
+      return self.bus.read_i2c_block_data(addr, cmd, length)
+
+
+class Discovery(object):
+  '''!
+    @brief Probe buses for SCD4X sensors and keep the SensorCache up to date
+  '''
+
+  def __init__(self, inventory, buses=None, open_bus=open_smbus, muxes=None, addresses=(SCD4X_I2C_ADDR,),
+               interrupt=False):
+    '''!
+      @param inventory scd4x_warmstart.SensorCache
+      @param buses bus numbers, default list_buses()
+      @param open_bus function(number) -> bus object, default smbus.SMBus (a dict's get for SimulatedBus objects)
+      @param muxes {bus number: [multiplexer addresses]}, the 8 channels of each are scanned
+      @param addresses sensor addresses to probe
+      @param interrupt False to leave a measuring sensor of unknown serial number alone, or the command it is
+      @n     measuring with (SCD4X_START_PERIODIC_MEASURE or SCD4X_START_LOW_POWER_MEASURE): it is stopped
+      @n     to read it, then started again with that command
+    '''
+    if interrupt not in (False, None, SCD4X_START_PERIODIC_MEASURE, SCD4X_START_LOW_POWER_MEASURE):
+      raise ValueError("interrupt must be False or the measurement start command of the sensors")
+    self.inventory = inventory
+    self.buses = buses
+    self.open_bus = open_bus
+    self.muxes = muxes or {}
+    self.addresses = addresses
+    self.interrupt = interrupt
+    self.probes = 0   # locations probed by the last discover()
+    self.seconds = 0.0   # time the last discover() took
+    self._opened = {}   # bus number -> bus object
+    self._lock = threading.Lock()
+
+  def _open(self, bus):
+    with self._lock:
+      if bus not in self._opened:
+        self._opened[bus] = self.open_bus(bus)
+      return self._opened[bus]
+
+  def _bus_object(self, bus, mux, channel):
+    bus_object = self._open(bus)
+    if mux is None:
+      return bus_object
+    return MuxChannel(bus_object, mux, channel)
+
+  def probe(self, bus, addr, mux=None, channel=None):
+    '''!
+      @brief Identify the sensor at one location
+      @return Found, None when no sensor answers
+    '''
+    with self._lock:
+      self.probes += 1
+    location = location_name(bus, addr, mux, channel)
+    sensor = DFRobot_SCD4X(i2c_addr = addr, bus = self._bus_object(bus, mux, channel))
+    for i in range(SERIAL_RETRIES):
+      mode, serial = sensor.probe_mode
+      if serial is not None or mode != SCD4X_MODE_IDLE:
+        break
+    if mode == SCD4X_MODE_ABSENT:
+      return None
+    if serial is not None:
+      key = serial_key(serial)
+    elif mode == SCD4X_MODE_MEASURING:
+      key = self.inventory.serial_at(location)
+      if key is None and self.interrupt:
+        sensor.enable_period_measure(SCD4X_STOP_PERIODIC_MEASURE)
+        for i in range(SERIAL_RETRIES):
+          mode, serial = sensor.probe_mode
+          if serial is not None or mode != SCD4X_MODE_IDLE:
+            break
+        sensor.enable_period_measure(self.interrupt)   # the mode it was in, not always periodic
+        mode = SCD4X_MODE_MEASURING
+        key = serial_key(serial) if serial is not None else None
+    else:
+      key = None   # the CRC kept failing
+    return Found(location, bus, mux, channel, addr, key, mode)
+
+  def _locations(self, bus):
+    '''!
+      @return every (addr, mux, channel) to probe on a bus
+    '''
+    result = [(addr, None, None) for addr in self.addresses]
+    for mux in self.muxes.get(bus, []):
+      for channel in range(8):
+        result += [(addr, mux, channel) for addr in self.addresses]
+    return result
+
+  def _deselect(self, bus):
+    for mux in self.muxes.get(bus, []):
+      try:
+        MuxChannel(self._open(bus), mux, 0).deselect()
+      except IOError:
+        pass   # no multiplexer at that address
+
+  def _scan(self, bus, locations, found, failed):
+    try:
+      self._deselect(bus)   # or a sensor behind an open channel would answer as one on the bus
+      for addr, mux, channel in sorted(locations, key=lambda l: (l[1] or 0, l[2] or 0, l[0])):
+        f = self.probe(bus, addr, mux, channel)
+        if f is not None:
+          with self._lock:
+            found.append(f)
+      self._deselect(bus)
+    except (IOError, OSError):
+      failed.add(bus)   # the bus can't be opened
+
+  def discover(self, full=False):
+    '''!
+      @brief Probe the buses, all of them at the same time, and update the inventory file
+      @param full scan every location of every bus, not only the known ones of the buses scanned before
+      @return [Found] sorted by location
+    '''
+    start = time.time()
+    buses = list_buses() if self.buses is None else list(self.buses)
+    inventory = self.inventory
+    self.probes = 0
+    known = collections.defaultdict(list)   # bus -> known locations
+    for location in list(inventory.locations):
+      bus, addr, mux, channel = parse_location(location)
+      if bus in buses:
+        known[bus].append((addr, mux, channel))
+      else:
+        inventory.remove(location)   # the bus is gone
+    found = []
+    failed = set()
+    threads = []
+    probed = {}   # bus -> locations
+    whole = set()   # buses all the locations of which are probed
+    for bus in buses:
+      if full or str(bus) not in inventory.buses:
+        probed[bus] = self._locations(bus)
+        whole.add(bus)
+      else:
+        probed[bus] = known[bus]
+      t = threading.Thread(target=self._scan, args=(bus, probed[bus], found, failed), name='scd4x-discovery')
+      t.daemon = True
+      t.start()
+      threads.append(t)
+    for t in threads:
+      t.join()
+    present = set(f.location for f in found)
+    for bus in buses:
+      if bus not in failed:
+        for l in probed[bus]:
+          if location_name(bus, *l) not in present:
+            inventory.remove(location_name(bus, *l))
+    now = time.time()
+    for f in found:
+      if f.serial is not None:
+        inventory.put(f.serial, f.location, seen=now)
+    unknown = set(f.bus for f in found if f.serial is None)
+    for bus in buses:
+      if bus in whole and bus not in failed and bus not in unknown:
+        inventory.buses[str(bus)] = now   # scanned whole, later runs only probe the sensors found
+    for bus in list(inventory.buses):
+      if int(bus) not in buses:
+        del inventory.buses[bus]
+    inventory.save()
+    self.seconds = time.time() - start
+    return sorted(found, key=lambda f: (f.bus, f.mux or 0, f.channel or 0, f.addr))
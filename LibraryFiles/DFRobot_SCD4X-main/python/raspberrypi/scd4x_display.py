@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_display.py
+  @brief  Host-side port of the keychain screen (examples/Concentration_detection) with dirty rectangle updates
+  @details Every reading is drawn the way the sketch draws it, into a 172x320 RGB565 NumPy frame buffer:
+  @n  the same FreeMono fonts, text size, cursor positions and the 8 line segments of the CO2 history.
+  @n  The history is a ring buffer instead of Mapping0..Mapping7. The new frame is compared with the
+  @n  frame on the panel and only the changed rectangles are sent, each one costs a CASET/RASET/RAMWR
+  @n  window (WINDOW_OVERHEAD bytes) plus 2 bytes per pixel on the SPI bus.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import os
+import re
+import collections
+
+import numpy as np
+
+SCREEN_WIDTH  = 172
+SCREEN_HEIGHT = 320
+
+COLOR_RGB565_BLACK = 0x0000
+COLOR_RGB565_LGRAY = 0xC618
+
+## bytes of a ST7789 address window: 0x2A + 4 bytes, 0x2B + 4 bytes, 0x2C
+WINDOW_OVERHEAD = 11
+## bytes of a full screen update
+FULL_FRAME_BYTES = WINDOW_OVERHEAD + SCREEN_WIDTH * SCREEN_HEIGHT * 2
+
+## number of points of the CO2 history, Mapping0..Mapping7 of the sketch
+HISTORY_LENGTH = 8
+## x of each history point, newest first
+HISTORY_X = [170, 146, 122, 98, 74, 50, 26, 10]
+## y of a history point before the first reading
+HISTORY_START = 315
+
+## FreeMono fonts of DFRobot_GDL
+FONT_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', '..',
+                         'DFRobot_GDL-master', 'src', 'Frame', 'Fonts')
+
+Rect = collections.namedtuple('Rect', ['x', 'y', 'w', 'h'])
+
+## rects: [Rect] sent to the panel, dirty_bytes: SPI bytes of the rects, full_bytes: SPI bytes of a full redraw
+Update = collections.namedtuple('Update', ['rects', 'dirty_bytes', 'full_bytes'])
+
+
+def arduino_map(x, in_min, in_max, out_min, out_max):
+  '''!
+    @brief map() of Arduino, integer math truncated towards zero like C
+  '''
+  num = (int(x) - in_min) * (out_max - out_min)
+  den = in_max - in_min
+  q = abs(num) // abs(den)
+  if (num < 0) != (den < 0):
+    q = -q
+  return q + out_min
+
+def co2_to_y(co2):
+  '''!
+    @brief y of a CO2 reading on the history graph, 400 ppm at 310 and 5000 ppm at 190
+  '''
+  return arduino_map(co2, 400, 5000, 310, 190)
+
+def rect_bytes(rect):
+  '''!
+    @brief SPI bytes needed to send one rectangle
+  '''
+  return WINDOW_OVERHEAD + rect.w * rect.h * 2
+
+
+class RingBuffer(object):
+  '''!
+    @brief Fixed size history, pushing a value drops the oldest one
+  '''
+
+  def __init__(self, size=HISTORY_LENGTH, fill=HISTORY_START):
+    self._buf = [fill] * size
+    self._head = 0
+
+  def __len__(self):
+    return len(self._buf)
+
+  def __getitem__(self, i):
+    '''!
+      @brief i = 0 is the newest value (Mapping0), len - 1 the oldest (Mapping7)
+    '''
+    if i < 0 or i >= len(self._buf):
+      raise IndexError(i)
+    return self._buf[(self._head - 1 - i) % len(self._buf)]
+
+  def push(self, value):
+    self._buf[self._head] = value
+    self._head = (self._head + 1) % len(self._buf)
+
+  def values(self):
+    '''!
+      @brief All values, newest first
+    '''
+    return [self[i] for i in range(len(self._buf))]
+
+
+class GFXFont(object):
+  '''!
+    @brief An Adafruit GFX font (GFXfont in Frame/Fonts/*.h of DFRobot_GDL)
+  '''
+
+  def __init__(self, bitmap, glyphs, first, last, y_advance):
+    self.bitmap = bitmap
+    self.glyphs = glyphs   # [(bitmapOffset, width, height, xAdvance, xOffset, yOffset)] from first to last
+    self.first = first
+    self.last = last
+    self.y_advance = y_advance
+    self._masks = {}
+
+  @classmethod
+  def load(cls, name, path=FONT_PATH):
+    '''!
+      @brief Parse the header of a font, e.g. load('FreeMono12pt7b')
+    '''
+    with open(os.path.join(path, name + '.h'), 'r') as f:
+      text = re.sub(r'//[^\n]*', '', f.read())
+    m = re.search(r'Bitmaps\[\] PROGMEM = \{(.*?)\};', text, re.S)
+    bitmap = [int(n, 16) for n in re.findall(r'0x[0-9A-Fa-f]+', m.group(1))]
+    m = re.search(r'Glyphs\[\] PROGMEM = \{(.*?)\};', text, re.S)
+    glyphs = [tuple(int(n) for n in row.split(',')) for row in re.findall(r'\{([^{}]*)\}', m.group(1))]
+    m = re.search(r'const GFXfont \w+ PROGMEM = \{.*?,.*?,\s*(\w+),\s*(\w+),\s*(\d+)\s*\}', text, re.S)
+    return cls(bitmap, glyphs, int(m.group(1), 0), int(m.group(2), 0), int(m.group(3)))
+
+  def glyph(self, c):
+    return self.glyphs[ord(c) - self.first]
+
+  def mask(self, c):
+    '''!
+      @brief The pixels of a character as a (height, width) bool array
+    '''
+    if c not in self._masks:
+      offset, w, h = self.glyph(c)[:3]
+      data = np.array(self.bitmap[offset:offset + (w * h + 7) // 8], dtype=np.uint8)
+      self._masks[c] = np.unpackbits(data)[:w * h].reshape(h, w).astype(bool)
+    return self._masks[c]
+
+
+class FrameBuffer(object):
+  '''!
+    @brief RGB565 frame buffer with the drawing calls of DFRobot_GDL used by the sketch
+  '''
+
+  def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    self.width = width
+    self.height = height
+    self.pixels = np.zeros((height, width), dtype=np.uint16)
+    self.font = None
+    self.text_size = 1
+    self.text_color = COLOR_RGB565_LGRAY
+    self.wrap = True
+    self.cursor_x = 0
+    self.cursor_y = 0
+
+  def fill_screen(self, color):
+    self.pixels[:, :] = color
+
+  def fill_rect(self, x, y, w, h, color):
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, self.width), min(y + h, self.height)
+    if x0 < x1 and y0 < y1:
+      self.pixels[y0:y1, x0:x1] = color
+
+  def write_pixel(self, x, y, color):
+    if 0 <= x < self.width and 0 <= y < self.height:
+      self.pixels[y, x] = color
+
+  def write_line(self, x0, y0, x1, y1, color):
+    '''!
+      @brief Bresenham line, the same pixels as Adafruit_GFX::writeLine
+    '''
+    steep = abs(y1 - y0) > abs(x1 - x0)
+    if steep:
+      x0, y0 = y0, x0
+      x1, y1 = y1, x1
+    if x0 > x1:
+      x0, x1 = x1, x0
+      y0, y1 = y1, y0
+    dx = x1 - x0
+    dy = abs(y1 - y0)
+    err = dx // 2
+    ystep = 1 if y0 < y1 else -1
+    while x0 <= x1:
+      if steep:
+        self.write_pixel(y0, x0, color)
+      else:
+        self.write_pixel(x0, y0, color)
+      err -= dy
+      if err < 0:
+        y0 += ystep
+        err += dx
+      x0 += 1
+
+  def set_cursor(self, x, y):
+    self.cursor_x = x
+    self.cursor_y = y
+
+  def draw_char(self, x, y, c, color, size):
+    offset, w, h, x_advance, xo, yo = self.font.glyph(c)
+    mask = self.font.mask(c)
+    if size > 1:
+      mask = mask.repeat(size, axis=0).repeat(size, axis=1)
+    x += xo * size
+    y += yo * size
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + mask.shape[1], self.width), min(y + mask.shape[0], self.height)
+    if x0 < x1 and y0 < y1:
+      self.pixels[y0:y1, x0:x1][mask[y0 - y:y1 - y, x0 - x:x1 - x]] = color
+
+  def print_text(self, text):
+    '''!
+      @brief print() of DFRobot_GDL with a GFX font: wraps at the right edge, \\n starts a new line
+    '''
+    text = str(text)
+    size = self.text_size
+    for c in text:
+      if c == '\n':
+        self.cursor_x = 0
+        self.cursor_y += size * self.font.y_advance
+      elif c != '\r' and self.font.first <= ord(c) <= self.font.last:
+        offset, w, h, x_advance, xo, yo = self.font.glyph(c)
+        if w > 0 and h > 0:
+          if self.wrap and self.cursor_x + size * (xo + w) > self.width:
+            self.cursor_x = 0
+            self.cursor_y += size * self.font.y_advance
+          self.draw_char(self.cursor_x, self.cursor_y, c, self.text_color, size)
+        self.cursor_x += x_advance * size
+
+  def to_bytes(self, rect=None):
+    '''!
+      @brief The pixels of rect as sent over SPI, big-endian RGB565
+    '''
+    if rect is None:
+      rect = Rect(0, 0, self.width, self.height)
+    return self.pixels[rect.y:rect.y + rect.h, rect.x:rect.x + rect.w].astype('>u2').tobytes()
+
+  def save_ppm(self, filename):
+    p = self.pixels.astype(np.uint32)
+    rgb = np.empty((self.height, self.width, 3), dtype=np.uint8)
+    rgb[:, :, 0] = ((p >> 11) & 0x1F) * 255 // 31
+    rgb[:, :, 1] = ((p >> 5) & 0x3F) * 255 // 63
+    rgb[:, :, 2] = (p & 0x1F) * 255 // 31
+    with open(filename, 'wb') as f:
+      f.write(b'P6\n%d %d\n255\n' %(self.width, self.height))
+      f.write(rgb.tobytes())
+
+
+def _merge(a, b):
+  x, y = min(a.x, b.x), min(a.y, b.y)
+  return Rect(x, y, max(a.x + a.w, b.x + b.w) - x, max(a.y + a.h, b.y + b.h) - y)
+
+def _runs(flags, gap):
+  '''!
+    @brief [(start, end)] of the True runs of flags, runs closer than gap are joined
+  '''
+  idx = np.flatnonzero(flags)
+  if len(idx) == 0:
+    return []
+  breaks = np.flatnonzero(np.diff(idx) > gap + 1)
+  starts = np.concatenate(([idx[0]], idx[breaks + 1]))
+  ends = np.concatenate((idx[breaks], [idx[-1]])) + 1
+  return list(zip(starts.tolist(), ends.tolist()))
+
+def dirty_rects(old, new):
+  '''!
+    @brief The rectangles to send so the panel showing old shows new
+    @details Changed rows are grouped into bands, each band is split into column runs, then rectangles
+    @n  are merged while one window over both costs fewer SPI bytes than the two. Greedy, so not
+    @n  always the least bytes, but never more than a full redraw.
+    @return [Rect]
+  '''
+  diff = old != new
+  rects = []
+  for y0, y1 in _runs(diff.any(axis=1), 0):
+    band = diff[y0:y1]
+    # a gap of g columns is worth sending when its pixels cost less than a new window
+    gap = WINDOW_OVERHEAD // (2 * (y1 - y0))
+    for x0, x1 in _runs(band.any(axis=0), gap):
+      rows = np.flatnonzero(band[:, x0:x1].any(axis=1))
+      rects.append(Rect(x0, y0 + int(rows[0]), x1 - x0, int(rows[-1] - rows[0]) + 1))
+  merged = True
+  while merged and len(rects) > 1:
+    merged = False
+    best = None
+    for i in range(len(rects)):
+      for j in range(i + 1, len(rects)):
+        m = _merge(rects[i], rects[j])
+        saved = rect_bytes(rects[i]) + rect_bytes(rects[j]) - rect_bytes(m)
+        if saved >= 0 and (best is None or saved > best[0]):
+          best = (saved, i, j, m)
+    if best is not None:
+      saved, i, j, m = best
+      rects = [r for k, r in enumerate(rects) if k not in (i, j)] + [m]
+      merged = True
+  if sum(rect_bytes(r) for r in rects) > FULL_FRAME_BYTES:
+    return [Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+  return sorted(rects, key=lambda r: (r.y, r.x))
+
+
+class KeychainDisplay(object):
+  '''!
+    @brief The screen of the keychain, fed with the readings of DFRobot_SCD4X
+  '''
+
+  def __init__(self, font_path=FONT_PATH):
+    self.font12 = GFXFont.load('FreeMono12pt7b', font_path)
+    self.font9 = GFXFont.load('FreeMono9pt7b', font_path)
+    self.history = RingBuffer()
+    self.frame = FrameBuffer()
+    self.panel = FrameBuffer()   # what the panel shows
+    self.reading = None   # (CO2 ppm, temperature C, humidity %RH) on the screen
+    self.updates = 0
+    self.dirty_bytes = 0
+    self.full_bytes = 0
+
+  def render(self, co2, temp, humidity):
+    '''!
+      @brief Draw a reading into self.frame, the same calls as loop() of the sketch
+    '''
+    fb = self.frame
+    fb.fill_screen(COLOR_RGB565_BLACK)
+    fb.text_color = COLOR_RGB565_LGRAY
+    fb.font = self.font12
+    fb.text_size = 2
+    fb.set_cursor(2, 30)
+    fb.print_text("CO2:")
+    fb.set_cursor(0, 65)
+    fb.print_text("%d" %co2)
+
+    fb.text_size = 1
+    fb.set_cursor(110, 57)
+    fb.print_text(" ppm")
+    fb.set_cursor(0, 90)
+    fb.print_text("Temp:")
+    fb.set_cursor(0, 110)
+    fb.print_text("%.2f" %temp)
+    fb.set_cursor(75, 110)
+    fb.print_text(" C")
+    fb.set_cursor(0, 130)
+    fb.print_text("RH:")
+    fb.set_cursor(0, 150)
+    fb.print_text("%.2f" %humidity)
+    fb.set_cursor(75, 150)
+    fb.print_text(" %")
+
+    fb.font = self.font9
+    fb.set_cursor(1, 190)
+    fb.print_text("5K")
+
+    fb.write_line(10, 200, 10, 320, COLOR_RGB565_LGRAY)
+    fb.write_line(2, 315, 170, 315, COLOR_RGB565_LGRAY)
+    h = self.history
+    for i in range(len(h) - 1):
+      fb.write_line(HISTORY_X[i], h[i], HISTORY_X[i + 1], h[i + 1], COLOR_RGB565_LGRAY)
+
+  def update(self, co2, temp, humidity):
+    '''!
+      @brief Show a new reading
+      @return Update: the rectangles sent and their SPI bytes, next to the bytes of a full redraw
+    '''
+    self.reading = (co2, temp, humidity)
+    self.history.push(co2_to_y(co2))
+    self.render(co2, temp, humidity)
+    rects = dirty_rects(self.panel.pixels, self.frame.pixels)
+    for r in rects:
+      self.panel.pixels[r.y:r.y + r.h, r.x:r.x + r.w] = self.frame.pixels[r.y:r.y + r.h, r.x:r.x + r.w]
+    update = Update(rects, sum(rect_bytes(r) for r in rects), FULL_FRAME_BYTES)
+    self.updates += 1
+    self.dirty_bytes += update.dirty_bytes
+    self.full_bytes += update.full_bytes
+    return update
+
+  def poll(self, sensor):
+    '''!
+      @brief Show the reading of sensor (DFRobot_SCD4X in periodic measurement mode) if there is a new one
+      @return Update, None when no data is ready
+    '''
+    if not sensor.get_data_ready_status:
+      return None
+    co2, temp, humidity = sensor.read_measurement
+    return self.update(co2, temp, humidity)
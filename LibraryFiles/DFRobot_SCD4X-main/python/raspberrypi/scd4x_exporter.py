@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_exporter.py
+  @brief  HTTP endpoint with the latest readings of a SensorPoller, Prometheus text on /metrics and JSON on /json
+  @details Requests only read poller.snapshot, they never touch the I2C bus and never wait for the poll loop.
+  @n  The body of a snapshot is rendered once and kept with it, a request only adds the data ready ages,
+  @n  so hundreds of scrapes per second cost little more than writing the bytes.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import json
+import time
+import threading
+
+from scd4x_health import STATE_VALUES
+
+try:
+  from http.server import BaseHTTPRequestHandler, HTTPServer
+  from socketserver import ThreadingMixIn
+except ImportError:   # Python 2
+  from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+  from SocketServer import ThreadingMixIn
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+JSON_CONTENT_TYPE = 'application/json'
+
+## (name, type, help, function(SensorState) -> value or None)
+METRICS = [
+  ('scd4x_co2_ppm', 'gauge', 'CO2 concentration of the last reading',
+   lambda s: s.sample.co2 if s.sample else None),
+  ('scd4x_temperature_celsius', 'gauge', 'Temperature of the last reading',
+   lambda s: s.sample.temp if s.sample else None),
+  ('scd4x_humidity_percent', 'gauge', 'Relative humidity of the last reading',
+   lambda s: s.sample.humidity if s.sample else None),
+  ('scd4x_last_reading_timestamp_seconds', 'gauge', 'Time of the last reading',
+   lambda s: s.updated),
+  ('scd4x_polls_total', 'counter', 'Data ready checks',
+   lambda s: s.polls),
+  ('scd4x_readings_total', 'counter', 'Measurements read',
+   lambda s: s.readings),
+  ('scd4x_io_errors_total', 'counter', 'Failed I2C transfers',
+   lambda s: s.io_errors),
+  ('scd4x_crc_errors_total', 'counter', 'Words read with a wrong CRC',
+   lambda s: s.crc_errors),
+  ('scd4x_health_state', 'gauge', 'Health of the sensor, 0 ok, 1 suspect, 2 failed',
+   lambda s: STATE_VALUES[s.health.state] if s.health else None),
+]
+
+AGE_METRIC = 'scd4x_data_age_seconds'
+
+
+def escape_label(value):
+  return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_value(value):
+  if isinstance(value, float):
+    return repr(value)
+  return str(value)
+
+def render_prometheus(snapshot):
+  '''!
+    @brief The part of /metrics that only depends on the snapshot
+    @return (bytes, [(label, updated)]) the body and the sensors whose age is added per request
+  '''
+  lines = []
+  for name, kind, help, get in METRICS:
+    lines.append('# HELP %s %s' %(name, help))
+    lines.append('# TYPE %s %s' %(name, kind))
+    for state in snapshot.sensors.values():
+      value = get(state)
+      if value is not None:
+        lines.append('%s{sensor="%s"} %s' %(name, escape_label(state.name), format_value(value)))
+  lines.append('# HELP %s Seconds since the last reading' %AGE_METRIC)
+  lines.append('# TYPE %s gauge' %AGE_METRIC)
+  ages = [(escape_label(s.name), s.updated) for s in snapshot.sensors.values() if s.updated is not None]
+  return ('\n'.join(lines) + '\n').encode('utf-8'), ages
+
+def render_json(snapshot):
+  '''!
+    @brief /json without the ages, the dict is copied per request to add them
+  '''
+  sensors = {}
+  for state in snapshot.sensors.values():
+    sensors[state.name] = {
+      'co2': state.sample.co2 if state.sample else None,
+      'temp': state.sample.temp if state.sample else None,
+      'humidity': state.sample.humidity if state.sample else None,
+      'updated': state.updated,
+      'polls': state.polls,
+      'readings': state.readings,
+      'io_errors': state.io_errors,
+      'crc_errors': state.crc_errors,
+      'health': state.health.state if state.health else None,
+      'issues': list(state.health.issues) if state.health else [],
+    }
+  return {'timestamp': snapshot.timestamp, 'version': snapshot.version, 'sensors': sensors}
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+  daemon_threads = True
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'   # keep-alive, a scraper reuses its connection
+  disable_nagle_algorithm = True   # the headers and the body are two writes, don't wait for the ACK in between
+
+  def do_GET(self):
+    exporter = self.server.exporter
+    path = self.path.split('?', 1)[0]
+    if path == '/metrics':
+      self.reply(200, PROMETHEUS_CONTENT_TYPE, exporter.metrics())
+    elif path == '/json':
+      self.reply(200, JSON_CONTENT_TYPE, exporter.json())
+    else:
+      self.reply(404, 'text/plain', b'Not found, try /metrics or /json\n')
+
+  def reply(self, code, content_type, body):
+    self.send_response(code)
+    self.send_header('Content-Type', content_type)
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass   # one line per scrape is too much
+
+
+class MetricsExporter(object):
+  '''!
+    @brief Serve the snapshot of a SensorPoller over HTTP
+  '''
+
+  def __init__(self, poller, host='0.0.0.0', port=9536, clock=time.time):
+    '''!
+      @param poller SensorPoller, only its snapshot attribute is read
+      @param host address to listen on
+      @param port TCP port, 0 picks a free one (see self.port)
+      @param clock the clock of the poller, for the data ready ages
+    '''
+    self.poller = poller
+    self.clock = clock
+    self.requests = 0
+    self._lock = threading.Lock()   # requests is counted from the threads of the server
+    self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+    self._server.exporter = self
+    self.port = self._server.server_address[1]
+    self._thread = None
+
+  def metrics(self):
+    '''!
+      @brief The /metrics body of the current snapshot
+    '''
+    with self._lock:
+      self.requests += 1
+    body, ages = self.poller.snapshot.cached('prometheus', render_prometheus)
+    now = self.clock()
+    return body + ''.join('%s{sensor="%s"} %.3f\n' %(AGE_METRIC, label, now - updated)
+                          for label, updated in ages).encode('utf-8')
+
+  def json(self):
+    '''!
+      @brief The /json body of the current snapshot
+    '''
+    with self._lock:
+      self.requests += 1
+    data = self.poller.snapshot.cached('json', render_json)
+    now = self.clock()
+    sensors = {}
+    for name, values in data['sensors'].items():
+      values = dict(values)
+      values['age'] = None if values['updated'] is None else now - values['updated']
+      sensors[name] = values
+    return json.dumps({'timestamp': data['timestamp'], 'version': data['version'], 'sensors': sensors}).encode('utf-8')
+
+  def serve_forever(self):
+    self._server.serve_forever()
+
+  def start(self):
+    '''!
+      @brief Serve in a background thread
+    '''
+    self._thread = threading.Thread(target=self._server.serve_forever, name='scd4x-exporter')
+    self._thread.daemon = True
+    self._thread.start()
+
+  def stop(self):
+    self._server.shutdown()
+    self._server.server_close()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
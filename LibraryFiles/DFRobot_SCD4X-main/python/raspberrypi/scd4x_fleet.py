@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_fleet.py
+  @brief  Run self test, forced recalibration and factory reset on many SCD4X sensors at once
+  @details The three commands keep the sensor busy for 10 s, 400 ms and 1.2 s, and each needs the periodic
+  @n  measurement stopped first (another 500 ms). The bus is idle during that time, so FleetExecutor
+  @n  runs the operations in threads: up to per_bus sensors of the same bus at a time, and up to
+  @n  max_workers in total. The forced recalibration also needs 3 minutes of periodic measurement before
+  @n  the stop; the executor starts all the sensors, waits the warm-up once for the whole fleet, then
+  @n  calibrates them. calibrate() applies a temperature offset change and a CO2 correction (through the
+  @n  forced recalibration) to each sensor in a single stop, e.g. the plan of scd4x_calibration.
+  @n  The results are collected into a FleetReport.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import time
+import threading
+import collections
+
+from DFRobot_SCD4X import *
+
+## periodic measurement the sensor needs before perform_forced_recalibration, s
+FRC_WARMUP  = 180.0
+## perform_forced_recalibration result when the calibration failed
+FRC_FAILED  = 0x7fff
+
+SELF_TEST      = 'self_test'
+FORCED_RECALIB = 'forced_recalibration'
+FACTORY_RESET  = 'factory_reset'
+CALIBRATE      = 'calibration'
+
+## the result of one operation on one sensor
+## value: self test status word (0: no malfunction), FRC correction in ppm (FRC_FAILED: failed), None for the factory reset
+## and for a calibration without CO2 correction
+## seconds: time the operation took including the stop, error: text when ok is False, else None
+OpResult = collections.namedtuple('OpResult', ['sensor', 'bus', 'operation', 'ok', 'value', 'seconds', 'error'])
+
+
+class FleetReport(object):
+  '''!
+    @brief The results of one operation over the fleet
+  '''
+
+  def __init__(self, operation, results, wall_time):
+    self.operation = operation
+    self.results = results   # [OpResult] in the order the sensors were added
+    self.wall_time = wall_time
+
+  @property
+  def sequential_time(self):
+    '''!
+      @return the seconds the operations would have taken one after another
+    '''
+    return sum(r.seconds for r in self.results)
+
+  def failed(self):
+    return [r for r in self.results if not r.ok]
+
+  def format(self):
+    '''!
+      @return the report as text, one line per sensor then a summary
+    '''
+    lines = ['%-16s %-8s %-4s %8s %7s  %s' %('sensor', 'bus', 'ok', 'value', 'time', 'error')]
+    for r in self.results:
+      value = '-' if r.value is None else ('%#06x' %r.value if r.operation == SELF_TEST else str(r.value))
+      lines.append('%-16s %-8s %-4s %8s %6.1fs  %s' %(r.sensor, r.bus, 'yes' if r.ok else 'NO', value, r.seconds,
+                   r.error or ''))
+    lines.append('%s: %d sensors, %d failed, %.1f s (%.1f s one after another)' %(self.operation, len(self.results),
+                 len(self.failed()), self.wall_time, self.sequential_time))
+    return '\n'.join(lines)
+
+
+class FleetExecutor(object):
+  '''!
+    @brief Run maintenance commands concurrently on DFRobot_SCD4X sensors
+  '''
+
+  def __init__(self, per_bus=1, max_workers=64, restart=True, sleep=time.sleep, clock=time.time):
+    '''!
+      @param per_bus sensors of one bus running an operation at the same time. Keep 1 behind an I2C multiplexer,
+      @n     whose channel must not be switched while another sensor is being talked to
+      @param max_workers operations running at the same time over all the buses
+      @param restart start the periodic measurement again after the operation (not after a factory reset)
+      @param sleep function(seconds) used for the FRC warm-up, e.g. FakeClock.advance with simulated sensors
+      @param clock function returning the time in seconds, for the durations in the report
+    '''
+    self.per_bus = per_bus
+    self.max_workers = max_workers
+    self.restart = restart
+    self.sleep = sleep
+    self.clock = clock
+    self._sensors = collections.OrderedDict()   # name -> (sensor, bus)
+
+  def add(self, name, sensor, bus=None):
+    '''!
+      @param name name of the sensor in the report
+      @param sensor DFRobot_SCD4X
+      @param bus key of the I2C bus the sensor is on (e.g. 1 for /dev/i2c-1), sensors with the same key share
+      @n     the per_bus limit. None: a bus of its own
+    '''
+    self._sensors[name] = (sensor, name if bus is None else bus)
+
+  def remove(self, name):
+    del self._sensors[name]
+
+  ''''''''''''''''''''''''''' operations '''''''''''''''''''''''''''
+
+  def self_test(self, names=None):
+    '''!
+      @brief perform_self_test on every sensor, ok when the status word is 0
+      @param names the sensors to test, default all
+      @return FleetReport
+    '''
+    def op(sensor):
+      value = sensor.perform_self_test
+      return value, value == 0, None if value == 0 else 'malfunction detected'
+    return self._run(SELF_TEST, op, names)
+
+  def factory_reset(self, names=None):
+    '''!
+      @brief perform_factory_reset on every sensor, the sensors are left idle
+      @return FleetReport
+    '''
+    def op(sensor):
+      sensor.perform_factory_reset
+      return None, True, None
+    return self._run(FACTORY_RESET, op, names, restart=False)
+
+  def forced_recalibration(self, target, names=None, warmup=FRC_WARMUP):
+    '''!
+      @brief perform_forced_recalibration on every sensor, ok when the result is not FRC_FAILED
+      @param target reference CO2 concentration in ppm, or {name: ppm} for one per sensor
+      @param names the sensors to calibrate, default all (or the keys of target)
+      @param warmup seconds of periodic measurement before the calibration, 0 if the sensors are already measuring
+      @n     for that long. The wait is done once for all the sensors
+      @return FleetReport
+    '''
+    if isinstance(target, dict) and names is None:
+      names = list(target)
+    names = list(self._sensors) if names is None else list(names)
+    names, failed = self._warm_up(FORCED_RECALIB, names, warmup)
+
+    def op(sensor, name):
+      ppm = target[name] if isinstance(target, dict) else target
+      value = sensor.perform_forced_recalibration(ppm)
+      if value == FRC_FAILED:
+        return value, False, 'calibration failed'
+      return value, True, None
+    return self._merge(self._run(FORCED_RECALIB, op, names, with_name=True), failed)
+
+  def calibrate(self, corrections, warmup=FRC_WARMUP, persist=False, timeout=35.0):
+    '''!
+      @brief Correct the CO2 and temperature readings of the sensors, each in one stop of its measurement
+      @details For a CO2 correction the next reading of the sensor is waited for (up to timeout seconds),
+      @n  then the sensor is stopped and calibrated to that reading plus the correction with
+      @n  perform_forced_recalibration. A temperature correction is taken off the offset read with
+      @n  get_temp_comp (see set_temp_comp), offsets below 0 are set to 0.
+      @param corrections {name: (CO2 correction in ppm or None, temperature correction in C or None)},
+      @n     a positive correction raises the readings
+      @param warmup seconds of periodic measurement before a CO2 correction, waited once like in forced_recalibration
+      @param persist write the settings to the EEPROM after the corrections (persist_settings)
+      @param timeout seconds to wait for the reading the CO2 target is based on
+      @return FleetReport, the value of a result is the FRC correction, None without CO2 correction
+    '''
+    names = [name for name in self._sensors if name in corrections]
+    co2_names = [name for name in names if corrections[name][0] is not None]
+    ready, failed = self._warm_up(CALIBRATE, co2_names, warmup)
+    names = [name for name in names if name in ready or name not in co2_names]
+
+    def op(sensor, name):
+      co2, temp = corrections[name]
+      target = None
+      if co2 is not None:
+        deadline = self.clock() + timeout
+        while not sensor.get_data_ready_status:
+          if self.clock() > deadline:
+            sensor.enable_period_measure(SCD4X_STOP_PERIODIC_MEASURE)
+            return None, False, 'no reading for the CO2 target'
+          self.sleep(0.1)
+        target = int(round(sensor.read_measurement[0] + co2))
+      sensor.enable_period_measure(SCD4X_STOP_PERIODIC_MEASURE)
+      if temp is not None:
+        sensor.set_temp_comp(max(0.0, sensor.get_temp_comp - temp))
+      value = None
+      if target is not None:
+        value = sensor.perform_forced_recalibration(max(0, target))
+        if value == FRC_FAILED:
+          return value, False, 'calibration failed'
+      if persist:
+        sensor.persist_settings
+      return value, True, None
+    return self._merge(self._run(CALIBRATE, op, names, with_name=True, stop=False), failed)
+
+  ''''''''''''''''''''''''''' running '''''''''''''''''''''''''''
+
+  def _warm_up(self, operation, names, warmup):
+    '''!
+      @brief (Re)start the periodic measurement of the sensors and wait warmup seconds once for all
+      @return (names of the sensors started, [OpResult] of the others)
+    '''
+    if warmup <= 0 or not names:
+      return names, []
+    def start(sensor):
+      sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+      return None, True, None
+    report = self._run(operation, start, names, restart=False)   # (re)start them all, the stop takes 500 ms
+    self.sleep(warmup)
+    return [r.sensor for r in report.results if r.ok], report.failed()
+
+  def _merge(self, report, failed):
+    '''!
+      @brief Add the sensors that failed the warm-up to the report, in the order the sensors were added
+    '''
+    if failed:
+      order = dict((name, i) for i, name in enumerate(self._sensors))
+      report.results = sorted(report.results + failed, key=lambda r: order[r.sensor])
+    return report
+
+  def _run_one(self, operation, op, name, with_name, restart, stop):
+    sensor, bus = self._sensors[name]
+    start = self.clock()
+    errors = sensor.io_errors + sensor.crc_errors
+    try:
+      if stop:
+        sensor.enable_period_measure(SCD4X_STOP_PERIODIC_MEASURE)
+      value, ok, error = op(sensor, name) if with_name else op(sensor)
+      errors = sensor.io_errors + sensor.crc_errors - errors
+      if errors:
+        ok = False
+        error = '%d I2C or CRC errors' %errors
+      if restart:
+        sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+    except Exception as e:   # one broken sensor must not stop the others
+      value, ok, error = None, False, '%s: %s' %(type(e).__name__, e)
+    return OpResult(name, bus, operation, ok, value, self.clock() - start, error)
+
+  def _run(self, operation, op, names, with_name=False, restart=None, stop=True):
+    '''!
+      @brief Run op on the sensors, one thread per bus slot
+      @param stop stop the periodic measurement before op, else op does it
+    '''
+    if restart is None:
+      restart = self.restart
+    names = list(self._sensors) if names is None else list(names)
+    queues = collections.OrderedDict()   # bus -> names waiting
+    for name in names:
+      queues.setdefault(self._sensors[name][1], collections.deque()).append(name)
+    results = {}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(self.max_workers)
+
+    def work(waiting):
+      while True:
+        with lock:
+          if not waiting:
+            return
+          name = waiting.popleft()
+        with slots:
+          result = self._run_one(operation, op, name, with_name, restart, stop)
+        with lock:
+          results[name] = result
+
+    start = self.clock()
+    threads = []
+    for waiting in queues.values():
+      for i in range(min(self.per_bus, len(waiting))):
+        t = threading.Thread(target=work, args=(waiting,), name='scd4x-fleet')
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+      t.join()
+    return FleetReport(operation, [results[name] for name in names], self.clock() - start)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_health.py
+  @brief  Judge the health of each sensor from its stream of readings and error counters
+  @details A failed read returns zeros (0 ppm, -45 C, 0 %RH), a CRC mismatch is only counted
+  @n  (DFRobot_SCD4X.crc_errors) and a stuck sensor repeats the same reading, so none of them stop the
+  @n  poll loop. HealthMonitor looks at every poll of every sensor and flags:
+  @n    zero_frame  a reading of all zeros or at -45 C (raw temperature 0)
+  @n    range       a reading outside the range of the sensor
+  @n    jump        a change faster than the air can change
+  @n    flatline    the same reading flatline_samples times in a row
+  @n    errors      a moving average of the polls with I2C or CRC errors above error_rate
+  @n  Each poll costs the same whatever the history, only the last reading and a few counters are kept.
+  @n  A sensor with an issue is SUSPECT, after fail_after polls in a row FAILED, and OK again after
+  @n  recover_after clean polls. A FAILED sensor is polled less and less often (backoff doubling up to
+  @n  max_backoff), SensorPoller(health = HealthMonitor()) skips it in between.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import collections
+
+OK      = 'ok'
+SUSPECT = 'suspect'
+FAILED  = 'failed'
+
+## value of each state in the metrics
+STATE_VALUES = {OK: 0, SUSPECT: 1, FAILED: 2}
+
+## issues that make the reading itself wrong, SensorPoller does not pass it to the listeners
+INVALID_ISSUES = ('zero_frame', 'range')
+
+## the health of one sensor after a poll
+## state: OK, SUSPECT or FAILED, issues: tuple of the issues of this poll, error_rate: moving average of the
+## polls with errors, valid: False when the reading of this poll is wrong, retry_at: next poll time of a FAILED sensor
+Health = collections.namedtuple('Health', ['state', 'issues', 'error_rate', 'valid', 'retry_at'])
+
+
+class SensorHealth(object):
+  '''!
+    @brief The checks of one sensor
+  '''
+
+  def __init__(self, monitor):
+    self.monitor = monitor
+    self.health = Health(OK, (), 0.0, True, None)
+    self._last = None          # last Sample
+    self._same = 0             # readings in a row equal to the last one
+    self._errors = None        # io_errors + crc_errors at the last poll
+    self._bad = 0              # polls in a row with an issue
+    self._good = 0             # polls in a row without an issue
+    self._backoff = 0.0
+
+  def _check_sample(self, sample, issues):
+    m = self.monitor
+    co2, temp, humidity = sample.co2, sample.temp, sample.humidity
+    if temp <= -45.0 or (co2 == 0 and humidity == 0.0):
+      issues.append('zero_frame')
+      return
+    if co2 > 40000 or not (-10.0 <= temp <= 60.0) or not (0.0 <= humidity <= 100.0):
+      issues.append('range')
+      return
+    last = self._last
+    self._last = sample
+    if last is None:
+      self._same = 1
+      return
+    dt = max(sample.timestamp - last.timestamp, 1.0)
+    if (abs(co2 - last.co2) > m.max_co2_rate * dt or abs(temp - last.temp) > m.max_temp_rate * dt or
+        abs(humidity - last.humidity) > m.max_humidity_rate * dt):
+      issues.append('jump')
+    if co2 == last.co2 and temp == last.temp and humidity == last.humidity:
+      self._same += 1
+      if self._same >= m.flatline_samples:
+        issues.append('flatline')
+    else:
+      self._same = 1
+
+  def update(self, now, sample, errors):
+    '''!
+      @param now time of the poll
+      @param sample Sample read by this poll, None when there was no new data
+      @param errors io_errors + crc_errors of the sensor
+      @return Health
+    '''
+    m = self.monitor
+    issues = []
+    new_errors = 0 if self._errors is None else errors - self._errors
+    self._errors = errors
+    rate = self.health.error_rate + m.error_alpha * ((1.0 if new_errors > 0 else 0.0) - self.health.error_rate)
+    if rate > m.error_rate:
+      issues.append('errors')
+    if sample is not None:
+      self._check_sample(sample, issues)
+    state = self.health.state
+    if issues:
+      self._bad += 1
+      self._good = 0
+      state = FAILED if self._bad >= m.fail_after else max(state, SUSPECT, key=STATE_VALUES.get)
+    elif sample is not None:   # a poll without new data says nothing about the readings
+      self._bad = 0
+      self._good += 1
+      if self._good >= m.recover_after:
+        state = OK
+    retry_at = None
+    if state == FAILED:
+      if issues:   # a sensor on its way back keeps its pace
+        self._backoff = min(self._backoff * 2, m.max_backoff) if self._backoff else m.backoff
+      retry_at = now + self._backoff
+    else:
+      self._backoff = 0.0
+    self.health = Health(state, tuple(issues), rate,
+                         not any(i in INVALID_ISSUES for i in issues), retry_at)
+    return self.health
+
+
+class HealthMonitor(object):
+  '''!
+    @brief Health of every sensor of a SensorPoller
+  '''
+
+  def __init__(self, flatline_samples=24, max_co2_rate=200.0, max_temp_rate=1.0, max_humidity_rate=5.0,
+               error_rate=0.3, error_alpha=0.1, fail_after=6, recover_after=3, backoff=5.0, max_backoff=300.0):
+    '''!
+      @param flatline_samples equal readings in a row that make a flatline, 24 is 2 minutes at 5 s
+      @param max_co2_rate fastest believable CO2 change, ppm/s
+      @param max_temp_rate fastest believable temperature change, C/s
+      @param max_humidity_rate fastest believable humidity change, %RH/s
+      @param error_rate share of the polls with errors above which the sensor is flagged
+      @param error_alpha weight of the last poll in that moving average
+      @param fail_after polls in a row with an issue before a sensor is FAILED
+      @param recover_after polls in a row without an issue before a sensor is OK again
+      @param backoff seconds between the polls of a FAILED sensor at first, doubled after each poll with an issue
+      @param max_backoff the most seconds between the polls of a FAILED sensor
+    '''
+    self.flatline_samples = flatline_samples
+    self.max_co2_rate = max_co2_rate
+    self.max_temp_rate = max_temp_rate
+    self.max_humidity_rate = max_humidity_rate
+    self.error_rate = error_rate
+    self.error_alpha = error_alpha
+    self.fail_after = fail_after
+    self.recover_after = recover_after
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self._sensors = {}
+
+  def _get(self, name):
+    sensor = self._sensors.get(name)
+    if sensor is None:
+      sensor = self._sensors[name] = SensorHealth(self)
+    return sensor
+
+  def update(self, name, now, sample, errors):
+    '''!
+      @brief Add one poll of a sensor
+      @param name name of the sensor
+      @param now time of the poll
+      @param sample Sample read by this poll, None when there was no new data
+      @param errors io_errors + crc_errors of the sensor
+      @return Health
+    '''
+    return self._get(name).update(now, sample, errors)
+
+  def health(self, name):
+    return self._get(name).health
+
+  def should_poll(self, name, now):
+    '''!
+      @return False while a FAILED sensor is backing off
+    '''
+    health = self._get(name).health
+    return health.retry_at is None or now >= health.retry_at
+
+  def remove(self, name):
+    self._sensors.pop(name, None)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_history.py
+  @brief  Compact in-memory history of the readings of many sensors, for weeks of 5 s samples on a Raspberry Pi
+  @details Each sample is kept as the values on the wire: CO2 in ppm and the 16 bit raw temperature and
+  @n  humidity, with the time in ms. Samples go into blocks of block_size: the time as the change of the
+  @n  interval and each value as the change from the previous sample, zig-zag varint encoded, so a
+  @n  reading every 5 s usually takes 4 to 6 bytes instead of the 100 of a Sample tuple.
+  @n  Every block also keeps the min, max and sum of each value; aggregate() answers from these for
+  @n  the blocks inside the range and only decodes the blocks at its two ends.
+  @n  History.add is a SensorPoller listener.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import threading
+import collections
+
+from scd4x_poller import Sample
+
+## (min, max, mean) of one value over a range, in ppm, C or %RH
+Stats = collections.namedtuple('Stats', ['min', 'max', 'mean'])
+## the result of History.aggregate, None for the values when count is 0
+Aggregate = collections.namedtuple('Aggregate', ['count', 'co2', 'temp', 'humidity'])
+
+
+def temp_to_raw(temp):
+  return int(round((temp + 45) * (1 << 16) / 175))
+
+def raw_to_temp(raw):
+  return -45 + 175 * float(raw) / (1 << 16)
+
+def humidity_to_raw(humidity):
+  return int(round(humidity * (1 << 16) / 100))
+
+def raw_to_humidity(raw):
+  return 100 * float(raw) / (1 << 16)
+
+## raw value -> unit, for CO2, temperature and humidity
+CONVERT = (float, raw_to_temp, raw_to_humidity)
+
+
+def put_varint(buf, n):
+  '''!
+    @brief Append a signed integer to buf, zig-zag then 7 bits per byte
+  '''
+  n = (n << 1) if n >= 0 else ((-n) << 1) - 1
+  while n > 0x7F:
+    buf.append((n & 0x7F) | 0x80)
+    n >>= 7
+  buf.append(n)
+
+def iter_varints(data):
+  '''!
+    @brief The signed integers written by put_varint
+  '''
+  n = shift = 0
+  for byte in bytearray(data):
+    n |= (byte & 0x7F) << shift
+    if byte & 0x80:
+      shift += 7
+      continue
+    yield (n >> 1) if not n & 1 else -((n + 1) >> 1)
+    n = shift = 0
+
+
+class Block(object):
+  '''!
+    @brief Up to block_size samples of one sensor and their summary
+  '''
+  __slots__ = ('start', 'end', 'count', 'min', 'max', 'sum', 'data', '_first', '_last', '_step')
+
+  def __init__(self):
+    self.start = self.end = None   # time of the first and the last sample, ms
+    self.count = 0
+    self.min = [None, None, None]  # co2, raw temperature, raw humidity
+    self.max = [None, None, None]
+    self.sum = [0, 0, 0]
+    self.data = bytearray()
+    self._first = None             # (ms, co2, raw temperature, raw humidity) of the first sample
+    self._last = None              # the same for the last sample
+    self._step = 0                 # ms between the last two samples
+
+  def append(self, ms, values):
+    if self._first is None:
+      self._first = (ms,) + values
+      self.start = ms
+    else:
+      last = self._last
+      step = ms - last[0]
+      put_varint(self.data, step - self._step)
+      self._step = step
+      for i in range(3):
+        put_varint(self.data, values[i] - last[i + 1])
+    self._last = (ms,) + values
+    self.end = ms
+    self.count += 1
+    for i in range(3):
+      v = values[i]
+      if self.min[i] is None or v < self.min[i]:
+        self.min[i] = v
+      if self.max[i] is None or v > self.max[i]:
+        self.max[i] = v
+      self.sum[i] += v
+
+  def seal(self):
+    '''!
+      @brief No more samples, drop the spare room of the buffer
+    '''
+    self.data = bytes(self.data)
+    self._last = None
+
+  def samples(self):
+    '''!
+      @return [(ms, co2, raw temperature, raw humidity)]
+    '''
+    if self._first is None:
+      return []
+    result = [self._first]
+    ms, a, b, c = self._first
+    step = 0
+    it = iter_varints(self.data)
+    for ddt in it:
+      step += ddt
+      ms += step
+      a += next(it)
+      b += next(it)
+      c += next(it)
+      result.append((ms, a, b, c))
+    return result
+
+  def nbytes(self):
+    return len(self.data) + 3 * 8 * 4   # data plus about the size of the summary
+
+
+class History(object):
+  '''!
+    @brief The readings of several sensors, oldest blocks dropped beyond max_bytes per sensor
+  '''
+
+  def __init__(self, block_size=720, max_bytes=None):
+    '''!
+      @param block_size samples per block, 720 is an hour at 5 s
+      @param max_bytes encoded bytes kept per sensor, None keeps everything
+    '''
+    self.block_size = block_size
+    self.max_bytes = max_bytes
+    self.decoded_blocks = 0   # blocks aggregate() had to decode, the others were answered from their summary
+    self._sensors = collections.OrderedDict()   # name -> [Block], oldest first
+    self._bytes = {}
+    self._lock = threading.Lock()
+
+  def add(self, samples):
+    '''!
+      @brief Store samples, a SensorPoller listener
+    '''
+    with self._lock:
+      for s in samples:
+        self._append(s.sensor, s.timestamp, s.co2, s.temp, s.humidity)
+
+  def append(self, name, timestamp, co2, temp, humidity):
+    '''!
+      @brief Store one reading of read_measurement, timestamps of a sensor must not go back
+    '''
+    with self._lock:
+      self._append(name, timestamp, co2, temp, humidity)
+
+  def _append(self, name, timestamp, co2, temp, humidity):
+    blocks = self._sensors.get(name)
+    if blocks is None:
+      blocks = self._sensors[name] = [Block()]
+      self._bytes[name] = 0
+    block = blocks[-1]
+    if block.count >= self.block_size:
+      block.seal()
+      self._bytes[name] += block.nbytes()
+      block = Block()
+      blocks.append(block)
+      while self.max_bytes is not None and self._bytes[name] > self.max_bytes and len(blocks) > 1:
+        self._bytes[name] -= blocks.pop(0).nbytes()
+    block.append(int(round(timestamp * 1000)), (co2, temp_to_raw(temp), humidity_to_raw(humidity)))
+
+  def sensors(self):
+    return list(self._sensors)
+
+  def nbytes(self, name=None):
+    '''!
+      @return encoded bytes of one sensor, or of all
+    '''
+    names = self._sensors if name is None else [name]
+    return sum(b.nbytes() for n in names for b in self._sensors[n])
+
+  def count(self, name):
+    return sum(b.count for b in self._sensors.get(name, []))
+
+  def _blocks(self, name, start, end):
+    '''!
+      @return the blocks of name that overlap [start, end) in ms, None meaning open
+    '''
+    for block in self._sensors.get(name, []):
+      if block.count and (end is None or block.start < end) and (start is None or block.end >= start):
+        yield block
+
+  def samples(self, name, start=None, end=None):
+    '''!
+      @return [Sample] of name from start (included) to end (excluded), in seconds
+    '''
+    start_ms = None if start is None else int(round(start * 1000))
+    end_ms = None if end is None else int(round(end * 1000))
+    result = []
+    with self._lock:
+      for block in self._blocks(name, start_ms, end_ms):
+        for ms, co2, t, h in block.samples():
+          if (start_ms is None or ms >= start_ms) and (end_ms is None or ms < end_ms):
+            result.append(Sample(name, ms / 1000.0, co2, raw_to_temp(t), raw_to_humidity(h)))
+    return result
+
+  def aggregate(self, name, start=None, end=None):
+    '''!
+      @brief min, max and mean of each value of name from start (included) to end (excluded), in seconds
+      @return Aggregate
+    '''
+    start_ms = None if start is None else int(round(start * 1000))
+    end_ms = None if end is None else int(round(end * 1000))
+    count = 0
+    lo = [None, None, None]
+    hi = [None, None, None]
+    total = [0, 0, 0]
+    with self._lock:
+      for block in self._blocks(name, start_ms, end_ms):
+        if (start_ms is None or block.start >= start_ms) and (end_ms is None or block.end < end_ms):
+          parts = [(block.count, block.min, block.max, block.sum)]
+        else:
+          self.decoded_blocks += 1
+          values = [s[1:] for s in block.samples()
+                    if (start_ms is None or s[0] >= start_ms) and (end_ms is None or s[0] < end_ms)]
+          parts = [(1, v, v, v) for v in values]
+        for n, mins, maxs, sums in parts:
+          count += n
+          for i in range(3):
+            if lo[i] is None or mins[i] < lo[i]:
+              lo[i] = mins[i]
+            if hi[i] is None or maxs[i] > hi[i]:
+              hi[i] = maxs[i]
+            total[i] += sums[i]
+    if not count:
+      return Aggregate(0, None, None, None)
+    stats = [Stats(CONVERT[i](lo[i]), CONVERT[i](hi[i]), CONVERT[i](float(total[i]) / count)) for i in range(3)]
+    return Aggregate(count, *stats)
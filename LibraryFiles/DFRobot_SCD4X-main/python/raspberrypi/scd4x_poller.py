@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_poller.py
+  @brief  Poll several SCD4X sensors and keep the latest reading of each in a snapshot
+  @details The poll loop is the only code that talks to the I2C bus. After each round it builds a new
+  @n  Snapshot and swaps it in with a single assignment, so readers (e.g. scd4x_exporter) always see a
+  @n  complete round and never wait for the bus. New samples are also passed to the listeners.
+  @n  With a scd4x_health.HealthMonitor the poller skips FAILED sensors while they back off, and keeps
+  @n  readings that are wrong (all zeros, out of range) out of the snapshot and away from the listeners.
+  @n  Sensors can be added and removed from other threads while the loop runs.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import time
+import threading
+import collections
+
+## one reading of read_measurement, timestamp in seconds of the poller clock
+Sample = collections.namedtuple('Sample', ['sensor', 'timestamp', 'co2', 'temp', 'humidity'])
+
+## the state of one sensor in a snapshot
+## sample: last Sample or None, polls: data ready checks, readings: samples read,
+## io_errors: failed I2C transfers, crc_errors: words with a wrong CRC, updated: time of the last data ready
+## (None before the first), health: scd4x_health.Health of the last poll (None without a HealthMonitor)
+SensorState = collections.namedtuple('SensorState', ['name', 'sample', 'polls', 'readings', 'io_errors', 'crc_errors',
+                                                     'updated', 'health'])
+
+
+class Snapshot(object):
+  '''!
+    @brief The state of every sensor after one poll round, never changed once published
+  '''
+
+  def __init__(self, timestamp, sensors, version):
+    self.timestamp = timestamp
+    self.sensors = sensors   # OrderedDict name -> SensorState
+    self.version = version
+    self._cache = {}
+
+  def cached(self, key, build):
+    '''!
+      @brief Return build(self), built once per snapshot, for output that only depends on the snapshot
+    '''
+    value = self._cache.get(key)
+    if value is None:
+      value = build(self)
+      self._cache[key] = value
+    return value
+
+
+class SensorPoller(object):
+  '''!
+    @brief Poll DFRobot_SCD4X sensors in periodic measurement mode
+  '''
+
+  def __init__(self, sensors=None, interval=1.0, clock=time.time, health=None):
+    '''!
+      @param sensors {name: DFRobot_SCD4X}, already started with enable_period_measure
+      @param interval seconds between poll rounds, the sensors have new data every 5 s (30 s in low power mode)
+      @param clock function returning the time stamped on the samples
+      @param health scd4x_health.HealthMonitor, None to poll every sensor every round
+    '''
+    self.interval = interval
+    self.clock = clock
+    self.health = health
+    self.listeners = []
+    self._sensors = collections.OrderedDict()
+    self._states = collections.OrderedDict()
+    self._lock = threading.Lock()   # _sensors and _states, not held while the bus is used
+    self._stop = threading.Event()
+    self._thread = None
+    self.snapshot = Snapshot(clock(), collections.OrderedDict(), 0)
+    for name, sensor in (sensors or {}).items():
+      self.add(name, sensor)
+
+  def add(self, name, sensor):
+    with self._lock:
+      self._sensors[name] = sensor
+      self._states[name] = SensorState(name, None, 0, 0, 0, 0, None, None)
+
+  def remove(self, name):
+    with self._lock:
+      del self._sensors[name]
+      del self._states[name]
+    if self.health is not None:
+      self.health.remove(name)
+
+  def add_listener(self, listener):
+    '''!
+      @brief listener([Sample]) is called from the poll loop with the new samples of each round
+    '''
+    self.listeners.append(listener)
+
+  def poll_sensor(self, name):
+    '''!
+      @brief Check one sensor and read it when it has new data
+      @return Sample, None when there is no new data, the sensor is backing off, the reading is wrong or
+      @n      the sensor was removed meanwhile
+    '''
+    with self._lock:
+      sensor = self._sensors.get(name)
+      state = self._states.get(name)
+    if sensor is None:
+      return None
+    health = self.health
+    if health is not None and not health.should_poll(name, self.clock()):
+      return None
+    sample = None
+    if sensor.get_data_ready_status:
+      co2, temp, humidity = sensor.read_measurement
+      sample = Sample(name, self.clock(), co2, temp, humidity)
+    if health is not None:
+      h = health.update(name, self.clock(), sample, sensor.io_errors + sensor.crc_errors)
+      state = state._replace(health=h)
+      if not h.valid:
+        sample = None
+    if sample is not None:
+      state = state._replace(sample=sample, readings=state.readings + 1, updated=sample.timestamp)
+    with self._lock:
+      removed = self._sensors.get(name) is not sensor
+      if not removed:
+        self._states[name] = state._replace(polls=state.polls + 1, io_errors=sensor.io_errors,
+                                            crc_errors=sensor.crc_errors)
+    if removed:
+      if health is not None:
+        health.remove(name)   # update may have added it back
+      return None
+    return sample
+
+  def poll_once(self):
+    '''!
+      @brief Poll every sensor once, publish the new snapshot and pass the new samples to the listeners
+      @return [Sample]
+    '''
+    samples = []
+    with self._lock:
+      names = list(self._sensors)
+    for name in names:
+      sample = self.poll_sensor(name)
+      if sample is not None:
+        samples.append(sample)
+    with self._lock:
+      states = collections.OrderedDict(self._states)
+    self.snapshot = Snapshot(self.clock(), states, self.snapshot.version + 1)
+    if samples:
+      for listener in self.listeners:
+        listener(samples)
+    return samples
+
+  def run(self):
+    '''!
+      @brief Poll until stop() is called
+    '''
+    while not self._stop.is_set():
+      start = time.time()
+      self.poll_once()
+      self._stop.wait(max(0.0, self.interval - (time.time() - start)))
+
+  def start(self):
+    '''!
+      @brief Run the poll loop in a background thread
+    '''
+    self._stop.clear()
+    self._thread = threading.Thread(target=self.run, name='scd4x-poller')
+    self._thread.daemon = True
+    self._thread.start()
+
+  def stop(self):
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_resample.py
+  @brief  Align the readings of many sensors to one time grid with NumPy
+  @details Each sensor measures on its own clock, every 5 s or 30 s (low power), with drift and gaps.
+  @n  resample() puts them on a common grid of step seconds and returns one array per signal with a row
+  @n  per sensor, NaN where there is no value:
+  @n    'interpolate'  linear between the two readings around each grid time
+  @n    'ffill'        the last reading at or before each grid time
+  @n    'mean', 'min', 'max', 'last', 'count'  of the readings in [t, t + step) of each grid time t
+  @n  max_gap (seconds) leaves NaN where the readings used are further apart (interpolate) or older
+  @n  (ffill) than that. Everything runs on whole arrays: np.interp, searchsorted and reduceat.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import collections
+
+import numpy as np
+
+SIGNALS = ('co2', 'temp', 'humidity')
+METHODS = ('interpolate', 'ffill', 'mean', 'min', 'max', 'last', 'count')
+
+## the result of resample: time is the grid (n,), co2, temp and humidity are (sensors, n) float arrays
+Resampled = collections.namedtuple('Resampled', ['time', 'sensors', 'co2', 'temp', 'humidity'])
+
+
+def stream_arrays(samples):
+  '''!
+    @brief [Sample] (of several sensors, in any order) -> {sensor: (times, values)}
+    @return times (n,) float64 sorted, values (n, 3) float64 with the columns co2, temp, humidity
+  '''
+  rows = collections.defaultdict(list)
+  for s in samples:
+    rows[s.sensor].append((s.timestamp, s.co2, s.temp, s.humidity))
+  streams = collections.OrderedDict()
+  for name in sorted(rows):
+    a = np.array(rows[name], dtype=np.float64)
+    streams[name] = _sorted(a[:, 0], a[:, 1:])
+  return streams
+
+def make_grid(start, end, step):
+  '''!
+    @return the grid times from start to before end, step seconds apart
+  '''
+  return start + step * np.arange(int(np.ceil((end - start) / float(step))), dtype=np.float64)
+
+def _sorted(times, values):
+  times = np.asarray(times, dtype=np.float64)
+  values = np.asarray(values, dtype=np.float64).reshape(len(times), -1)
+  if len(times) > 1 and np.any(times[1:] < times[:-1]):
+    order = np.argsort(times, kind='mergesort')
+    times, values = times[order], values[order]
+  return times, values
+
+def interpolate(times, values, grid, max_gap=None):
+  '''!
+    @brief Linear interpolation of each column of values at the grid times
+    @return (len(grid), columns), NaN outside the readings and across gaps longer than max_gap
+  '''
+  out = np.full((len(grid), values.shape[1]), np.nan)
+  if len(times) == 0:
+    return out
+  for i in range(values.shape[1]):
+    out[:, i] = np.interp(grid, times, values[:, i], left=np.nan, right=np.nan)
+  if max_gap is not None and len(times) > 1:
+    after = np.clip(np.searchsorted(times, grid, side='right'), 1, len(times) - 1)
+    gap = times[after] - times[after - 1]
+    exact = times[np.minimum(np.searchsorted(times, grid, side='left'), len(times) - 1)] == grid
+    out[(gap > max_gap) & ~exact] = np.nan   # a reading right at the grid time is kept
+  return out
+
+def ffill(times, values, grid, max_gap=None):
+  '''!
+    @brief The last reading at or before each grid time
+    @return (len(grid), columns), NaN before the first reading and where the last one is older than max_gap
+  '''
+  out = np.full((len(grid), values.shape[1]), np.nan)
+  if len(times) == 0:
+    return out
+  last = np.searchsorted(times, grid, side='right') - 1
+  ok = last >= 0
+  if max_gap is not None:
+    ok &= grid - times[np.maximum(last, 0)] <= max_gap
+  out[ok] = values[last[ok]]
+  return out
+
+def aggregate(times, values, grid, step, how='mean'):
+  '''!
+    @brief Reduce the readings of each bucket [t, t + step) of the grid
+    @param how 'mean', 'min', 'max', 'last' or 'count'
+    @return (len(grid), columns), NaN for empty buckets (0 for count)
+  '''
+  edges = np.searchsorted(times, np.append(grid, grid[-1] + step) if len(grid) else grid, side='left')
+  counts = np.diff(edges)
+  if how == 'count':
+    return np.repeat(counts[:, None].astype(np.float64), values.shape[1], axis=1)
+  out = np.full((len(grid), values.shape[1]), np.nan)
+  full = counts > 0
+  if not full.any():
+    return out
+  starts = edges[:-1][full]
+  values = values[:edges[-1]]   # reduceat runs the last bucket to the end of the array, readings from end on are not in it
+  if how == 'last':
+    out[full] = values[edges[1:][full] - 1]
+    return out
+  if how == 'mean':
+    sums = np.add.reduceat(values, starts, axis=0)
+    out[full] = sums / counts[full][:, None]
+  elif how == 'min':
+    out[full] = np.minimum.reduceat(values, starts, axis=0)
+  elif how == 'max':
+    out[full] = np.maximum.reduceat(values, starts, axis=0)
+  else:
+    raise ValueError("unknown aggregation %r" %how)
+  return out
+
+def resample(streams, start, end, step, method='interpolate', max_gap=None):
+  '''!
+    @brief Put the readings of every sensor on the grid from start to end, step seconds apart
+    @param streams {sensor: (times, values)} as returned by stream_arrays, values (n, 3) co2, temp, humidity
+    @param method one of METHODS
+    @param max_gap seconds, see interpolate and ffill, ignored by the aggregations
+    @return Resampled
+  '''
+  if method not in METHODS:
+    raise ValueError("unknown method %r, use one of %s" %(method, ', '.join(METHODS)))
+  grid = make_grid(start, end, step)
+  names = list(streams)
+  out = np.full((len(SIGNALS), len(names), len(grid)), np.nan)
+  for row, name in enumerate(names):
+    times, values = _sorted(*streams[name])
+    if method == 'interpolate':
+      result = interpolate(times, values, grid, max_gap)
+    elif method == 'ffill':
+      result = ffill(times, values, grid, max_gap)
+    else:
+      # the bucket starting at each grid time, readings before start or from end on are left out
+      result = aggregate(times, values, grid, step, method)
+    out[:, row, :] = result.T
+  return Resampled(grid, names, out[0], out[1], out[2])
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_sim.py
+  @brief  Simulated I2C bus with SCD4X sensors on it, to run DFRobot_SCD4X without the hardware
+  @details SimulatedBus has the two smbus.SMBus methods the driver uses, write_i2c_block_data and
+  @n  read_i2c_block_data, and answers them like an SCD4X: every command of the datasheet, the CRC
+  @n  of each word, the 5 s / 30 s measurement interval and the data ready flag. An address without
+  @n  a sensor, a command the sensor does not accept in its current mode and a read with nothing to
+  @n  read raise IOError (errno 121), like a NACK on the real bus.
+  @n  The time comes from the clock passed in, a FakeClock lets a test run hours of measurements at once.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import math
+import time
+import random
+import errno
+
+from DFRobot_SCD4X import *
+
+## measurement interval of SCD4X_START_PERIODIC_MEASURE, s
+PERIODIC_INTERVAL  = 5.0
+## measurement interval of SCD4X_START_LOW_POWER_MEASURE, s
+LOW_POWER_INTERVAL = 30.0
+## duration of SCD4X_MEASURE_SINGLE_SHOT, s
+SINGLE_SHOT_TIME   = 5.0
+## duration of SCD4X_MEASURE_SINGLE_SHOT_RHT_ONLY, s
+RHT_ONLY_TIME      = 0.05
+## periodic measurement needed before SCD4X_PERFORM_FORCED_RECALIB succeeds, s
+FRC_WARMUP         = 180.0
+
+MODE_IDLE      = 'idle'
+MODE_PERIODIC  = 'periodic'
+MODE_LOW_POWER = 'low_power'
+MODE_SLEEP     = 'sleep'
+
+## commands accepted while a periodic measurement is running
+PERIODIC_COMMANDS = (SCD4X_READ_MEASUREMENT, SCD4X_STOP_PERIODIC_MEASURE,
+                     SCD4X_GET_DATA_READY_STATUS, SCD4X_SET_AMBIENT_PRESSURE)
+
+
+def calc_crc(data):
+  '''!
+    @brief CRC8 of a 16 bit word, the same as DFRobot_SCD4X._calc_CRC
+  '''
+  crc = SCD4X_CRC8_INIT
+  for byte in ((data >> 8) & 0xFF, data & 0xFF):
+    crc ^= byte
+    for bit in range(8):
+      if crc & 0x80:
+        crc = ((crc << 1) ^ SCD4X_CRC8_POLYNOMIAL) & 0xFF
+      else:
+        crc = (crc << 1) & 0xFF
+  return crc
+
+def pack_words(words):
+  '''!
+    @brief Turn 16 bit words into the bytes the sensor sends, MSB, LSB, CRC for each word
+  '''
+  buf = []
+  for w in words:
+    w &= 0xFFFF
+    buf += [(w >> 8) & 0xFF, w & 0xFF, calc_crc(w)]
+  return buf
+
+def nack():
+  return IOError(getattr(errno, 'EREMOTEIO', 121), "Remote I/O error")
+
+
+class FakeClock(object):
+  '''!
+    @brief A clock that only moves when told to
+  '''
+  def __init__(self, start=0.0):
+    self.now = start
+
+  def __call__(self):
+    return self.now
+
+  def advance(self, seconds):
+    self.now += seconds
+    return self.now
+
+
+def steady_source(co2=800, temp=25.0, humidity=50.0):
+  '''!
+    @brief Environment with constant readings
+    @return function(t) -> (CO2 ppm, temperature C, humidity %RH)
+  '''
+  return lambda t: (co2, temp, humidity)
+
+def wave_source(co2=900, amplitude=400, period=3600.0, temp=25.0, humidity=50.0):
+  '''!
+    @brief Environment whose CO2 follows a sine wave, like a room filling up and being aired
+    @return function(t) -> (CO2 ppm, temperature C, humidity %RH)
+  '''
+  return lambda t: (co2 + amplitude * math.sin(2 * math.pi * t / period), temp, humidity)
+
+
+class SimulatedSCD4X(object):
+  '''!
+    @brief The state of one simulated sensor
+  '''
+
+  def __init__(self, source=None, serial=(SCD4X_SERIAL_NUMBER_WORD0, SCD4X_SERIAL_NUMBER_WORD1, SCD4X_SERIAL_NUMBER_WORD2)):
+    '''!
+      @param source function(t) -> (CO2 ppm, temperature C, humidity %RH) of the air around the sensor
+      @param serial the 3 words of the serial number
+    '''
+    self.source = source or steady_source()
+    self.serial = list(serial)
+    self.self_test_result = 0
+    ## probability that a word of a response arrives with a wrong CRC
+    self.crc_error_rate = 0.0
+    self.mode = MODE_IDLE
+    self._eeprom = self._default_settings()
+    self.settings = dict(self._eeprom)
+    self.persist_count = 0
+    self._start = 0.0
+    self._run_time = 0.0 # length of the last periodic measurement, for the FRC warm-up
+    self._interval = PERIODIC_INTERVAL
+    self._read_index = 0
+    self._single = None # (ready time, rht only) of a single shot measurement
+    self._response = None
+
+  def _default_settings(self):
+    return {'temp_offset': int(4.0 * (1 << 16) / 175), 'altitude': 0, 'pressure': 1013, 'asc': 1, 'co2_offset': 0}
+
+  def _index(self, now):
+    '''!
+      @brief The number of periodic samples measured up to now
+    '''
+    return int((now - self._start) // self._interval)
+
+  def _measure(self, t, rht_only=False):
+    co2, temp, humidity = self.source(t)
+    co2 = 0 if rht_only else max(0, min(40000, int(round(co2 + self.settings['co2_offset']))))
+    temp -= 175.0 * self.settings['temp_offset'] / (1 << 16)
+    t_raw = int(round((temp + 45) * (1 << 16) / 175))
+    h_raw = int(round(humidity * (1 << 16) / 100))
+    return [co2, max(0, min(0xFFFF, t_raw)), max(0, min(0xFFFF, h_raw))]
+
+  def data_ready(self, now):
+    if self.mode in (MODE_PERIODIC, MODE_LOW_POWER):
+      return self._index(now) > self._read_index
+    return self._single is not None and now >= self._single[0]
+
+  def command(self, cmd, args, now):
+    '''!
+      @brief Run a command sent by write_i2c_block_data
+      @param cmd 16 bit command
+      @param args the 16 bit words sent after the command, CRC already checked
+      @param now the time of the bus clock
+    '''
+    self._response = None
+    if self.mode == MODE_SLEEP:
+      if cmd == SCD4X_WAKE_UP:
+        self.mode = MODE_IDLE
+      raise nack() # wake_up is not acknowledged either
+    if self.mode != MODE_IDLE and cmd not in PERIODIC_COMMANDS:
+      raise nack()
+    s = self.settings
+    if cmd in (SCD4X_START_PERIODIC_MEASURE, SCD4X_START_LOW_POWER_MEASURE):
+      self.mode = MODE_PERIODIC if cmd == SCD4X_START_PERIODIC_MEASURE else MODE_LOW_POWER
+      self._interval = PERIODIC_INTERVAL if cmd == SCD4X_START_PERIODIC_MEASURE else LOW_POWER_INTERVAL
+      self._start = now
+      self._read_index = 0
+      self._single = None
+    elif cmd == SCD4X_STOP_PERIODIC_MEASURE:
+      if self.mode != MODE_IDLE:
+        self._run_time = now - self._start
+      self.mode = MODE_IDLE
+    elif cmd == SCD4X_READ_MEASUREMENT:
+      if self.mode == MODE_IDLE:
+        if not self.data_ready(now):
+          return
+        self._response = pack_words(self._measure(self._single[0], self._single[1]))
+        self._single = None
+      else:
+        index = self._index(now)
+        if index <= self._read_index:
+          return
+        self._read_index = index
+        self._response = pack_words(self._measure(self._start + index * self._interval))
+    elif cmd == SCD4X_GET_DATA_READY_STATUS:
+      self._response = pack_words([0x8006 if self.data_ready(now) else 0x8000])
+    elif cmd == SCD4X_SET_TEMPERATURE_OFFSET:
+      s['temp_offset'] = args[0]
+    elif cmd == SCD4X_GET_TEMPERATURE_OFFSET:
+      self._response = pack_words([s['temp_offset']])
+    elif cmd == SCD4X_SET_SENSOR_ALTITUDE:
+      s['altitude'] = args[0]
+    elif cmd == SCD4X_GET_SENSOR_ALTITUDE:
+      self._response = pack_words([s['altitude']])
+    elif cmd == SCD4X_SET_AMBIENT_PRESSURE:
+      s['pressure'] = args[0]
+    elif cmd == SCD4X_PERFORM_FORCED_RECALIB:
+      if self._run_time < FRC_WARMUP:
+        self._response = pack_words([0xFFFF]) # failed, read back as 0x7fff
+        return
+      measured = self.source(now)[0] + s['co2_offset']
+      correction = int(round(args[0] - measured))
+      s['co2_offset'] += correction
+      self._response = pack_words([correction + 0x8000])
+    elif cmd == SCD4X_SET_AUTOMATIC_CALIB:
+      s['asc'] = args[0]
+    elif cmd == SCD4X_GET_AUTOMATIC_CALIB:
+      self._response = pack_words([s['asc']])
+    elif cmd == SCD4X_PERSIST_SETTINGS:
+      self._eeprom = dict(s)
+      self.persist_count += 1
+    elif cmd == SCD4X_GET_SERIAL_NUMBER:
+      self._response = pack_words(self.serial)
+    elif cmd == SCD4X_PERFORM_SELF_TEST:
+      self._response = pack_words([self.self_test_result])
+    elif cmd == SCD4X_PERFORM_FACTORY_RESET:
+      self._eeprom = self._default_settings()
+      self.settings = dict(self._eeprom)
+    elif cmd == SCD4X_REINIT:
+      self.settings = dict(self._eeprom)
+    elif cmd in (SCD4X_MEASURE_SINGLE_SHOT, SCD4X_MEASURE_SINGLE_SHOT_RHT_ONLY):
+      rht_only = cmd == SCD4X_MEASURE_SINGLE_SHOT_RHT_ONLY
+      self._single = (now + (RHT_ONLY_TIME if rht_only else SINGLE_SHOT_TIME), rht_only)
+    elif cmd == SCD4X_POWER_DOWN:
+      self.mode = MODE_SLEEP
+    elif cmd != SCD4X_WAKE_UP:
+      raise nack()
+
+  def read(self, length):
+    '''!
+      @brief Return the response of the last command, a read with no response is not acknowledged
+    '''
+    if self._response is None:
+      raise nack()
+    buf = (self._response + [0xFF] * length)[:length]
+    self._response = None
+    if self.crc_error_rate:
+      for i in range(2, length, 3):
+        if random.random() < self.crc_error_rate:
+          buf[i] ^= 0x01
+    return buf
+
+
+class SimulatedMux(object):
+  '''!
+    @brief An I2C multiplexer like the TCA9548A: the sensors of the channels enabled in its control byte
+    @n  answer on the bus
+  '''
+
+  def __init__(self, channels=None):
+    '''!
+      @param channels {channel 0-7: {I2C address: SimulatedSCD4X}}
+    '''
+    self.channels = dict(channels or {})
+    self.control = 0   # bit n enables channel n
+
+  def sensor(self, addr):
+    for channel, sensors in self.channels.items():
+      if self.control & (1 << channel) and addr in sensors:
+        return sensors[addr]
+    return None
+
+
+class SimulatedBus(object):
+  '''!
+    @brief Stands in for smbus.SMBus, pass it as the bus of DFRobot_SCD4X
+  '''
+
+  def __init__(self, sensors=None, clock=time.monotonic, muxes=None):
+    '''!
+      @param sensors {I2C address: SimulatedSCD4X}, default one sensor at SCD4X_I2C_ADDR
+      @param clock function returning the time in seconds
+      @param muxes {I2C address: SimulatedMux}
+    '''
+    if sensors is None:
+      sensors = {SCD4X_I2C_ADDR: SimulatedSCD4X()}
+    self.sensors = dict(sensors)
+    self.muxes = dict(muxes or {})
+    self.clock = clock
+    self.writes = 0
+    self.reads = 0
+    self.errors = 0
+
+  def _sensor(self, addr):
+    if addr in self.sensors:
+      return self.sensors[addr]
+    for mux in self.muxes.values():
+      sensor = mux.sensor(addr)
+      if sensor is not None:
+        return sensor
+    self.errors += 1
+    raise nack()
+
+  def write_byte(self, addr, value):
+    '''!
+      @brief Set the control byte of a multiplexer
+    '''
+    self.writes += 1
+    if addr not in self.muxes:
+      self.errors += 1
+      raise nack()
+    self.muxes[addr].control = value
+
+  def write_i2c_block_data(self, addr, cmd, data):
+    self.writes += 1
+    sensor = self._sensor(addr)
+    command = (cmd << 8) | data[0]
+    raw = list(data[1:])
+    args = []
+    for i in range(0, len(raw) - 2, 3):
+      word = (raw[i] << 8) | raw[i + 1]
+      if raw[i + 2] != calc_crc(word):
+        self.errors += 1
+        raise nack()
+      args.append(word)
+    try:
+      sensor.command(command, args, self.clock())
+    except IOError:
+      self.errors += 1
+      raise
+
+  def read_i2c_block_data(self, addr, cmd, length):
+    self.reads += 1
+    sensor = self._sensor(addr)
+    try:
+      return sensor.read(length)
+    except IOError:
+      self.errors += 1
+      raise
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_trace.py
+  @brief  Record the I2C transactions of DFRobot_SCD4X sensors to a trace file and replay them
+  @details TraceRecorder.record(sensor, name) hooks the _write_data, _read_data and _probe_read methods
+  @n  of the sensor and writes every transaction (command and payload, or the response) with its time and
+  @n  whether it failed. A record is 7 bytes plus the bytes on the bus, about 45 bytes per reading; a file name
+  @n  ending in .gz is compressed.
+  @n  Replay(filename, speed) plays a trace back: replay.bus(name) is a bus object for DFRobot_SCD4X
+  @n  that answers the commands of the driver with the recorded responses (and IOError where the
+  @n  recording failed), at the recorded pace, speed times faster, or as fast as possible (speed=None).
+  @n  replay.clock is the time of the recording, pass it as the clock of a SensorPoller.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import gzip
+import time
+import errno
+import struct
+import threading
+
+TRACE_MAGIC = b'SCD4XTR\x01'
+## magic, start time of the recording
+TRACE_HEADER = struct.Struct('<8sd')
+## kind, channel, ms since the previous record, payload length
+RECORD_HEADER = struct.Struct('<cBIB')
+
+KIND_NAME       = b'N'   # payload: the name of the sensor of the channel, utf-8
+KIND_WRITE      = b'W'   # payload: command MSB, LSB, then the data bytes
+KIND_WRITE_FAIL = b'w'
+KIND_READ       = b'R'   # payload: the bytes read
+KIND_READ_FAIL  = b'r'   # payload: empty
+
+## how many records ahead a replayed write looks for its command
+LOOKAHEAD = 64
+
+
+def open_trace(filename, mode):
+  if filename.endswith('.gz'):
+    return gzip.open(filename, mode)
+  return open(filename, mode)
+
+
+class TraceRecorder(object):
+  '''!
+    @brief Write the transactions of one or more sensors to a trace file
+  '''
+
+  def __init__(self, filename, clock=time.time):
+    '''!
+      @param filename trace file, compressed when it ends in .gz
+      @param clock function returning the time in seconds, e.g. the FakeClock of simulated sensors
+    '''
+    self.clock = clock
+    self.records = 0
+    self._file = open_trace(filename, 'wb')
+    self._start = clock()
+    self._last_ms = 0
+    self._channels = {}   # name -> channel
+    self._hooked = []
+    self._lock = threading.Lock()
+    self._file.write(TRACE_HEADER.pack(TRACE_MAGIC, self._start))
+
+  def _add(self, kind, channel, t, payload):
+    with self._lock:
+      ms = max(int(round((t - self._start) * 1000)), self._last_ms)   # another thread may have written a later record
+      self._file.write(RECORD_HEADER.pack(kind, channel, ms - self._last_ms, len(payload)) + bytes(bytearray(payload)))
+      self._last_ms = ms
+      self.records += 1
+
+  def record(self, sensor, name):
+    '''!
+      @brief Hook a DFRobot_SCD4X, its transactions are recorded until close()
+      @param sensor DFRobot_SCD4X
+      @param name name of the sensor in the trace, used by Replay.bus
+    '''
+    if len(self._channels) >= 256:
+      raise ValueError("at most 256 sensors per trace")
+    channel = len(self._channels)
+    self._channels[name] = channel
+    self._add(KIND_NAME, channel, self.clock(), bytearray(name.encode('utf-8')))
+    write_data = sensor._write_data
+    read_data = sensor._read_data
+    probe_read = sensor._probe_read
+
+    def _write_data(cmd, data):
+      if isinstance(data, int):
+        data = [data]
+      payload = [(cmd >> 8) & 0xFF, cmd & 0xFF] + list(data)
+      t = self.clock()
+      errors = sensor.io_errors
+      write_data(cmd, data)
+      self._add(KIND_WRITE if sensor.io_errors == errors else KIND_WRITE_FAIL, channel, t, payload)
+
+    def _read_data(length):
+      t = self.clock()
+      errors = sensor.io_errors
+      buf = read_data(length)
+      if sensor.io_errors == errors:
+        self._add(KIND_READ, channel, t, buf)
+      else:
+        self._add(KIND_READ_FAIL, channel, t, [])
+      return buf
+
+    def _probe_read(cmd, length):   # probe_mode, used by warm_begin and Discovery
+      t = self.clock()
+      buf = probe_read(cmd, length)
+      if buf is None:   # the command or the read was refused, the probe sees the same either way
+        self._add(KIND_WRITE_FAIL, channel, t, [(cmd >> 8) & 0xFF, cmd & 0xFF])
+      else:
+        self._add(KIND_WRITE, channel, t, [(cmd >> 8) & 0xFF, cmd & 0xFF])
+        self._add(KIND_READ, channel, t, buf)
+      return buf
+
+    sensor._write_data = _write_data
+    sensor._read_data = _read_data
+    sensor._probe_read = _probe_read
+    self._hooked.append(sensor)
+
+  def close(self):
+    '''!
+      @brief Unhook the sensors and close the file
+    '''
+    for sensor in self._hooked:
+      del sensor._write_data   # the methods of the class are used again
+      del sensor._read_data
+      del sensor._probe_read
+    self._hooked = []
+    with self._lock:
+      self._file.close()
+
+
+class Trace(object):
+  '''!
+    @brief A trace file read into memory
+  '''
+
+  def __init__(self, filename):
+    with open_trace(filename, 'rb') as f:
+      data = f.read()
+    magic, self.start = TRACE_HEADER.unpack_from(data, 0)
+    if magic != TRACE_MAGIC:
+      raise ValueError("%s is not a trace file" %filename)
+    self.names = {}     # name -> channel
+    self.records = {}   # channel -> [(time, kind, payload)]
+    pos = TRACE_HEADER.size
+    ms = 0
+    while pos + RECORD_HEADER.size <= len(data):
+      kind, channel, delta, n = RECORD_HEADER.unpack_from(data, pos)
+      pos += RECORD_HEADER.size
+      payload = bytearray(data[pos:pos + n])
+      pos += n
+      ms += delta
+      if kind == KIND_NAME:
+        self.names[payload.decode('utf-8')] = channel
+        self.records[channel] = []
+      else:
+        self.records[channel].append((self.start + ms / 1000.0, kind, payload))
+    self.end = max([r[-1][0] for r in self.records.values() if r] or [self.start])
+
+
+def nack():
+  return IOError(getattr(errno, 'EREMOTEIO', 121), "Remote I/O error")
+
+
+class Replay(object):
+  '''!
+    @brief Play a trace back through bus objects
+  '''
+
+  def __init__(self, trace, speed=1.0, sleep=time.sleep, clock=time.time):
+    '''!
+      @param trace Trace or the name of a trace file
+      @param speed 1.0 at the recorded pace, 60.0 an hour per minute, None as fast as possible
+      @param sleep function(seconds) used to keep the pace
+      @param clock function returning the real time in seconds
+    '''
+    self.trace = trace if isinstance(trace, Trace) else Trace(trace)
+    self.speed = speed
+    self.sleep = sleep
+    self.real_clock = clock
+    self.mismatches = 0
+    self._started = None
+    self._now = self.trace.start   # time of the last replayed transaction
+    self._lock = threading.Lock()
+
+  def bus(self, name):
+    '''!
+      @return a bus object answering like the sensor recorded as name, pass it to DFRobot_SCD4X with its address
+    '''
+    return ReplayBus(self, self.trace.records[self.trace.names[name]])
+
+  def clock(self):
+    '''!
+      @return the time of the recording the replay is at
+    '''
+    if self.speed and self._started is not None:
+      return min(self.trace.start + (self.real_clock() - self._started) * self.speed, self.trace.end)
+    return self._now
+
+  def _wait(self, t):
+    with self._lock:
+      if self._started is None:
+        self._started = self.real_clock()
+      if t > self._now:
+        self._now = t
+    if self.speed:
+      delay = self._started + (t - self.trace.start) / self.speed - self.real_clock()
+      if delay > 0:
+        self.sleep(delay)
+
+
+class ReplayBus(object):
+  '''!
+    @brief Stands in for smbus.SMBus, answers with the records of one sensor of a trace
+  '''
+
+  def __init__(self, replay, records):
+    self.replay = replay
+    self.records = records
+    self.position = 0
+
+  @property
+  def done(self):
+    return self.position >= len(self.records)
+
+  def write_i2c_block_data(self, addr, cmd, data):
+    payload = bytearray([cmd] + list(data))
+    end = min(self.position + LOOKAHEAD, len(self.records))
+    for i in range(self.position, end):
+      t, kind, recorded = self.records[i]
+      if kind in (KIND_WRITE, KIND_WRITE_FAIL) and recorded[:2] == payload[:2]:
+        if i != self.position:
+          self.replay.mismatches += 1   # records skipped to find the command
+        self.position = i + 1
+        self.replay._wait(t)
+        if kind == KIND_WRITE_FAIL:
+          raise nack()
+        return
+    self.replay.mismatches += 1
+    raise nack()
+
+  def read_i2c_block_data(self, addr, cmd, length):
+    if self.done or self.records[self.position][1] not in (KIND_READ, KIND_READ_FAIL):
+      self.replay.mismatches += 1
+      raise nack()
+    t, kind, recorded = self.records[self.position]
+    self.position += 1
+    self.replay._wait(t)
+    if kind == KIND_READ_FAIL:
+      raise nack()
+    return (list(recorded) + [0xFF] * length)[:length]
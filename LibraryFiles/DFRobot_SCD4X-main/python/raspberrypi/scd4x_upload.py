@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_upload.py
+  @brief  Send the samples of a SensorPoller to a central store in compressed batches, spooled to disk while it is unreachable
+  @details UploadQueue.add is a poller listener. Samples are collected into a batch until batch_size samples
+  @n  or batch_age seconds, then the batch is compressed (zlib over JSON) and handed to the sender threads.
+  @n  At most max_pending batches wait in memory; when the sink fails, or the queue is full, batches go to
+  @n  files in spool_dir, which never grows beyond max_spool_bytes (the oldest batches are dropped first).
+  @n  Once a send succeeds again the workers drain the spool oldest first, at most `workers` sends at a time.
+  @n  While the spool is not empty new batches are spooled behind it, so the batches are sent in the order
+  @n  they were sealed. Sends of several workers overlap: use workers=1 when the store must receive them
+  @n  strictly in order.
+  @n  The sink is any object with send(data) that raises IOError when the data did not arrive;
+  @n  FileSink and SocketSink / SinkServer are stand-ins for testing.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import os
+import json
+import time
+import zlib
+import struct
+import socket
+import threading
+import collections
+
+try:
+  import queue
+except ImportError:   # Python 2
+  import Queue as queue
+
+from scd4x_poller import Sample
+
+SPOOL_SUFFIX = '.batch'
+FRAME_HEADER = struct.Struct('<I')
+ACK = b'\x06'
+
+
+def batch_json(samples):
+  rows = [[s.sensor, s.timestamp, s.co2, s.temp, s.humidity] for s in samples]
+  return json.dumps(rows, separators=(',', ':')).encode('utf-8')
+
+def encode_batch(samples, level=6):
+  '''!
+    @brief [Sample] -> compressed bytes
+  '''
+  return zlib.compress(batch_json(samples), level)
+
+def decode_batch(data):
+  '''!
+    @brief compressed bytes -> [Sample]
+  '''
+  return [Sample(*row) for row in json.loads(zlib.decompress(data).decode('utf-8'))]
+
+
+class FileSink(object):
+  '''!
+    @brief Append each batch to a file, 4 byte little-endian length then the data
+  '''
+
+  def __init__(self, filename):
+    self.filename = filename
+    self._lock = threading.Lock()
+
+  def send(self, data):
+    with self._lock:
+      with open(self.filename, 'ab') as f:
+        f.write(FRAME_HEADER.pack(len(data)) + data)
+
+  def batches(self):
+    '''!
+      @brief Read back every batch written so far
+    '''
+    result = []
+    with open(self.filename, 'rb') as f:
+      data = f.read()
+    pos = 0
+    while pos + FRAME_HEADER.size <= len(data):
+      n = FRAME_HEADER.unpack_from(data, pos)[0]
+      result.append(data[pos + FRAME_HEADER.size:pos + FRAME_HEADER.size + n])
+      pos += FRAME_HEADER.size + n
+    return result
+
+
+class SocketSink(object):
+  '''!
+    @brief Send each batch as a frame over TCP and wait for the one byte ACK of SinkServer
+  '''
+
+  def __init__(self, host, port, timeout=5.0):
+    self.address = (host, port)
+    self.timeout = timeout
+    self._local = threading.local()   # one connection per sender thread
+
+  def send(self, data):
+    conn = getattr(self._local, 'conn', None)
+    try:
+      if conn is None:
+        conn = socket.create_connection(self.address, self.timeout)
+        self._local.conn = conn
+      conn.sendall(FRAME_HEADER.pack(len(data)) + data)
+      if conn.recv(1) != ACK:
+        raise IOError("no ACK from %s:%d" %self.address)
+    except (IOError, OSError, socket.error):
+      if conn is not None:
+        conn.close()
+      self._local.conn = None
+      raise IOError("send to %s:%d failed" %self.address)
+
+
+class SinkServer(object):
+  '''!
+    @brief Receive the frames of SocketSink and pass each batch to callback(data)
+  '''
+
+  def __init__(self, callback, host='127.0.0.1', port=0):
+    self.callback = callback
+    self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    self._sock.bind((host, port))
+    self._sock.listen(16)
+    self.port = self._sock.getsockname()[1]
+    self._running = True
+    self._conns = []
+    threading.Thread(target=self._accept, name='scd4x-sink').start()
+
+  def _accept(self):
+    while self._running:
+      try:
+        conn, addr = self._sock.accept()
+      except (IOError, OSError, socket.error):
+        return
+      self._conns.append(conn)
+      t = threading.Thread(target=self._serve, args=(conn,))
+      t.daemon = True
+      t.start()
+
+  def _recv(self, conn, n):
+    buf = b''
+    while len(buf) < n:
+      chunk = conn.recv(n - len(buf))
+      if not chunk:
+        raise IOError("closed")
+      buf += chunk
+    return buf
+
+  def _serve(self, conn):
+    try:
+      while self._running:
+        n = FRAME_HEADER.unpack(self._recv(conn, FRAME_HEADER.size))[0]
+        self.callback(self._recv(conn, n))
+        conn.sendall(ACK)
+    except (IOError, OSError, socket.error):
+      pass
+    conn.close()
+
+  def close(self):
+    self._running = False
+    try:
+      self._sock.shutdown(socket.SHUT_RDWR)
+    except (IOError, OSError, socket.error):
+      pass
+    self._sock.close()
+    for conn in self._conns:
+      try:
+        conn.shutdown(socket.SHUT_RDWR)
+      except (IOError, OSError, socket.error):
+        pass
+
+
+class UploadQueue(object):
+  '''!
+    @brief Batch, compress, send and spool samples
+  '''
+
+  def __init__(self, sink, spool_dir, batch_size=500, batch_age=30.0, max_pending=4,
+               max_spool_bytes=64 * 1024 * 1024, workers=2, retry=10.0, level=6, clock=time.time):
+    '''!
+      @param sink object with send(data), raising IOError when the data did not arrive
+      @param spool_dir directory of the batches waiting for the sink, kept across restarts
+      @param batch_size samples per batch
+      @param batch_age seconds after its first sample a batch is sent even if it is not full
+      @param max_pending batches waiting in memory, more go straight to the spool
+      @param max_spool_bytes size limit of spool_dir, the oldest batches are dropped beyond it
+      @param workers sends running at the same time
+      @param retry seconds to wait after a failed send before trying the sink again
+      @param level zlib compression level
+      @param clock function returning the time in seconds
+    '''
+    self.sink = sink
+    self.spool_dir = spool_dir
+    self.batch_size = batch_size
+    self.batch_age = batch_age
+    self.max_spool_bytes = max_spool_bytes
+    self.workers = workers
+    self.retry = retry
+    self.level = level
+    self.clock = clock
+    self.stats = {'samples': 0, 'batches': 0, 'sent': 0, 'raw_bytes': 0, 'compressed_bytes': 0,
+                  'send_errors': 0, 'spooled': 0, 'dropped': 0, 'dropped_samples': 0}
+    self._batch = []
+    self._batch_start = None
+    self._lock = threading.Lock()
+    self._pending = queue.Queue(max_pending)
+    self._retry_at = 0.0
+    self._threads = []
+    self._running = False
+    if not os.path.isdir(spool_dir):
+      os.makedirs(spool_dir)
+    self._spool = collections.OrderedDict()   # file name -> (bytes, samples) of the spooled batches, oldest first
+    self._spool_bytes = 0
+    self._claimed = set()   # spooled batches being sent
+    self._seq = 0
+    for name in sorted(os.listdir(spool_dir)):
+      if name.endswith(SPOOL_SUFFIX):
+        seq, count = name[:-len(SPOOL_SUFFIX)].split('_')
+        size = os.path.getsize(os.path.join(spool_dir, name))
+        self._spool[name] = (size, int(count))
+        self._spool_bytes += size
+        self._seq = max(self._seq, int(seq) + 1)
+      elif name.endswith('.tmp'):
+        os.remove(os.path.join(spool_dir, name))   # cut short by a crash
+
+  ''''''''''''''''''''''''''' batching '''''''''''''''''''''''''''
+
+  def add(self, samples):
+    '''!
+      @brief Queue samples, a SensorPoller listener
+    '''
+    sealed = []
+    with self._lock:
+      for s in samples:
+        if not self._batch:
+          self._batch_start = self.clock()
+        self._batch.append(s)
+        if len(self._batch) >= self.batch_size:
+          sealed.append(self._seal())
+      self.stats['samples'] += len(samples)
+    for batch in sealed:
+      self._queue(batch)
+
+  def _seal(self):
+    batch = self._batch
+    self._batch = []
+    self._batch_start = None
+    return batch
+
+  def flush(self):
+    '''!
+      @brief Send the current batch now, whatever its size
+    '''
+    with self._lock:
+      batch = self._seal() if self._batch else None
+    if batch:
+      self._queue(batch)
+
+  def _check_age(self):
+    with self._lock:
+      if self._batch and self.clock() - self._batch_start >= self.batch_age:
+        batch = self._seal()
+      else:
+        return
+    self._queue(batch)
+
+  def _queue(self, samples):
+    raw = batch_json(samples)
+    data = zlib.compress(raw, self.level)
+    with self._lock:
+      self.stats['batches'] += 1
+      self.stats['raw_bytes'] += len(raw)
+      self.stats['compressed_bytes'] += len(data)
+      seq = self._seq   # the place of the batch in the order they are sent
+      self._seq += 1
+      try:
+        self._pending.put_nowait((seq, data, len(samples)))
+        return
+      except queue.Full:
+        pass
+    self._spool_batch(seq, data, len(samples))
+
+  ''''''''''''''''''''''''''' spool '''''''''''''''''''''''''''
+
+  def _spool_batch(self, seq, data, count):
+    name = '%016d_%d%s' %(seq, count, SPOOL_SUFFIX)
+    path = os.path.join(self.spool_dir, name)
+    with open(path + '.tmp', 'wb') as f:
+      f.write(data)
+    os.rename(path + '.tmp', path)
+    with self._lock:
+      later = self._spool and name < next(reversed(self._spool))
+      self._spool[name] = (len(data), count)
+      if later:   # spooled after batches sealed after it, keep the spool in the order of the batches
+        self._spool = collections.OrderedDict(sorted(self._spool.items()))
+      self._spool_bytes += len(data)
+      self.stats['spooled'] += 1
+      while self._spool_bytes > self.max_spool_bytes:
+        oldest = next((n for n in self._spool if n not in self._claimed), None)
+        if oldest is None:
+          break
+        self.stats['dropped'] += 1
+        self.stats['dropped_samples'] += self._remove_spooled(oldest)
+
+  def _remove_spooled(self, name):
+    size, count = self._spool.pop(name)
+    self._spool_bytes -= size
+    os.remove(os.path.join(self.spool_dir, name))
+    return count
+
+  def _take_spooled(self):
+    with self._lock:
+      name = next((n for n in self._spool if n not in self._claimed), None)
+      if name is None:
+        return None
+      self._claimed.add(name)
+    with open(os.path.join(self.spool_dir, name), 'rb') as f:
+      return name, f.read()
+
+  def spooled(self):
+    '''!
+      @return (batches, bytes) in the spool
+    '''
+    with self._lock:
+      return len(self._spool), self._spool_bytes
+
+  ''''''''''''''''''''''''''' sending '''''''''''''''''''''''''''
+
+  def _sink_up(self):
+    return self.clock() >= self._retry_at
+
+  def _send(self, data):
+    try:
+      self.sink.send(data)
+    except (IOError, OSError):
+      with self._lock:
+        self.stats['send_errors'] += 1
+        self._retry_at = self.clock() + self.retry
+      return False
+    with self._lock:
+      self.stats['sent'] += 1
+    return True
+
+  def _work(self):
+    while self._running or not self._pending.empty():
+      self._check_age()
+      try:
+        if self._spool and self._sink_up():
+          seq, data, count = self._pending.get_nowait()   # spooled batches are waiting, don't block
+        else:
+          seq, data, count = self._pending.get(timeout=0.05)
+      except queue.Empty:
+        data = None
+      if data is not None:
+        with self._lock:
+          behind = bool(self._spool)   # older batches wait in the spool, this one goes after them
+        if behind or not (self._sink_up() and self._send(data)):
+          self._spool_batch(seq, data, count)
+        continue
+      if not self._running or not self._sink_up():
+        continue
+      spooled = self._take_spooled()
+      if spooled is None:
+        continue
+      name, data = spooled
+      ok = self._send(data)
+      with self._lock:
+        self._claimed.discard(name)
+        if ok and name in self._spool:
+          self._remove_spooled(name)
+
+  def start(self):
+    '''!
+      @brief Start the sender threads
+    '''
+    self._running = True
+    self._threads = [threading.Thread(target=self._work, name='scd4x-upload-%d' %i) for i in range(self.workers)]
+    for t in self._threads:
+      t.daemon = True
+      t.start()
+
+  def stop(self):
+    '''!
+      @brief Send or spool the current batch and everything in memory, then stop the sender threads
+    '''
+    self.flush()
+    self._running = False
+    for t in self._threads:
+      t.join()
+    self._threads = []
+    while not self._pending.empty():
+      seq, data, count = self._pending.get_nowait()
+      self._spool_batch(seq, data, count)
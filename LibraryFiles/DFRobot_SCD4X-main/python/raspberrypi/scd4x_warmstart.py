@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  scd4x_warmstart.py
+  @brief  Attach to sensors that are still measuring after the collector restarts, instead of begin()
+  @details begin() stops the measurement (500 ms) and reads the serial number, then the measurement is
+  @n  started again and the first reading comes 5 s later: every restart loses a reading per sensor.
+  @n  warm_begin() probes the sensor with DFRobot_SCD4X.probe_mode. A sensor that is measuring must have
+  @n  been started since it was powered on (it powers on idle), so when the SensorCache says the sensor
+  @n  at this location was started in the wanted mode and configuration, it is used as it is.
+  @n  Otherwise (idle, unknown, other mode or configuration) it is stopped if needed, configured,
+  @n  started and recorded in the cache, keyed by its serial number.
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import os
+import json
+import time
+import threading
+
+from DFRobot_SCD4X import *
+
+## reads of the serial number before a CRC error is given up
+SERIAL_RETRIES = 3
+
+def serial_key(serial):
+  '''!
+    @brief The 3 words of a serial number -> the 48 bit number as 12 hex digits
+  '''
+  return '%04x%04x%04x' %tuple(serial)
+
+
+class SensorCache(object):
+  '''!
+    @brief Identity and configuration of the sensors, kept in a JSON file
+    @details sensors: {serial: record}, a record has the location, the mode it was started in, its
+    @n  configuration and the time it was written. locations: {location: serial}.
+    @n  buses: {bus: time of its last full scan}, written by scd4x_discovery.
+  '''
+
+  def __init__(self, filename):
+    self.filename = filename
+    self.sensors = {}
+    self.locations = {}
+    self.buses = {}
+    self._lock = threading.Lock()
+    if os.path.exists(filename):
+      try:
+        with open(filename) as f:
+          data = json.load(f)
+        self.sensors = data.get('sensors', {})
+        self.locations = data.get('locations', {})
+        self.buses = data.get('buses', {})
+      except ValueError:
+        pass   # cut short by a crash, start again
+
+  def get(self, serial):
+    return self.sensors.get(serial)
+
+  def serial_at(self, location):
+    return self.locations.get(location)
+
+  def put(self, serial, location, **fields):
+    '''!
+      @brief Record the sensor with that serial number at location, with the fields given
+    '''
+    with self._lock:
+      old = self.locations.get(location)
+      if old is not None and old != serial:
+        self.sensors.get(old, {}).pop('location', None)   # it was moved or replaced
+      record = self.sensors.setdefault(serial, {})
+      if record.get('location') not in (None, location):
+        self.locations.pop(record['location'], None)
+      record.update(fields)
+      record['location'] = location
+      record['updated'] = time.time()
+      self.locations[location] = serial
+
+  def remove(self, location):
+    '''!
+      @brief No sensor at location any more, its record is kept without a location
+    '''
+    with self._lock:
+      serial = self.locations.pop(location, None)
+      if serial is not None:
+        self.sensors.get(serial, {}).pop('location', None)
+
+  def save(self):
+    with self._lock:
+      data = json.dumps({'sensors': self.sensors, 'locations': self.locations, 'buses': self.buses},
+                        indent=1, sort_keys=True)
+    with open(self.filename + '.tmp', 'w') as f:
+      f.write(data)
+    os.rename(self.filename + '.tmp', self.filename)
+
+
+def apply_config(sensor, config):
+  '''!
+    @brief Send a configuration to an idle sensor
+    @param config {'temp_offset': C, 'altitude': m, 'asc': bool}, the keys given are set
+  '''
+  if 'temp_offset' in config:
+    sensor.set_temp_comp(config['temp_offset'])
+  if 'altitude' in config:
+    sensor.set_sensor_altitude(config['altitude'])
+  if 'asc' in config:
+    sensor.set_auto_calib_mode(config['asc'])
+
+def warm_begin(sensor, cache, location, config=None, mode=SCD4X_START_PERIODIC_MEASURE, save=True):
+  '''!
+    @brief Make sure the sensor measures in mode with config, stopping it only when needed
+    @param sensor DFRobot_SCD4X
+    @param cache SensorCache
+    @param location where the sensor is, e.g. '1:0x62' for bus 1, the key of the cache
+    @param config dict for apply_config, None to leave the configuration of the sensor as it is
+    @param mode SCD4X_START_PERIODIC_MEASURE or SCD4X_START_LOW_POWER_MEASURE
+    @param save write the cache file when it changed, pass False and call cache.save() once for many sensors
+    @return (serial, warm): the serial number key and True when the measurement was left running,
+    @n      (None, False) when no sensor answers, or when its serial number kept failing the CRC check:
+    @n      then the sensor is started but not recorded in the cache
+  '''
+  config = dict(config) if config else None
+  state, serial = sensor.probe_mode
+  if state == SCD4X_MODE_ABSENT:
+    return None, False
+  if state == SCD4X_MODE_MEASURING:
+    key = cache.serial_at(location)
+    record = cache.get(key) if key else None
+    if record and record.get('mode') == mode and (config is None or record.get('config') == config):
+      return key, True
+    sensor.enable_period_measure(SCD4X_STOP_PERIODIC_MEASURE)
+    state, serial = sensor.probe_mode
+  for i in range(SERIAL_RETRIES - 1):
+    if serial is not None or state == SCD4X_MODE_ABSENT:
+      break
+    state, serial = sensor.probe_mode   # a word failed the CRC check, read again
+  if state == SCD4X_MODE_ABSENT:
+    return None, False
+  if config is not None:
+    apply_config(sensor, config)
+  sensor.enable_period_measure(mode)
+  if serial is None:
+    return None, False   # a wrong serial number must not key the cache
+  key = serial_key(serial)
+  cache.put(key, location, mode=mode, config=config)
+  if save:
+    cache.save()
+  return key, False
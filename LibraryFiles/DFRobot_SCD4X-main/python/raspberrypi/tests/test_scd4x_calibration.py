@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_calibration.py
+  @brief  Checks analyze of scd4x_calibration on logs shorter and longer than a window
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import math
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import numpy as np
+
+from scd4x_resample import Resampled
+from scd4x_calibration import *
+
+
+def grid_data(hours, drift=0.0, temp_error=0.0):
+  '''!
+    @brief A sensor 'a' aired to 400 ppm every night and a reference thermometer, on a 60 s grid
+  '''
+  t = np.arange(0, hours * 3600.0, 60.0)
+  co2 = 400 + drift + 500 * np.maximum(0, np.sin(2 * np.pi * t / DAY)) ** 2
+  temp = 21 + np.sin(2 * np.pi * t / DAY)
+  return Resampled(t, ['a', 'reference'], np.vstack([co2, np.zeros(len(t))]), np.vstack([temp + temp_error, temp]),
+                   np.full((2, len(t)), 45.0))
+
+
+class TestAnalyze(unittest.TestCase):
+
+  def test_shorter_than_a_window(self):
+    minima = window_minima(grid_data(5).co2, 1440)
+    self.assertEqual(minima.shape, (2, 0))
+    drift, trend, spread, windows = baseline_drift(minima)
+    self.assertEqual(drift.shape, (2,))
+    self.assertTrue(np.isnan(drift).all() and np.isnan(trend).all() and np.isnan(spread).all())
+    self.assertEqual(list(windows), [0, 0])
+
+  def test_temperature_only_on_a_short_log(self):
+    plan = analyze(grid_data(5, drift=100, temp_error=1.5), references='reference')
+    self.assertEqual([c.sensor for c in plan.sensors], ['a'])
+    c = plan.sensors[0]
+    self.assertTrue(math.isnan(c.co2_drift))
+    self.assertIsNone(c.co2)
+    self.assertAlmostEqual(c.temp, -1.5)
+
+  def test_drift_over_days(self):
+    plan = analyze(grid_data(5 * 24, drift=80), references='reference')
+    c = plan.sensors[0]
+    self.assertAlmostEqual(c.co2_drift, 80, delta=1)
+    self.assertEqual(c.co2, -80)
+    self.assertIsNone(c.temp)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_discovery.py
+  @brief  Checks the locations Discovery probes and the inventory it keeps
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_warmstart import *
+from scd4x_discovery import *
+
+
+def chip(n):
+  return SimulatedSCD4X(steady_source(), serial=(0x5cd4, 0x0000, n))
+
+
+class TestDiscovery(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.filename = os.path.join(self.folder, 'inventory.json')
+    self.clock = FakeClock(0.0)
+    self.buses = {
+      1: SimulatedBus({SCD4X_I2C_ADDR: chip(1)}, clock=self.clock),
+      2: SimulatedBus({}, clock=self.clock, muxes={0x70: SimulatedMux({0: {SCD4X_I2C_ADDR: chip(2)},
+                                                                       5: {SCD4X_I2C_ADDR: chip(3)}})}),
+    }
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def discover(self, full=False, **kwargs):
+    self.discovery = Discovery(SensorCache(self.filename), buses=sorted(self.buses), open_bus=self.buses.__getitem__,
+                               muxes={2: [0x70]}, **kwargs)
+    return self.discovery.discover(full)
+
+  def test_first_run_probes_every_location(self):
+    found = self.discover()
+    self.assertEqual([(f.location, f.serial) for f in found],
+                     [('1:0x62', '5cd400000001'), ('2:0x70.0:0x62', '5cd400000002'), ('2:0x70.5:0x62', '5cd400000003')])
+    self.assertEqual(self.discovery.probes, 1 + 9)
+    inventory = SensorCache(self.filename)
+    self.assertEqual(inventory.serial_at('2:0x70.5:0x62'), '5cd400000003')
+    self.assertEqual(sorted(inventory.buses), ['1', '2'])
+    self.assertEqual(self.buses[2].muxes[0x70].control, 0)   # deselected after the scan
+
+  def test_later_runs_probe_the_known_locations(self):
+    self.discover()
+    scanned = SensorCache(self.filename).buses
+    self.clock.advance(60)
+    self.assertEqual(len(self.discover()), 3)
+    self.assertEqual(self.discovery.probes, 3)
+    self.assertEqual(SensorCache(self.filename).buses, scanned)   # not scanned whole again
+    self.discover(full=True)
+    self.assertEqual(self.discovery.probes, 10)
+
+  def test_inventory_pruning(self):
+    self.discover()
+    del self.buses[2].muxes[0x70].channels[5]
+    self.assertEqual([f.location for f in self.discover()], ['1:0x62', '2:0x70.0:0x62'])
+    inventory = SensorCache(self.filename)
+    self.assertEqual(sorted(inventory.locations), ['1:0x62', '2:0x70.0:0x62'])
+    self.assertNotIn('location', inventory.get('5cd400000003'))   # the sensor is remembered, not where
+    del self.buses[2]
+    self.assertEqual([f.location for f in self.discover()], ['1:0x62'])
+    inventory = SensorCache(self.filename)
+    self.assertEqual((sorted(inventory.locations), sorted(inventory.buses)), (['1:0x62'], ['1']))
+
+  def test_a_new_sensor_needs_a_full_scan(self):
+    self.discover()
+    self.buses[2].muxes[0x70].channels[3] = {SCD4X_I2C_ADDR: chip(4)}
+    self.assertEqual(len(self.discover()), 3)
+    self.assertEqual(len(self.discover(full=True)), 4)
+
+  def test_measuring_sensor_uses_the_inventory(self):
+    self.discover()
+    self.buses[1].sensors[SCD4X_I2C_ADDR].command(SCD4X_START_LOW_POWER_MEASURE, [], self.clock())
+    found = self.discover()
+    self.assertEqual((found[0].serial, found[0].mode), ('5cd400000001', SCD4X_MODE_MEASURING))
+
+  def test_measuring_sensor_of_unknown_serial(self):
+    sensor = self.buses[1].sensors[SCD4X_I2C_ADDR]
+    sensor.command(SCD4X_START_LOW_POWER_MEASURE, [], self.clock())
+    found = self.discover()
+    self.assertEqual((found[0].serial, found[0].mode), (None, SCD4X_MODE_MEASURING))
+    self.assertNotIn('1', SensorCache(self.filename).buses)   # scanned again next time
+    self.assertEqual(sensor.mode, MODE_LOW_POWER)
+    found = self.discover(interrupt=SCD4X_START_LOW_POWER_MEASURE)
+    self.assertEqual((found[0].serial, found[0].mode), ('5cd400000001', SCD4X_MODE_MEASURING))
+    self.assertEqual(sensor.mode, MODE_LOW_POWER)   # started again in the mode it was in
+    self.assertIn('1', SensorCache(self.filename).buses)
+
+  def test_interrupt_takes_a_start_command(self):
+    self.assertRaises(ValueError, Discovery, SensorCache(self.filename), interrupt=True)
+
+  def test_location_names(self):
+    self.assertEqual(location_name(1, 0x62), '1:0x62')
+    self.assertEqual(parse_location(location_name(2, 0x62, 0x70, 5)), (2, 0x62, 0x70, 5))
+    self.assertRaises(ValueError, parse_location, '2:0x70.5')
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_display.py
+  @brief  Checks the history graph and the dirty rectangles of scd4x_display
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import numpy as np
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_display import *
+
+
+def covered(rects):
+  mask = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=bool)
+  for r in rects:
+    mask[r.y:r.y + r.h, r.x:r.x + r.w] = True
+  return mask
+
+
+class TestHelpers(unittest.TestCase):
+
+  def test_arduino_map(self):
+    self.assertEqual(arduino_map(5, 0, 10, 0, 100), 50)
+    self.assertEqual(arduino_map(-3, 0, 2, 0, 1), -1)   # truncated towards zero, not floored
+    self.assertEqual((co2_to_y(400), co2_to_y(5000), co2_to_y(2700)), (310, 190, 250))
+
+  def test_ring_buffer(self):
+    ring = RingBuffer(size=3, fill=0)
+    for v in [1, 2, 3, 4]:
+      ring.push(v)
+    self.assertEqual(ring.values(), [4, 3, 2])
+    self.assertEqual((ring[0], ring[2], len(ring)), (4, 2, 3))
+    self.assertRaises(IndexError, ring.__getitem__, 3)
+
+
+class TestDirtyRects(unittest.TestCase):
+
+  def test_no_change(self):
+    frame = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint16)
+    self.assertEqual(dirty_rects(frame, frame.copy()), [])
+
+  def test_rects_cover_every_change(self):
+    rnd = np.random.RandomState(3)
+    for n in [1, 5, 40, 400]:
+      old = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint16)
+      new = old.copy()
+      new[rnd.randint(0, SCREEN_HEIGHT, n), rnd.randint(0, SCREEN_WIDTH, n)] = COLOR_RGB565_LGRAY
+      rects = dirty_rects(old, new)
+      self.assertTrue(covered(rects)[old != new].all())
+      self.assertLessEqual(sum(rect_bytes(r) for r in rects), FULL_FRAME_BYTES)
+
+  def test_near_changes_share_a_window(self):
+    old = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint16)
+    new = old.copy()
+    new[10, 10] = new[10, 12] = 1
+    self.assertEqual(dirty_rects(old, new), [Rect(10, 10, 3, 1)])
+    new[200, 150] = 1
+    self.assertEqual(len(dirty_rects(old, new)), 2)
+
+  def test_whole_screen(self):
+    old = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint16)
+    self.assertEqual(dirty_rects(old, old + 1), [Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)])
+
+
+class TestKeychainDisplay(unittest.TestCase):
+
+  def setUp(self):
+    self.display = KeychainDisplay()
+
+  def test_panel_follows_the_frame(self):
+    first = self.display.update(800, 22.5, 45.0)
+    self.assertTrue((self.display.panel.pixels == self.display.frame.pixels).all())
+    self.assertLess(first.dirty_bytes, first.full_bytes)
+    update = self.display.update(812, 22.5, 45.0)
+    self.assertTrue((self.display.panel.pixels == self.display.frame.pixels).all())
+    self.assertLess(update.dirty_bytes, first.dirty_bytes)
+    self.assertEqual(self.display.history.values()[:2], [co2_to_y(812), co2_to_y(800)])
+    self.assertEqual((self.display.updates, self.display.full_bytes), (2, 2 * FULL_FRAME_BYTES))
+
+  def test_same_reading_sends_only_the_graph(self):
+    self.display.update(800, 22.5, 45.0)
+    update = self.display.update(800, 22.5, 45.0)
+    self.assertTrue(all(r.y >= 190 for r in update.rects))   # the text did not change
+
+  def test_poll(self):
+    clock = FakeClock()
+    bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(steady_source(co2=1234))}, clock=clock)
+    sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+    sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+    self.assertIsNone(self.display.poll(sensor))
+    clock.advance(PERIODIC_INTERVAL)
+    self.assertIsNotNone(self.display.poll(sensor))
+    self.assertEqual(self.display.reading[0], 1234)
+
+
+if __name__ == "__main__":
+  unittest.main()
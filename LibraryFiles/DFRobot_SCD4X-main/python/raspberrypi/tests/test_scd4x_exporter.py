@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_exporter.py
+  @brief  Checks the /metrics and /json output of scd4x_exporter
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import json
+import threading
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+try:
+  from urllib.request import urlopen
+except ImportError:   # Python 2
+  from urllib2 import urlopen
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_health import *
+from scd4x_exporter import *
+
+
+class TestExporter(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = FakeClock(1000.0)
+    sensors = {}
+    for name, co2 in [('office', 800), ('a"b', 1200)]:
+      bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(steady_source(co2, 21.5, 40.0))}, clock=self.clock)
+      sensors[name] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+      sensors[name].enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+    self.poller = SensorPoller(sensors, clock=self.clock, health=HealthMonitor())
+    self.exporter = MetricsExporter(self.poller, host='127.0.0.1', port=0, clock=self.clock)
+
+  def tearDown(self):
+    if self.exporter._thread is not None:
+      self.exporter.stop()
+    else:
+      self.exporter._server.server_close()   # shutdown() would wait for a serve_forever that never ran
+
+  def test_empty_snapshot(self):
+    text = self.exporter.metrics().decode('utf-8')
+    self.assertIn('# TYPE scd4x_co2_ppm gauge\n', text)
+    self.assertNotIn('scd4x_co2_ppm{', text)
+    self.assertNotIn('%s{' %AGE_METRIC, text)
+    data = json.loads(self.exporter.json().decode('utf-8'))
+    self.assertEqual((data['version'], data['sensors']), (0, {}))
+
+  def test_metrics(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.poller.poll_once()
+    self.clock.advance(2.5)
+    lines = self.exporter.metrics().decode('utf-8').splitlines()
+    self.assertIn('scd4x_co2_ppm{sensor="office"} 800', lines)
+    self.assertIn('scd4x_co2_ppm{sensor="a\\"b"} 1200', lines)
+    self.assertIn('scd4x_readings_total{sensor="office"} 1', lines)
+    self.assertIn('scd4x_health_state{sensor="office"} 0', lines)
+    self.assertIn('%s{sensor="office"} 2.500' %AGE_METRIC, lines)
+    self.assertIn('scd4x_last_reading_timestamp_seconds{sensor="office"} 1005.0', lines)
+    self.assertTrue(lines[0].startswith('# HELP '))
+
+  def test_json(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.poller.poll_once()
+    self.clock.advance(1.0)
+    data = json.loads(self.exporter.json().decode('utf-8'))
+    self.assertEqual(data['version'], 1)
+    office = data['sensors']['office']
+    self.assertEqual((office['co2'], office['readings'], office['health'], office['issues'], office['age']),
+                     (800, 1, 'ok', [], 1.0))
+    self.assertAlmostEqual(office['temp'], 21.5 - 4.0, places=1)   # the default temperature offset
+
+  def test_body_is_rendered_once_per_snapshot(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.poller.poll_once()
+    snapshot = self.poller.snapshot
+    self.exporter.metrics()
+    self.assertIs(snapshot.cached('prometheus', None), snapshot.cached('prometheus', render_prometheus))
+
+  def test_http(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.poller.poll_once()
+    self.exporter.start()
+    url = 'http://127.0.0.1:%d' %self.exporter.port
+    errors = []
+    def scrape():
+      try:
+        for i in range(25):
+          response = urlopen(url + '/metrics')
+          self.assertEqual(response.headers['Content-Type'], PROMETHEUS_CONTENT_TYPE)
+          self.assertIn(b'scd4x_co2_ppm{sensor="office"} 800', response.read())
+      except Exception as e:
+        errors.append(e)
+    threads = [threading.Thread(target=scrape) for i in range(4)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+    self.assertEqual(errors, [])
+    self.assertIn('office', json.loads(urlopen(url + '/json?pretty').read().decode('utf-8'))['sensors'])
+    self.assertEqual(self.exporter.requests, 101)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_fleet.py
+  @brief  Checks how many operations FleetExecutor runs at a time on each bus, and its reports
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import time
+import threading
+import collections
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_fleet import *
+
+
+class Counter(object):
+  '''!
+    @brief Operations running at the same time, per bus and in total, and the most seen
+  '''
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.running = collections.Counter()
+    self.most = collections.Counter()
+
+  def enter(self, bus):
+    with self.lock:
+      for key in (bus, 'total'):
+        self.running[key] += 1
+        self.most[key] = max(self.most[key], self.running[key])
+
+  def leave(self, bus):
+    with self.lock:
+      for key in (bus, 'total'):
+        self.running[key] -= 1
+
+
+class BusySensor(object):
+  '''!
+    @brief The part of DFRobot_SCD4X the executor uses, busy for a short while between the stop and the restart
+  '''
+
+  def __init__(self, counter, bus, fail=False):
+    self.counter = counter
+    self.bus = bus
+    self.fail = fail
+    self.io_errors = 0
+    self.crc_errors = 0
+    self.commands = []
+
+  def enable_period_measure(self, mode):
+    self.commands.append(mode)
+    if mode == SCD4X_STOP_PERIODIC_MEASURE:
+      self.counter.enter(self.bus)
+    else:
+      self.counter.leave(self.bus)
+
+  @property
+  def perform_self_test(self):
+    time.sleep(0.02)
+    if self.fail:
+      self.counter.leave(self.bus)
+      raise IOError("[Errno 121] Remote I/O error")
+    return 0
+
+
+class TestFleet(unittest.TestCase):
+
+  def setUp(self):
+    self.counter = Counter()
+
+  def executor(self, layout, **kwargs):
+    executor = FleetExecutor(**kwargs)
+    sensors = {}
+    for bus, count in layout.items():
+      for i in range(count):
+        name = '%s%d' %(bus, i)
+        sensors[name] = BusySensor(self.counter, bus)
+        executor.add(name, sensors[name], bus = bus)
+    return executor, sensors
+
+  def test_one_operation_per_bus(self):
+    executor, sensors = self.executor({'x': 4, 'y': 4})
+    report = executor.self_test()
+    self.assertEqual(len(report.results), 8)
+    self.assertEqual((self.counter.most['x'], self.counter.most['y'], self.counter.most['total']), (1, 1, 2))
+
+  def test_per_bus_and_max_workers(self):
+    executor, sensors = self.executor({'x': 6}, per_bus=3)
+    executor.self_test()
+    self.assertEqual(self.counter.most['x'], 3)
+    self.counter = Counter()
+    executor, sensors = self.executor({'x': 3, 'y': 3, 'z': 3}, per_bus=3, max_workers=2)
+    executor.self_test()
+    self.assertEqual(self.counter.most['total'], 2)
+
+  def test_sensors_without_a_bus_run_together(self):
+    executor = FleetExecutor()
+    for i in range(4):
+      executor.add('s%d' %i, BusySensor(self.counter, 's%d' %i))
+    executor.self_test()
+    self.assertEqual(self.counter.most['total'], 4)
+
+  def test_report(self):
+    executor, sensors = self.executor({'x': 3})
+    sensors['x1'].fail = True
+    report = executor.self_test()
+    self.assertEqual([(r.sensor, r.bus, r.ok) for r in report.results], [('x0', 'x', True), ('x1', 'x', False), ('x2', 'x', True)])
+    self.assertEqual(report.failed()[0].error, 'IOError: [Errno 121] Remote I/O error'
+                     if sys.version_info[0] < 3 else 'OSError: [Errno 121] Remote I/O error')
+    self.assertEqual(sensors['x0'].commands, [SCD4X_STOP_PERIODIC_MEASURE, SCD4X_START_PERIODIC_MEASURE])
+    self.assertGreaterEqual(report.sequential_time, report.wall_time * 0.5)
+
+  def test_forced_recalibration_with_simulated_sensors(self):
+    clock = FakeClock(0.0)
+    executor = FleetExecutor(per_bus=2, sleep=clock.advance)
+    chips = {}
+    for i, offset in enumerate([50, -30]):
+      chips[i] = SimulatedSCD4X(steady_source(co2=600))
+      chips[i].settings['co2_offset'] = offset
+      bus = SimulatedBus({SCD4X_I2C_ADDR: chips[i]}, clock=clock)
+      executor.add('s%d' %i, DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus), bus = 1)
+    report = executor.forced_recalibration(600)
+    self.assertEqual([r.ok for r in report.results], [True, True])
+    self.assertEqual([chips[i].settings['co2_offset'] for i in range(2)], [0, 0])
+    self.assertEqual([chips[i].mode for i in range(2)], [MODE_PERIODIC, MODE_PERIODIC])
+
+
+if __name__ == "__main__":
+  unittest.main()
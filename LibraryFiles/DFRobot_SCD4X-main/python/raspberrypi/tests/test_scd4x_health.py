@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_health.py
+  @brief  Checks the issues and the state transitions of scd4x_health
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from scd4x_poller import Sample
+from scd4x_health import *
+
+
+class Feed(object):
+  '''!
+    @brief Polls of one sensor every 5 s
+  '''
+
+  def __init__(self, monitor):
+    self.monitor = monitor
+    self.t = 0.0
+    self.co2 = 800
+
+  def good(self):
+    self.t += 5
+    self.co2 += 1
+    return self.monitor.update('a', self.t, Sample('a', self.t, self.co2, 22.0, 45.0), 0)
+
+  def zero(self):
+    self.t += 5
+    return self.monitor.update('a', self.t, Sample('a', self.t, 0, -45.0, 0.0), 0)
+
+  def empty(self):
+    self.t += 5
+    return self.monitor.update('a', self.t, None, 0)
+
+
+class TestHealth(unittest.TestCase):
+
+  def test_issues(self):
+    monitor = HealthMonitor()
+    feed = Feed(monitor)
+    self.assertEqual(feed.good().state, OK)
+    h = feed.zero()
+    self.assertEqual((h.state, h.issues, h.valid), (SUSPECT, ('zero_frame',), False))
+    h = monitor.update('a', feed.t + 5, Sample('a', feed.t + 5, 50000, 22.0, 45.0), 0)
+    self.assertEqual(h.issues, ('range',))
+    h = monitor.update('a', feed.t + 10, Sample('a', feed.t + 10, 5000, 22.0, 45.0), 0)
+    self.assertIn('jump', h.issues)
+    self.assertTrue(h.valid)
+
+  def test_fails_after_polls_in_a_row_and_recovers(self):
+    monitor = HealthMonitor(fail_after=3, recover_after=2)
+    feed = Feed(monitor)
+    self.assertEqual([feed.zero().state for i in range(3)], [SUSPECT, SUSPECT, FAILED])
+    self.assertEqual(feed.empty().state, FAILED)   # no data says nothing
+    self.assertEqual(feed.good().state, FAILED)
+    self.assertEqual(feed.good().state, OK)
+
+  def test_issues_with_clean_polls_between_do_not_add_up(self):
+    monitor = HealthMonitor(fail_after=3, recover_after=3)
+    feed = Feed(monitor)
+    for i in range(5):
+      self.assertEqual(feed.zero().state, SUSPECT)
+      self.assertEqual(feed.zero().state, SUSPECT)
+      feed.good()
+
+  def test_flatline_after_flatline_samples_equal_readings(self):
+    monitor = HealthMonitor(flatline_samples=3)
+    issues = []
+    for i in range(4):
+      issues.append(monitor.update('a', 5.0 * i, Sample('a', 5.0 * i, 800, 22.0, 45.0), 0).issues)
+    self.assertEqual(issues, [(), (), ('flatline',), ('flatline',)])
+
+  def test_errors(self):
+    monitor = HealthMonitor(error_rate=0.3, error_alpha=0.5)
+    monitor.update('a', 0, None, 0)
+    self.assertEqual(monitor.update('a', 5, None, 1).issues, ('errors',))
+
+  def test_backoff_grows_only_on_polls_with_issues(self):
+    monitor = HealthMonitor(fail_after=1, recover_after=3, backoff=5.0, max_backoff=30.0)
+    feed = Feed(monitor)
+    waits = []
+    for i in range(3):
+      h = feed.zero()
+      waits.append(h.retry_at - feed.t)
+    self.assertEqual(waits, [5.0, 10.0, 20.0])
+    self.assertFalse(monitor.should_poll('a', feed.t + 10))
+    self.assertTrue(monitor.should_poll('a', feed.t + 20))
+    h = feed.good()
+    self.assertEqual((h.state, h.retry_at - feed.t), (FAILED, 20.0))
+    h = feed.good()
+    self.assertEqual(h.retry_at - feed.t, 20.0)
+    h = feed.good()
+    self.assertEqual((h.state, h.retry_at), (OK, None))
+
+  def test_backoff_up_to_max_backoff(self):
+    monitor = HealthMonitor(fail_after=1, backoff=5.0, max_backoff=12.0)
+    feed = Feed(monitor)
+    self.assertEqual([feed.zero().retry_at - feed.t for i in range(4)], [5.0, 10.0, 12.0, 12.0])
+
+
+if __name__ == "__main__":
+  unittest.main()
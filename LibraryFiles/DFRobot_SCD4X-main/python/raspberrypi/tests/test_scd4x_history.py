@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_history.py
+  @brief  Checks the varint encoding, the blocks and the byte limit of scd4x_history
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import random
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from scd4x_poller import Sample
+from scd4x_history import *
+
+
+def readings(n, start=0.0, step=5.0, seed=1):
+  rnd = random.Random(seed)
+  return [Sample('a', start + i * step + rnd.choice([0.0, 0.001, -0.002]), rnd.randint(400, 5000),
+                 round(rnd.uniform(-10.0, 60.0), 2), round(rnd.uniform(0.0, 100.0), 2)) for i in range(n)]
+
+
+class TestVarint(unittest.TestCase):
+
+  def test_round_trip(self):
+    numbers = [0, 1, -1, 63, -64, 64, -65, 127, 128, -129, 8191, -8192, 1 << 20, -(1 << 20), (1 << 40) + 3, -(1 << 40)]
+    buf = bytearray()
+    for n in numbers:
+      put_varint(buf, n)
+    self.assertEqual(list(iter_varints(bytes(buf))), numbers)
+
+  def test_zig_zag(self):
+    for n, encoded in [(0, [0]), (-1, [1]), (1, [2]), (-64, [127]), (64, [0x80, 1])]:
+      buf = bytearray()
+      put_varint(buf, n)
+      self.assertEqual(list(buf), encoded)
+
+
+class TestHistory(unittest.TestCase):
+
+  def test_samples_round_trip(self):
+    history = History(block_size=7)
+    data = readings(50)
+    history.add(data)
+    back = history.samples('a')
+    self.assertEqual(len(back), 50)
+    for s, b in zip(data, back):
+      self.assertEqual((b.sensor, b.timestamp, b.co2), (s.sensor, round(s.timestamp, 3), s.co2))
+      self.assertAlmostEqual(b.temp, s.temp, delta=175.0 / (1 << 16))
+      self.assertAlmostEqual(b.humidity, s.humidity, delta=100.0 / (1 << 16))
+    self.assertEqual([s.co2 for s in history.samples('a', 49.5, 99.5)], [s.co2 for s in data[10:20]])
+
+  def test_regular_readings_are_small(self):
+    history = History()
+    history.add([Sample('a', i * 5.0, 800 + i % 3, 22.0, 45.0) for i in range(720)])
+    self.assertLess(history.nbytes('a'), 720 * 6)
+
+  def test_max_bytes_drops_the_oldest_blocks(self):
+    history = History(block_size=10, max_bytes=200)
+    history.add(readings(100))
+    kept = history.samples('a')
+    self.assertLess(len(kept), 100)
+    self.assertEqual(len(kept) % 10, 0)
+    self.assertEqual([s.co2 for s in kept], [s.co2 for s in readings(100)[-len(kept):]])
+    self.assertEqual(history.count('a'), len(kept))
+    sealed = history.nbytes('a') - history._sensors['a'][-1].nbytes()
+    self.assertLessEqual(sealed, 200)
+    history.append('b', 0.0, 800, 22.0, 45.0)   # the limit is per sensor
+    self.assertEqual(history.count('b'), 1)
+
+  def test_aggregate_matches_the_samples(self):
+    history = History(block_size=16)
+    history.add(readings(200))
+    for start, end in [(None, None), (0.0, 1000.0), (123.0, 777.0), (80.0, 160.0), (10.0, 11.0)]:
+      decoded = history.decoded_blocks
+      agg = history.aggregate('a', start, end)
+      values = history.samples('a', start, end)
+      self.assertEqual(agg.count, len(values))
+      if not values:
+        self.assertEqual(agg, Aggregate(0, None, None, None))
+        continue
+      self.assertEqual((agg.co2.min, agg.co2.max), (min(s.co2 for s in values), max(s.co2 for s in values)))
+      self.assertAlmostEqual(agg.co2.mean, sum(s.co2 for s in values) / float(len(values)))
+      self.assertAlmostEqual(agg.temp.max, max(s.temp for s in values))
+      self.assertAlmostEqual(agg.humidity.mean, sum(s.humidity for s in values) / float(len(values)), places=6)
+      self.assertLessEqual(history.decoded_blocks - decoded, 2)   # only the blocks at the two ends
+
+  def test_unknown_sensor(self):
+    history = History()
+    self.assertEqual((history.samples('x'), history.count('x')), ([], 0))
+    self.assertEqual(history.aggregate('x').count, 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
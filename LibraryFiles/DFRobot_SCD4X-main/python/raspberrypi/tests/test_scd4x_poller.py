@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_poller.py
+  @brief  Checks the snapshots of SensorPoller and adding and removing sensors while it polls
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_poller import *
+from scd4x_health import *
+
+
+class HookBus(SimulatedBus):
+  '''!
+    @brief Calls hook() on the first transfer, as another thread would in the middle of a poll
+  '''
+
+  def __init__(self, *args, **kwargs):
+    SimulatedBus.__init__(self, *args, **kwargs)
+    self.hook = None
+
+  def write_i2c_block_data(self, addr, cmd, data):
+    hook, self.hook = self.hook, None
+    if hook is not None:
+      hook()
+    return SimulatedBus.write_i2c_block_data(self, addr, cmd, data)
+
+
+class TestPoller(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = FakeClock(0.0)
+    self.buses = {}
+    self.sensors = {}
+    for name in ['a', 'b', 'c']:
+      self.buses[name] = HookBus({SCD4X_I2C_ADDR: SimulatedSCD4X(steady_source())}, clock=self.clock)
+      self.sensors[name] = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = self.buses[name])
+      self.sensors[name].enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+    self.health = HealthMonitor()
+    self.poller = SensorPoller(self.sensors, clock=self.clock, health=self.health)
+
+  def test_snapshots(self):
+    received = []
+    self.poller.add_listener(received.append)
+    self.assertEqual(self.poller.poll_once(), [])
+    self.assertEqual(self.poller.snapshot.sensors['a'].polls, 1)
+    self.clock.advance(PERIODIC_INTERVAL)
+    samples = self.poller.poll_once()
+    self.assertEqual([s.sensor for s in samples], ['a', 'b', 'c'])
+    self.assertEqual(received, [samples])
+    snapshot = self.poller.snapshot
+    self.assertEqual((snapshot.version, snapshot.sensors['b'].readings, snapshot.sensors['b'].sample.co2), (2, 1, 800))
+
+  def test_remove_during_poll(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.buses['b'].hook = lambda: self.poller.remove('b')
+    samples = self.poller.poll_once()
+    self.assertEqual([s.sensor for s in samples], ['a', 'c'])
+    self.assertEqual(list(self.poller.snapshot.sensors), ['a', 'c'])
+    self.assertNotIn('b', self.health._sensors)
+
+  def test_add_during_poll(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(steady_source())}, clock=self.clock)
+    self.buses['a'].hook = lambda: self.poller.add('d', DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus))
+    self.assertEqual([s.sensor for s in self.poller.poll_once()], ['a', 'b', 'c'])
+    self.assertEqual(self.poller.snapshot.sensors['d'].polls, 0)   # polled from the next round
+    self.poller.poll_once()
+    self.assertEqual(self.poller.snapshot.sensors['d'].polls, 1)
+
+  def test_remove_and_add_again(self):
+    self.clock.advance(PERIODIC_INTERVAL)
+    self.buses['b'].hook = lambda: (self.poller.remove('b'), self.poller.add('b', self.sensors['a']))
+    self.poller.poll_once()
+    self.assertEqual(self.poller.snapshot.sensors['b'].polls, 0)   # the poll of the old sensor is dropped
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_resample.py
+  @brief  Checks the aggregations of scd4x_resample against a plain Python loop over the buckets
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import math
+import random
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import numpy as np
+
+from scd4x_resample import *
+
+REDUCE = {'mean': lambda v: sum(v) / float(len(v)), 'min': min, 'max': max, 'last': lambda v: v[-1],
+          'count': len}
+
+
+def bucket_loop(times, values, start, end, step, how):
+  '''!
+    @brief The aggregation of one column, one bucket at a time
+  '''
+  result = []
+  t = start
+  while t < end - 1e-9:
+    inside = [v for x, v in zip(times, values) if t <= x < t + step]
+    if how == 'count':
+      result.append(float(len(inside)))
+    else:
+      result.append(REDUCE[how](inside) if inside else float('nan'))
+    t += step
+  return result
+
+
+class TestAggregate(unittest.TestCase):
+
+  def check(self, times, co2, start, end, step):
+    values = np.c_[co2, np.zeros(len(co2)), np.zeros(len(co2))]
+    for how in ('mean', 'min', 'max', 'last', 'count'):
+      got = resample({'a': (times, values)}, start, end, step, how).co2[0]
+      want = bucket_loop(times, co2, start, end, step, how)
+      self.assertEqual(len(got), len(want))
+      for g, w in zip(got, want):
+        if math.isnan(w):
+          self.assertTrue(math.isnan(g), how)
+        else:
+          self.assertAlmostEqual(g, w, places=6, msg=how)
+
+  def test_window_of_a_longer_log(self):
+    times = np.arange(0, 100, 5.0)
+    self.check(times, 500 + 5 * times, 0, 60, 10)
+
+  def test_readings_before_start(self):
+    times = np.arange(0, 100, 5.0)
+    self.check(times, 500 + 5 * times, 30, 70, 10)
+
+  def test_random_gaps(self):
+    rnd = random.Random(1)
+    times = np.array(sorted(rnd.uniform(0, 1000) for i in range(300)))
+    co2 = np.array([rnd.randint(400, 2000) for i in range(300)], dtype=np.float64)
+    self.check(times, co2, 100, 900, 7.5)
+
+
+class TestInterpolate(unittest.TestCase):
+
+  def test_reading_at_a_grid_time_is_kept_across_a_gap(self):
+    times = np.array([0.0, 5.0, 100.0])
+    values = np.c_[[400.0, 410.0, 900.0], np.zeros(3), np.zeros(3)]
+    co2 = resample({'a': (times, values)}, 0, 105, 5, 'interpolate', max_gap=10).co2[0]
+    self.assertEqual(co2[0], 400.0)
+    self.assertEqual(co2[1], 410.0)
+    self.assertTrue(np.isnan(co2[2:20]).all())
+    self.assertEqual(co2[20], 900.0)
+
+  def test_gap_inside_max_gap_is_interpolated(self):
+    times = np.array([0.0, 10.0])
+    values = np.c_[[400.0, 500.0], np.zeros(2), np.zeros(2)]
+    co2 = resample({'a': (times, values)}, 0, 15, 5, 'interpolate', max_gap=10).co2[0]
+    self.assertEqual(list(co2), [400.0, 450.0, 500.0])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_trace.py
+  @brief  Checks that a replayed trace answers the driver like the recorded sensors did
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_trace import *
+
+
+def session(sensor, advance):
+  '''!
+    @brief Probe, start and read a sensor, return everything the driver returned
+  '''
+  out = [sensor.probe_mode]
+  sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+  out.append(sensor.probe_mode)
+  for i in range(3):
+    advance(PERIODIC_INTERVAL)
+    out.append(sensor.get_data_ready_status)
+    out.append(sensor.read_measurement)
+  return out
+
+
+class TestTrace(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def record(self, filename):
+    clock = FakeClock(1000.0)
+    bus = SimulatedBus({SCD4X_I2C_ADDR: SimulatedSCD4X(wave_source(period=60))}, clock=clock)
+    sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = bus)
+    missing = DFRobot_SCD4X(i2c_addr = 0x10, bus = bus)
+    recorder = TraceRecorder(filename, clock)
+    recorder.record(sensor, 'room')
+    recorder.record(missing, 'missing')
+    result = session(sensor, clock.advance), missing.probe_mode
+    recorder.close()
+    self.assertNotIn('_probe_read', sensor.__dict__)   # unhooked
+    return result
+
+  def check(self, filename):
+    recorded = self.record(filename)
+    replay = Replay(filename, speed=None)
+    sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = replay.bus('room'))
+    missing = DFRobot_SCD4X(i2c_addr = 0x10, bus = replay.bus('missing'))
+    replayed = session(sensor, lambda seconds: None), missing.probe_mode
+    self.assertEqual(replayed, recorded)
+    self.assertEqual(recorded[0][0], (SCD4X_MODE_IDLE, [SCD4X_SERIAL_NUMBER_WORD0, SCD4X_SERIAL_NUMBER_WORD1,
+                                                        SCD4X_SERIAL_NUMBER_WORD2]))
+    self.assertEqual(recorded[0][1], (SCD4X_MODE_MEASURING, None))
+    self.assertEqual(recorded[1], (SCD4X_MODE_ABSENT, None))
+    self.assertEqual(replay.mismatches, 0)
+    self.assertEqual(sensor.io_errors, 0)
+
+  def test_record_and_replay(self):
+    self.check(os.path.join(self.folder, 'session.trace'))
+
+  def test_compressed(self):
+    self.check(os.path.join(self.folder, 'session.trace.gz'))
+
+  def test_replay_at_the_recorded_pace(self):
+    filename = os.path.join(self.folder, 'session.trace')
+    self.record(filename)
+    trace = Trace(filename)
+    now = [0.0]
+    def sleep(seconds):
+      now[0] += seconds
+    replay = Replay(trace, speed=10.0, sleep=sleep, clock=lambda: now[0])
+    sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = replay.bus('room'))
+    session(sensor, lambda seconds: None)
+    self.assertAlmostEqual(now[0], (trace.end - trace.start) / 10.0, places=3)
+
+
+if __name__ == "__main__":
+  unittest.main()
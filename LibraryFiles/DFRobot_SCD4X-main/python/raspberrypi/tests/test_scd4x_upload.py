@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_upload.py
+  @brief  Checks the batches, the spool limit and the order of the batches of scd4x_upload
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from scd4x_poller import Sample
+from scd4x_upload import *
+
+
+class FlakySink(object):
+  '''!
+    @brief Keeps the batches it gets while up, refuses them while down
+  '''
+
+  def __init__(self):
+    self.up = True
+    self.batches = []
+    self._lock = threading.Lock()
+
+  def send(self, data):
+    if not self.up:
+      raise IOError("down")
+    with self._lock:
+      self.batches.append(decode_batch(data))
+
+
+def samples(first, count):
+  return [Sample('a', float(i), 400 + i, 22.0, 45.0) for i in range(first, first + count)]
+
+
+class TestUpload(unittest.TestCase):
+
+  def setUp(self):
+    self.spool = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.spool)
+
+  def wait(self, done, timeout=10.0):
+    end = time.time() + timeout
+    while not done():
+      self.assertLess(time.time(), end, "timed out")
+      time.sleep(0.01)
+
+  def test_round_trip(self):
+    batch = samples(0, 5)
+    self.assertEqual(decode_batch(encode_batch(batch)), batch)
+
+  def test_spooled_batches_go_first_when_the_sink_is_back(self):
+    sink = FlakySink()
+    sink.up = False
+    upload = UploadQueue(sink, self.spool, batch_size=10, workers=1, retry=0.05)
+    upload.start()
+    upload.add(samples(0, 50))
+    self.wait(lambda: upload.spooled()[0] == 5)
+    sink.up = True
+    upload.add(samples(50, 50))
+    self.wait(lambda: sum(len(b) for b in sink.batches) == 100)
+    upload.stop()
+    self.assertEqual([s.timestamp for b in sink.batches for s in b], [float(i) for i in range(100)])
+    self.assertEqual(upload.spooled(), (0, 0))
+
+  def test_spool_limit_drops_the_oldest(self):
+    sink = FlakySink()
+    limit = len(encode_batch(samples(0, 10))) + 4
+    upload = UploadQueue(sink, self.spool, batch_size=10, workers=1, max_pending=1,
+                         max_spool_bytes=limit)
+    upload.add(samples(0, 40))   # not started: one batch waits in memory, the others are spooled
+    self.assertEqual(upload.spooled()[0], 1)
+    self.assertEqual((upload.stats['dropped'], upload.stats['dropped_samples']), (2, 20))
+    upload.start()   # the batch in memory goes behind the spool, and is the oldest beyond the limit
+    self.wait(lambda: upload.spooled()[0] == 0)
+    upload.stop()
+    self.assertEqual([b[0].timestamp for b in sink.batches], [30.0])
+    self.assertEqual(upload.stats['dropped'], 3)
+
+  def test_spool_is_kept_across_restarts(self):
+    sink = FlakySink()
+    sink.up = False
+    upload = UploadQueue(sink, self.spool, batch_size=10)
+    upload.add(samples(0, 25))
+    upload.stop()   # two full batches and the last 5 samples go to the spool
+    self.assertEqual(upload.spooled()[0], 3)
+    sink.up = True
+    upload = UploadQueue(sink, self.spool, batch_size=10, workers=1)
+    self.assertEqual(upload.spooled()[0], 3)
+    upload.start()
+    self.wait(lambda: upload.spooled()[0] == 0)
+    upload.stop()
+    self.assertEqual([len(b) for b in sink.batches], [10, 10, 5])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*
+'''!
+  @file  test_scd4x_warmstart.py
+  @brief  Checks when warm_begin attaches to a running sensor and when it starts it again
+  @copyright  Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license  The MIT License (MIT)
+  @version  V1.0
+  @date  2026-10-19
+  @url  https://github.com/DFRobot/DFRobot_SCD4X
+'''
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from DFRobot_SCD4X import *
+from scd4x_sim import *
+from scd4x_warmstart import *
+
+SERIAL = (0x1234, 0x5678, 0x9abc)
+
+
+class CountingBus(SimulatedBus):
+  '''!
+    @brief Counts the commands sent
+  '''
+
+  def __init__(self, *args, **kwargs):
+    SimulatedBus.__init__(self, *args, **kwargs)
+    self.commands = []
+
+  def write_i2c_block_data(self, addr, cmd, data):
+    self.commands.append((cmd << 8) | data[0])
+    return SimulatedBus.write_i2c_block_data(self, addr, cmd, data)
+
+
+class TestWarmBegin(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.filename = os.path.join(self.folder, 'sensors.json')
+    self.chip = SimulatedSCD4X(serial=SERIAL)
+    self.bus = CountingBus({SCD4X_I2C_ADDR: self.chip}, clock=FakeClock(0.0))
+    self.sensor = DFRobot_SCD4X(i2c_addr = SCD4X_I2C_ADDR, bus = self.bus)
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def test_idle_sensor_is_started_and_recorded(self):
+    cache = SensorCache(self.filename)
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62', {'temp_offset': 2.0}), ('123456789abc', False))
+    self.assertEqual(self.chip.mode, MODE_PERIODIC)
+    record = SensorCache(self.filename).get('123456789abc')
+    self.assertEqual((record['location'], record['mode'], record['config']),
+                     ('1:0x62', SCD4X_START_PERIODIC_MEASURE, {'temp_offset': 2.0}))
+
+  def test_running_sensor_is_attached(self):
+    warm_begin(self.sensor, SensorCache(self.filename), '1:0x62', {'asc': False})
+    self.bus.commands = []
+    cache = SensorCache(self.filename)   # the collector restarted
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62', {'asc': False}), ('123456789abc', True))
+    self.assertNotIn(SCD4X_STOP_PERIODIC_MEASURE, self.bus.commands)
+    self.assertEqual(self.chip.mode, MODE_PERIODIC)
+
+  def test_other_mode_or_config_restarts(self):
+    warm_begin(self.sensor, SensorCache(self.filename), '1:0x62', {'asc': False})
+    self.bus.commands = []
+    cache = SensorCache(self.filename)
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62', {'asc': False}, SCD4X_START_LOW_POWER_MEASURE),
+                     ('123456789abc', False))
+    self.assertIn(SCD4X_STOP_PERIODIC_MEASURE, self.bus.commands)
+    self.assertEqual(self.chip.mode, MODE_LOW_POWER)
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62', {'asc': True}, SCD4X_START_LOW_POWER_MEASURE),
+                     ('123456789abc', False))
+    self.assertEqual(self.chip.settings['asc'], 1)
+
+  def test_unknown_running_sensor_restarts(self):
+    self.sensor.enable_period_measure(SCD4X_START_PERIODIC_MEASURE)
+    self.assertEqual(warm_begin(self.sensor, SensorCache(self.filename), '1:0x62'), ('123456789abc', False))
+
+  def test_absent_sensor(self):
+    del self.bus.sensors[SCD4X_I2C_ADDR]
+    cache = SensorCache(self.filename)
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62'), (None, False))
+    self.assertEqual(cache.sensors, {})
+
+  def test_crc_failures_are_not_recorded(self):
+    self.chip.crc_error_rate = 1.0
+    cache = SensorCache(self.filename)
+    self.assertEqual(warm_begin(self.sensor, cache, '1:0x62'), (None, False))
+    self.assertEqual((cache.sensors, cache.locations), ({}, {}))
+    self.assertEqual(self.chip.mode, MODE_PERIODIC)   # started all the same
+
+  def test_cache_moves_a_sensor(self):
+    cache = SensorCache(self.filename)
+    cache.put('123456789abc', '1:0x62')
+    cache.put('123456789abc', '3:0x62')
+    cache.put('aaaaaaaaaaaa', '3:0x62')
+    self.assertEqual(cache.locations, {'3:0x62': 'aaaaaaaaaaaa'})
+    self.assertNotIn('location', cache.get('123456789abc'))
+
+
+if __name__ == "__main__":
+  unittest.main()